@@ -0,0 +1,163 @@
+"""
+Benchmark the vectorized dataset_profile_logic against the original
+per-column loop on wide frames and check both produce the same output,
+including quantiles, histograms and top values.
+
+Means are compared with a relative tolerance of 1e-12: skipping NaNs inside
+a whole-frame reduction sums in a different order than summing a dropna()
+copy, so the last bit of a mean can differ. Every other field must match
+exactly.
+
+Exits non-zero if the outputs differ or the vectorized version is not
+faster; timings are only meaningful on a quiet machine, which is why this
+check lives here rather than in the test suite.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_profile_logic --rows 20000 --columns 600
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.tools.sketches import DyadicHistogram, top_counts
+from src.tools.utils import (
+    HISTOGRAM_BINS,
+    QUANTILES,
+    TOP_VALUES,
+    dataset_profile_logic,
+    finish_profile,
+    has_distribution,
+    has_top_values,
+    quantile_key,
+)
+
+
+def legacy_profile_logic(df: pd.DataFrame, sample_rows: int = 5) -> dict:
+    """The original per-column implementation, kept as the reference."""
+    n_rows, n_cols = df.shape
+    profile = {
+        "shape": {"rows": int(n_rows), "columns": int(n_cols)},
+        "columns": list(df.columns),
+        "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+        "duplicates": {"duplicate_rows": int(df.duplicated().sum())},
+        "nulls": {},
+        "unique_values": {},
+        "numeric_summary": {},
+        "sample_rows": df.head(sample_rows).to_dict(orient="records"),
+        "quantiles": {},
+        "histograms": {},
+        "top_values": {}
+    }
+    for col in df.columns:
+        s = df[col]
+        null_count = int(s.isna().sum())
+        profile["nulls"][col] = {
+            "null_count": null_count,
+            "null_percentage": round((null_count / n_rows) * 100, 2) if n_rows else 0.0
+        }
+        profile["unique_values"][col] = int(s.nunique(dropna=True))
+        if pd.api.types.is_numeric_dtype(s):
+            clean = s.dropna()
+            if not clean.empty:
+                profile["numeric_summary"][col] = {
+                    "min": float(clean.min()),
+                    "max": float(clean.max()),
+                    "mean": float(clean.mean())
+                }
+            else:
+                profile["numeric_summary"][col] = {"min": None, "max": None, "mean": None}
+        if has_distribution(s.dtype):
+            profile["quantiles"][col] = {
+                quantile_key(q): None if pd.isna(v) else float(v)
+                for q, v in s.quantile(list(QUANTILES)).items()
+            }
+            histogram = DyadicHistogram(HISTOGRAM_BINS)
+            histogram.add(s.to_numpy(dtype="float64", na_value=np.nan))
+            profile["histograms"][col] = histogram.to_dict()
+        if has_top_values(s.dtype, profile["unique_values"][col]):
+            profile["top_values"][col] = {"values": top_counts(s.value_counts(), TOP_VALUES), "exact": True}
+    return finish_profile(profile)
+
+
+def make_wide_frame(rows: int, columns: int, seed: int = 0) -> pd.DataFrame:
+    """Mixed-type frame: floats with nulls, ints, bools, low-cardinality strings."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(columns):
+        kind = i % 4
+        if kind == 0:
+            values = rng.normal(size=rows)
+            values[rng.random(rows) < 0.1] = np.nan
+            data[f"f{i}"] = values
+        elif kind == 1:
+            data[f"i{i}"] = rng.integers(0, 1000, rows)
+        elif kind == 2:
+            data[f"b{i}"] = rng.random(rows) < 0.5
+        else:
+            data[f"s{i}"] = rng.choice(["a", "b", "c", None], rows)
+    return pd.DataFrame(data)
+
+
+def same_profile(legacy: dict, current: dict) -> bool:
+    legacy, current = dict(legacy), dict(current)
+    legacy_means = legacy.pop("numeric_summary")
+    current_means = current.pop("numeric_summary")
+    if json.dumps(legacy, default=str) != json.dumps(current, default=str):
+        return False
+    if legacy_means.keys() != current_means.keys():
+        return False
+    for col, expected in legacy_means.items():
+        got = current_means[col]
+        if (expected["min"], expected["max"]) != (got["min"], got["max"]):
+            return False
+        if expected["mean"] is None or got["mean"] is None:
+            if expected["mean"] is not got["mean"]:
+                return False
+        elif not np.isclose(expected["mean"], got["mean"], rtol=1e-12, atol=0):
+            return False
+    return True
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--columns", type=int, default=600)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_wide_frame(args.rows, args.columns)
+
+    legacy = legacy_profile_logic(df)
+    current = dataset_profile_logic(df)
+    identical = same_profile(legacy, current)
+
+    t_legacy = best_of(lambda: legacy_profile_logic(df), args.repeat)
+    t_current = best_of(lambda: dataset_profile_logic(df), args.repeat)
+    # Duplicate detection and nunique are the same work in both versions
+    t_shared = best_of(lambda: (df.duplicated().sum(), df.nunique()), args.repeat)
+
+    print(f"frame: {args.rows} rows x {args.columns} columns")
+    print(f"per-column loop : {t_legacy:.3f}s total, {t_legacy - t_shared:.3f}s excluding duplicated/nunique")
+    print(f"vectorized      : {t_current:.3f}s total, {t_current - t_shared:.3f}s excluding duplicated/nunique")
+    print(f"speedup         : {t_legacy / t_current:.2f}x total, "
+          f"{(t_legacy - t_shared) / max(t_current - t_shared, 1e-9):.2f}x on per-column stats")
+    print(f"same output     : {identical}")
+    if not identical or t_current >= t_legacy:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Offline benchmark suites for profiling, the tool node and the full graph.
+
+Runs without credentials: the chat model is the scripted fake
+(``LLM_PROVIDER=fake``, src/services/fake_llm.py) and the profile and LLM
+response caches and graph checkpointing are disabled so every round does
+the real work. Results are
+written as JSON (pytest-benchmark style stats per benchmark) and can be
+compared against an earlier run.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_suite --suite all --scale 0.2
+    python -m benchmarks.bench_suite --compare benchmarks/results/<earlier>.json
+
+Suites:
+
+- ``profile_logic``: ``dataset_profile_logic`` on each in-memory dataset;
+- ``tool_node``: the sync tool node executing a ``dataset_profile_tool``
+  call on each CSV (columnar copies are warmed up first);
+- ``graph``: the compiled sync and async graphs end to end, with
+  ``--latency-ms`` of simulated model latency per LLM call;
+- ``correlation``: top-k Pearson and Spearman correlations and Cramér's V
+  associations (src/tools/correlation.py) on each in-memory dataset;
+- ``startup``: cold start of a fresh interpreter importing the CLI, the
+  workflow, the tools and the job queue, and building the first graph
+  (``--shapes`` and ``--scale`` do not apply).
+"""
+import os
+
+# Offline defaults; set before the app modules read their configuration
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault("PROFILE_CACHE_ENABLED", "false")
+os.environ.setdefault("CHECKPOINT_ENABLED", "false")
+os.environ.setdefault("TRACE_EXPORT", "false")
+os.environ.setdefault("COLUMNAR_CACHE_DIR", "benchmarks/data/columnar")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+for _var in ("LANGSMITH_API_KEY", "LANGSMITH_PROJECT", "LANGSMITH_ENDPOINT"):
+    os.environ.setdefault(_var, "")
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.datasets import SHAPES, make_dataset, write_dataset
+
+
+RESULTS_DIR = Path("benchmarks/results")
+DATA_DIR = Path("benchmarks/data")
+
+
+def measure(fn, rounds: int, warmup: int = 1) -> dict:
+    """Run ``fn`` ``warmup`` + ``rounds`` times; stats over the measured rounds in seconds"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "max": max(timings),
+        "mean": statistics.fmean(timings),
+        "median": statistics.median(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "rounds": rounds,
+    }
+
+
+def bench_profile_logic(shapes: list, scale: float, rounds: int) -> list:
+    from src.tools.utils import dataset_profile_logic
+
+    results = []
+    for shape in shapes:
+        df = make_dataset(shape, scale)
+        for approximate in (False, True):
+            name = f"profile_logic[{shape}{'-approx' if approximate else ''}]"
+            stats = measure(lambda: dataset_profile_logic(df, approximate=approximate), rounds)
+            results.append({"name": name, "group": "profile_logic", "stats": stats})
+    return results
+
+
+def bench_tool_node(shapes: list, scale: float, rounds: int) -> list:
+    from langchain_core.messages import AIMessage, HumanMessage
+    from src.Graph.nodes import tool_node
+
+    results = []
+    for shape in shapes:
+        path = str(write_dataset(shape, DATA_DIR, scale))
+        state = {
+            "file_path": path,
+            "messages": [
+                HumanMessage(content="Profile the dataset."),
+                AIMessage(content="", tool_calls=[{
+                    "name": "dataset_profile_tool", "args": {"file_path": path}, "id": "call_bench"
+                }]),
+            ],
+        }
+        # The warmup round also builds the columnar copy, so rounds measure warm loads
+        stats = measure(lambda: tool_node(state), rounds)
+        results.append({"name": f"tool_node[{shape}]", "group": "tool_node", "stats": stats})
+    return results
+
+
+def bench_graph(shapes: list, scale: float, rounds: int) -> list:
+    from src.Graph.workflow import _initial_state, get_compiled_graph
+
+    query = "Give me a summary of the columns and entire dataset."
+    sync_graph = get_compiled_graph()
+    async_graph = get_compiled_graph(use_async=True)
+    results = []
+    for shape in shapes:
+        path = str(write_dataset(shape, DATA_DIR, scale))
+        stats = measure(lambda: sync_graph.invoke(_initial_state(query, path)), rounds)
+        results.append({"name": f"graph[{shape}]", "group": "graph", "stats": stats})
+        stats = measure(
+            lambda: asyncio.run(async_graph.ainvoke(_initial_state(query, path))), rounds
+        )
+        results.append({"name": f"graph_async[{shape}]", "group": "graph", "stats": stats})
+    return results
+
+
+def bench_correlation(shapes: list, scale: float, rounds: int) -> list:
+    from src.tools.correlation import cramers_v_pairs, correlation_pairs
+
+    results = []
+    for shape in shapes:
+        df = make_dataset(shape, scale)
+        for method in ("pearson", "spearman"):
+            stats = measure(lambda: correlation_pairs(df, method=method), rounds)
+            results.append({"name": f"correlation[{shape}-{method}]", "group": "correlation", "stats": stats})
+        stats = measure(lambda: cramers_v_pairs(df), rounds)
+        results.append({"name": f"correlation[{shape}-cramers_v]", "group": "correlation", "stats": stats})
+    return results
+
+
+# Cold-start targets: each round runs the statement in a new interpreter
+STARTUP_TARGETS = {
+    "interpreter": "pass",
+    "cli_help": "import runpy, sys; sys.argv = ['main.py', '--help']; runpy.run_path('main.py', run_name='__main__')",
+    "import[workflow]": "import src.Graph.workflow",
+    "import[file_tools]": "import src.tools.file_tools",
+    "import[job_queue]": "import src.services.job_queue",
+    "first_graph": "from src.Graph.workflow import get_compiled_graph; get_compiled_graph()",
+}
+
+
+def bench_startup(shapes: list, scale: float, rounds: int) -> list:
+    def run(statement: str) -> None:
+        subprocess.run([sys.executable, "-c", statement], check=True, stdout=subprocess.DEVNULL)
+
+    results = []
+    for name, statement in STARTUP_TARGETS.items():
+        # The warmup round brings the modules into the OS page cache
+        stats = measure(lambda: run(statement), rounds)
+        results.append({"name": f"startup[{name}]", "group": "startup", "stats": stats})
+    return results
+
+
+SUITES = {
+    "profile_logic": bench_profile_logic,
+    "tool_node": bench_tool_node,
+    "graph": bench_graph,
+    "correlation": bench_correlation,
+    "startup": bench_startup,
+}
+
+
+def compare(current: list, baseline_path: Path) -> None:
+    """Print median timings next to a previous results file"""
+    baseline = {
+        bench["name"]: bench["stats"]
+        for bench in json.loads(Path(baseline_path).read_text())["benchmarks"]
+    }
+    print(f"\ncompared with {baseline_path}:")
+    print(f"{'benchmark':<40} {'before':>10} {'after':>10} {'ratio':>8}")
+    for bench in current:
+        before = baseline.get(bench["name"])
+        after = bench["stats"]["median"]
+        if before is None:
+            print(f"{bench['name']:<40} {'-':>10} {after * 1000:>8.1f}ms {'new':>8}")
+            continue
+        ratio = after / before["median"] if before["median"] else float("inf")
+        print(f"{bench['name']:<40} {before['median'] * 1000:>8.1f}ms {after * 1000:>8.1f}ms {ratio:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--suite", choices=["all", *SUITES], default="all")
+    parser.add_argument("--shapes", nargs="+", choices=sorted(SHAPES), default=sorted(SHAPES))
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiplier on each dataset's row count")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=None,
+                        help="Simulated latency per fake LLM call (FAKE_LLM_LATENCY_MS)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Results file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, default=None,
+                        help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    if args.latency_ms is not None:
+        # The app modules are imported lazily by the suites, after this point
+        os.environ["FAKE_LLM_LATENCY_MS"] = str(args.latency_ms)
+
+    suites = list(SUITES) if args.suite == "all" else [args.suite]
+    benchmarks = []
+    for suite in suites:
+        print(f"running {suite} ...")
+        benchmarks.extend(SUITES[suite](args.shapes, args.scale, args.rounds))
+
+    timestamp = datetime.now(timezone.utc)
+    output = args.output or RESULTS_DIR / f"{timestamp:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "datetime": timestamp.isoformat(),
+        "machine_info": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "scale": args.scale,
+            "rounds": args.rounds,
+            "shapes": args.shapes,
+            "latency_ms": args.latency_ms,
+        },
+        "benchmarks": benchmarks,
+    }, indent=2))
+
+    print(f"\n{'benchmark':<40} {'median':>10} {'min':>10} {'stddev':>10}")
+    for bench in benchmarks:
+        stats = bench["stats"]
+        print(f"{bench['name']:<40} {stats['median'] * 1000:>8.1f}ms "
+              f"{stats['min'] * 1000:>8.1f}ms {stats['stddev'] * 1000:>8.1f}ms")
+    print(f"\nresults written to {output}")
+
+    if args.compare:
+        compare(benchmarks, args.compare)
+
+
+if __name__ == "__main__":
+    main()
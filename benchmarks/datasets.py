@@ -0,0 +1,87 @@
+"""
+Synthetic datasets for the benchmark suites.
+
+Each shape stresses a different part of profiling:
+
+- ``narrow``: a typical table, few mixed-type columns;
+- ``wide``: many columns, where per-column overhead dominates;
+- ``tall``: many rows of few columns, where parsing and hashing dominate;
+- ``high_cardinality``: near-unique strings and integers (distinct counts);
+- ``null_heavy``: most cells missing.
+
+Files are written once per (shape, scale, seed) and reused across runs.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# shape name -> (rows, columns) at scale 1.0
+SHAPES = {
+    "narrow": (100_000, 8),
+    "wide": (10_000, 300),
+    "tall": (1_000_000, 5),
+    "high_cardinality": (100_000, 8),
+    "null_heavy": (100_000, 20),
+}
+
+
+def _mixed_column(rng: np.random.Generator, i: int, rows: int) -> tuple:
+    kind = i % 5
+    if kind == 0:
+        values = rng.normal(100, 15, rows)
+        values[rng.random(rows) < 0.05] = np.nan
+        return f"num_{i}", values
+    if kind == 1:
+        return f"int_{i}", rng.integers(0, 1000, rows)
+    if kind == 2:
+        return f"flag_{i}", rng.random(rows) < 0.3
+    if kind == 3:
+        return f"cat_{i}", rng.choice(["north", "south", "east", "west", None], rows)
+    return f"date_{i}", (
+        pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 1500, rows), unit="D")
+    ).strftime("%Y-%m-%d")
+
+
+def make_dataset(shape: str, scale: float = 1.0, seed: int = 0) -> pd.DataFrame:
+    """Build the synthetic frame for ``shape``; ``scale`` multiplies the row count."""
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown dataset shape '{shape}'. Choose from {sorted(SHAPES)}")
+    base_rows, columns = SHAPES[shape]
+    rows = max(1, int(base_rows * scale))
+    rng = np.random.default_rng(seed)
+
+    if shape == "high_cardinality":
+        data = {
+            "id": [f"id-{v:012d}" for v in rng.permutation(rows * 10)[:rows]],
+            "email": [f"user{v}@example.com" for v in rng.integers(0, rows * 5, rows)],
+            "amount": rng.lognormal(3, 1, rows).round(2),
+        }
+        for i in range(columns - len(data)):
+            data[f"key_{i}"] = rng.integers(0, rows, rows)
+        df = pd.DataFrame(data)
+    else:
+        df = pd.DataFrame(dict(_mixed_column(rng, i, rows) for i in range(columns)))
+
+    if shape == "null_heavy":
+        mask = rng.random(df.shape) < 0.6
+        df = df.mask(mask)
+
+    # Duplicate a small share of rows so duplicate detection has work to do
+    n_dupes = rows // 100
+    if n_dupes:
+        df = pd.concat([df.iloc[:rows - n_dupes], df.iloc[:n_dupes]], ignore_index=True)
+    return df
+
+
+def write_dataset(shape: str, directory: Path, scale: float = 1.0, seed: int = 0) -> Path:
+    """Write ``make_dataset(shape, scale, seed)`` as CSV into ``directory`` once."""
+    directory = Path(directory)
+    path = directory / f"{shape}-x{scale:g}-s{seed}.csv"
+    if not path.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        make_dataset(shape, scale, seed).to_csv(tmp, index=False)
+        tmp.replace(path)
+    return path
@@ -1,5 +1,29 @@
+import argparse
+import asyncio
+
+
 def main():
-    print("Hello from venv!")
+    parser = argparse.ArgumentParser(description="Run the EDA workflow over many datasets.")
+    parser.add_argument("source", help="Directory of CSVs, or a manifest (one path or JSON object per line)")
+    parser.add_argument("--output", default="data/batch_results.jsonl", help="JSONL results file (appended, used to resume)")
+    parser.add_argument("--query", default=None, help="Query to run for datasets without one in the manifest")
+    parser.add_argument("--concurrency", type=int, default=4, help="Datasets processed at the same time")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Per-dataset timeout in seconds")
+    parser.add_argument("--rps", type=float, default=None, help="Global LLM requests per second")
+    args = parser.parse_args()
+
+    # Imported here so --help does not initialize the LLM
+    from src.Graph.batch import DEFAULT_QUERY, load_jobs, run_batch
+
+    jobs = load_jobs(args.source, args.query or DEFAULT_QUERY)
+    summary = asyncio.run(run_batch(
+        jobs,
+        args.output,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        requests_per_second=args.rps,
+    ))
+    print(summary)
 
 
 if __name__ == "__main__":
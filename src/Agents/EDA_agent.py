@@ -1,14 +1,18 @@
-from typing import Dict, Any, List
-from langchain_core.messages import SystemMessage, HumanMessage
+from typing import Dict, Any, List, Optional
+from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
 from langchain_core.language_models import BaseChatModel
-from src.tools.file_tools import load_dataset, dataset_profile_tool
+from src.tools.file_tools import load_dataset, dataset_profile_tool, correlation_tool
+from src.tools.plot_rules import RULES_ENABLED, rule_based_plot_plan
+from src.tools.profile_format import format_observation
+from src.utils.logger import logger
+from src.utils.message_history import is_compacted, window_messages
 
 class EDAAgent:
     """Agent responsible for Exploratory Data Analysis"""
     
     def __init__(self, llm: BaseChatModel):
         self.llm = llm
-        self.tools = [dataset_profile_tool]
+        self.tools = [dataset_profile_tool, correlation_tool]
         self.tools_by_name = {tool.name: tool for tool in self.tools}
         self.model_with_tools = llm.bind_tools(self.tools)
         
@@ -38,6 +42,7 @@ class EDAAgent:
 
             Available tools:
             - dataset_profile_tool: Get detailed statistical profile of the dataset
+            - correlation_tool: Get the strongest correlations between numeric columns and associations between categorical ones
 
             Always use tools to gather data before making conclusions.
             Provide clear, structured summaries that are easy to understand.
@@ -59,8 +64,8 @@ class EDAAgent:
             Return ONLY raw JSON following the PlotPlan schema.
         """
 
-    def execute_designer(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Specific logic to convert Strategy + Profile into PlotPlan JSON"""
+    def _designer_messages(self, state: Dict[str, Any]) -> List[SystemMessage]:
+        """Build the designer prompt from Strategy + Profile"""
         strategy = state.get("strategy", "")
         profile = state.get("dataset_profile", "")
         
@@ -76,37 +81,87 @@ class EDAAgent:
         - If relationship is Categorical vs Numeric -> box/violin.
         - If time is involved -> time_series (freq=W/M).
         """
-        
-        response = self.llm.invoke([SystemMessage(content=designer_prompt)])
+        return [SystemMessage(content=designer_prompt)]
+
+    def _rule_based_plan(self, state: Dict[str, Any]) -> Optional[dict]:
+        """PlotPlan from the mapping rules, or None when the LLM is needed"""
+        profile = state.get("profile_data")
+        if not RULES_ENABLED or not profile:
+            return None
+        messages = state.get("messages") or []
+        # The profiler summary and the strategy usually name the target
+        hint = "\n".join([str(messages[-1].content) if messages else "", state.get("strategy", "")])
+        plan = rule_based_plot_plan(profile, hint=hint)
+        if plan is not None:
+            logger.info(f"Designer: rule-based PlotPlan with {len(plan['plots'])} plots (target {plan['target']!r})")
+        return plan
+
+    def execute_designer(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Specific logic to convert Strategy + Profile into PlotPlan JSON"""
+        plan = self._rule_based_plan(state)
+        if plan is not None:
+            return {"plot_plan": plan}
+        response = self.llm.invoke(self._designer_messages(state))
         # In a real scenario, you'd parse JSON and validate with Pydantic here
         return {"plot_plan": response.content, "llm_calls": state.get("llm_calls", 0) + 1}
 
+    async def aexecute_designer(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of execute_designer"""
+        plan = self._rule_based_plan(state)
+        if plan is not None:
+            return {"plot_plan": plan}
+        response = await self.llm.ainvoke(self._designer_messages(state))
+        return {"plot_plan": response.content, "llm_calls": state.get("llm_calls", 0) + 1}
+
+    def _profiler_messages(self, state: Dict[str, Any]) -> list:
+        """System prompt with context followed by a token-bounded window of the conversation"""
+        history = window_messages(state["messages"])
+        prompt = self.get_profile_prompt(state['file_path'])
+        
+        # Tool outputs already read are compacted in the history; keep the
+        # latest profile visible through the bounded dataset_profile instead.
+        # Results carried over from an earlier run on the same dataset have
+        # no tool message at all.
+        show_state = (
+            any(is_compacted(m) for m in history)
+            or not any(isinstance(m, ToolMessage) for m in history)
+        )
+        profile = state.get("dataset_profile")
+        if profile and show_state:
+            prompt += f"\n\nLatest dataset profile (from dataset_profile_tool):\n{profile}"
+        relationships = state.get("relationships")
+        if relationships and show_state:
+            prompt += f"\n\nStrongest relationships (from correlation_tool):\n{relationships}"
+        
+        system_msg = SystemMessage(content=prompt)
+        return [system_msg] + history
+
     def execute_profiler(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Execute EDA agent logic"""
         
-        # Create system message with context
-        system_msg = SystemMessage(content=self.get_profile_prompt(state['file_path']))
-        
         # Invoke LLM with tools
-        response = self.model_with_tools.invoke([system_msg] + state["messages"])
+        response = self.model_with_tools.invoke(self._profiler_messages(state))
         
         return {
             "messages": [response],  # Add AI message to conversation so tool_calls are visible
             "llm_calls": state.get('llm_calls', 0) + 1
         }
+
+    async def aexecute_profiler(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of execute_profiler"""
+        response = await self.model_with_tools.ainvoke(self._profiler_messages(state))
+        
+        return {
+            "messages": [response],
+            "llm_calls": state.get('llm_calls', 0) + 1
+        }
     
 
     
     def _format_observation(self, observation: Any) -> str:
         """Format tool observation for LLM consumption"""
-        import json
-        
-        if hasattr(observation, 'to_string'):  # DataFrame
-            return f"Dataset loaded. Shape: {observation.shape}. Use profiling tools for details."
-        elif isinstance(observation, dict):
-            return json.dumps(observation, indent=2)
-        else:
-            return str(observation)
+        # Profiles become a compact table within PROFILE_TOKEN_BUDGET tokens
+        return format_observation(observation)
     
     def should_continue(self, state: Dict[str, Any]) -> bool:
         """Determine if agent should continue processing"""
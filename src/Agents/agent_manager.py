@@ -1,18 +1,20 @@
-from typing import Dict, Type
+import threading
+from typing import Dict, Optional, Type
 from src.Agents.base_agent import BaseAgent
-from src.Agents.EDA_agent import EDAAgent
-from src.services.llm_service import get_chat_model
 
 class AgentManager:
     """Manages all agents in the workflow"""
     
     def __init__(self):
+        from src.services.llm_service import get_chat_model
         self.llm = get_chat_model()
         self._agents: Dict[str, BaseAgent] = {}
         self._initialize_agents()
     
     def _initialize_agents(self):
         """Initialize all available agents"""
+        # Imported here: the EDA agent pulls in the tools (pandas, pyarrow)
+        from src.Agents.EDA_agent import EDAAgent
         self._agents = {
             "eda": EDAAgent(self.llm),
             # Add more agents here as you build them
@@ -26,9 +28,39 @@ class AgentManager:
             raise ValueError(f"Agent '{agent_name}' not found")
         return self._agents[agent_name]
     
+    def set_rate_limiter(self, rate_limiter):
+        """Throttle every LLM request made by the shared model (and agents bound to it)"""
+        self.llm.rate_limiter = rate_limiter
+    
     def list_agents(self):
         """List all available agents"""
         return list(self._agents.keys())
 
-# Singleton instance
-agent_manager = AgentManager()
\ No newline at end of file
+_agent_manager: Optional[AgentManager] = None
+_agent_manager_lock = threading.Lock()
+
+
+def get_agent_manager() -> AgentManager:
+    """
+    Shared AgentManager, built on first use.
+
+    Importing this module no longer creates the chat model or the agents, so
+    the CLI, the Streamlit app and worker processes start without loading
+    the model provider SDK, the tools or their data libraries until a node
+    actually runs. Construction is guarded by a lock so concurrent first
+    calls (async tool threads, job queue workers) share one instance.
+    """
+    global _agent_manager
+    if _agent_manager is None:
+        with _agent_manager_lock:
+            if _agent_manager is None:
+                _agent_manager = AgentManager()
+    return _agent_manager
+
+
+def __getattr__(name: str):
+    # Backwards compatibility: ``from ... import agent_manager`` still works,
+    # but builds the manager at that point instead of at module import
+    if name == "agent_manager":
+        return get_agent_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
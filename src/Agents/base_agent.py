@@ -1,11 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
-from langchain_core.language_models import BaseChatModel
+from typing import TYPE_CHECKING, Dict, Any, List
+from src.tools.profile_format import format_observation
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
 
 class BaseAgent(ABC):
     """Base class for all agents"""
     
-    def __init__(self, llm: BaseChatModel):
+    def __init__(self, llm: "BaseChatModel"):
         self.llm = llm
         self.tools = []
         self.tools_by_name = {}
@@ -23,10 +26,5 @@ class BaseAgent(ABC):
     
     def _format_observation(self, observation: Any) -> str:
         """Common observation formatting"""
-        import json
-        
-        if hasattr(observation, 'to_string'):
-            return f"Data loaded. Shape: {observation.shape}"
-        elif isinstance(observation, dict):
-            return json.dumps(observation, indent=2)
-        return str(observation)
\ No newline at end of file
+        # Profiles become a compact table within PROFILE_TOKEN_BUDGET tokens
+        return format_observation(observation)
\ No newline at end of file
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+from src.Agents.agent_manager import get_agent_manager
+from src.Graph.workflow import arun_workflow
+from src.utils.logger import logger
+
+
+DEFAULT_QUERY = "Give me a summary of the columns and entire dataset."
+
+
+def load_jobs(source: str, query: str = DEFAULT_QUERY) -> list:
+    """
+    Expand a batch source into ``{"file_path", "query"}`` jobs.
+
+    ``source`` may be a directory (every ``*.csv`` below it), a JSONL manifest
+    with one ``{"file_path": ..., "query": ...}`` object per line, or a text
+    manifest with one path per line. Relative manifest paths are resolved
+    against the manifest's directory.
+    """
+    path = Path(source)
+    if path.is_dir():
+        return [{"file_path": str(p), "query": query} for p in sorted(path.rglob("*.csv"))]
+
+    jobs = []
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        job = json.loads(line) if line.startswith("{") else {"file_path": line}
+        file_path = Path(job["file_path"])
+        if not file_path.is_absolute():
+            file_path = path.parent / file_path
+        jobs.append({"file_path": str(file_path), "query": job.get("query", query)})
+    return jobs
+
+
+def _job_key(job: dict) -> str:
+    """Identify a dataset version by path, size and mtime for resume checks."""
+    st = os.stat(job["file_path"])
+    return f"{os.path.realpath(job['file_path'])}|{st.st_size}|{st.st_mtime_ns}|{job['query']}"
+
+
+def _completed_keys(results_path: Path) -> set:
+    """Keys of jobs that already finished successfully in a previous run."""
+    done = set()
+    if not results_path.exists():
+        return done
+    with open(results_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a run killed mid-write can leave a partial last line
+            if record.get("status") == "ok":
+                done.add(record["key"])
+    return done
+
+
+async def _run_job(job: dict, key: str, semaphore: asyncio.Semaphore, timeout: Optional[float]) -> dict:
+    async with semaphore:
+        start = time.perf_counter()
+        record = {"key": key, "file_path": job["file_path"], "query": job["query"]}
+        try:
+            state = await asyncio.wait_for(arun_workflow(job["query"], job["file_path"]), timeout)
+            messages = state.get("messages") or []
+            record.update({
+                "status": "ok",
+                "llm_calls": state.get("llm_calls", 0),
+                "answer": messages[-1].content if messages else "",
+                "strategy": state.get("strategy", ""),
+                "plot_plan": state.get("plot_plan", {}),
+                "figures": state.get("figures", []),
+            })
+        except asyncio.TimeoutError:
+            record.update({"status": "timeout", "error": f"exceeded {timeout}s"})
+        except Exception as e:
+            logger.error(f"Batch job failed for {job['file_path']}: {e}")
+            record.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+        record["elapsed_s"] = round(time.perf_counter() - start, 3)
+        record["finished_at"] = datetime.now(timezone.utc).isoformat()
+        return record
+
+
+async def run_batch(
+    jobs: Iterable[dict],
+    results_path: str,
+    concurrency: int = 4,
+    timeout: Optional[float] = 600.0,
+    requests_per_second: Optional[float] = None
+) -> dict:
+    """
+    Run the async EDA workflow over many datasets and append results to JSONL.
+
+    Parameters
+    ----------
+    jobs : Iterable[dict]
+        ``{"file_path", "query"}`` items, e.g. from :func:`load_jobs`.
+    results_path : str
+        JSONL sink. One record is appended per finished dataset; datasets
+        already recorded with ``status == "ok"`` (same path, size, mtime and
+        query) are skipped, so an interrupted batch can simply be re-run.
+    concurrency : int, default 4
+        Datasets processed at the same time.
+    timeout : float, optional
+        Per-dataset wall-clock limit in seconds. Tool threads that are already
+        running finish in the background after a timeout.
+    requests_per_second : float, optional
+        Global LLM request rate shared by all concurrent datasets.
+
+    Returns
+    -------
+    dict
+        Counts per status, plus ``skipped`` for already completed datasets.
+
+    Notes
+    -----
+    - All datasets share the process-wide compiled graph and AgentManager.
+    - A dataset that cannot be read (e.g. a manifest entry for a missing
+      file) is recorded with ``status == "error"``; the rest still run.
+    """
+    if requests_per_second:
+        get_agent_manager().set_rate_limiter(InMemoryRateLimiter(requests_per_second=requests_per_second))
+
+    sink = Path(results_path)
+    sink.parent.mkdir(parents=True, exist_ok=True)
+    done = _completed_keys(sink)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    summary = {"skipped": 0}
+    tasks = []
+    unreadable = []
+    for job in jobs:
+        try:
+            key = _job_key(job)
+        except OSError as e:
+            logger.error(f"Batch job failed for {job['file_path']}: {e}")
+            unreadable.append({
+                "key": f"{os.path.realpath(job['file_path'])}|{job['query']}",
+                "file_path": job["file_path"],
+                "query": job["query"],
+                "status": "error",
+                "error": f"{type(e).__name__}: {e}",
+                "elapsed_s": 0.0,
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+            })
+            continue
+        if key in done:
+            summary["skipped"] += 1
+            continue
+        tasks.append(asyncio.create_task(_run_job(job, key, semaphore, timeout)))
+
+    logger.info(f"Batch: {len(tasks)} datasets to run, {summary['skipped']} already done")
+    with open(sink, "a") as f:
+        for record in unreadable:
+            f.write(json.dumps(record) + "\n")
+            summary["error"] = summary.get("error", 0) + 1
+        for finished in asyncio.as_completed(tasks):
+            record = await finished
+            f.write(json.dumps(record, default=str) + "\n")
+            f.flush()
+            summary[record["status"]] = summary.get(record["status"], 0) + 1
+            logger.info(f"Batch: {record['status']} {record['file_path']} ({record['elapsed_s']}s)")
+    return summary
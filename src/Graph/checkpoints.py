@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from src.tools.profile_cache import profile_cache
+from src.utils.logger import logger
+
+
+# Persist graph state after every node so failed or repeated runs resume
+# instead of re-spending LLM calls.
+CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "true").lower() not in ("0", "false", "no")
+CHECKPOINT_DB = Path(os.getenv("CHECKPOINT_DB", "data/cache/checkpoints.sqlite"))
+# Threads (dataset + question) kept before the least recently used are deleted.
+CHECKPOINT_MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "200"))
+
+# Dataset-level results a new question about the same data starts from
+REUSED_KEYS = ("dataset_profile", "profile_data", "relationships", "strategy")
+# Checkpoints of the same dataset inspected when looking for reusable state
+_REUSE_LOOKBACK = 64
+
+_lock = threading.Lock()
+_checkpointer = None
+
+
+def get_checkpointer():
+    """
+    Return the process-wide checkpointer, or None when checkpointing is off.
+
+    A SQLite database at CHECKPOINT_DB (langgraph-checkpoint-sqlite, a
+    project dependency), so runs survive restarts; an in-memory saver in
+    environments installed without it.
+    """
+    global _checkpointer
+    if not CHECKPOINT_ENABLED:
+        return None
+    with _lock:
+        if _checkpointer is None:
+            try:
+                from langgraph.checkpoint.sqlite import SqliteSaver
+            except ImportError:  # e.g. installed without the lock file; checkpoints then last for the process only
+                from langgraph.checkpoint.memory import InMemorySaver
+                logger.warning("langgraph-checkpoint-sqlite not installed; checkpoints are kept in memory")
+                _checkpointer = InMemorySaver()
+            else:
+                CHECKPOINT_DB.parent.mkdir(parents=True, exist_ok=True)
+                # Shared by the job queue's worker threads; SqliteSaver serializes access
+                conn = sqlite3.connect(CHECKPOINT_DB, check_same_thread=False)
+                _checkpointer = SqliteSaver(conn)
+                _checkpointer.setup()
+        return _checkpointer
+
+
+def run_config(file_path: str, query: str, profile_mode: Optional[str] = None) -> dict:
+    """
+    Graph config for a question about a dataset.
+
+    The thread ID hashes the file content (not its path) with the
+    whitespace- and case-normalized query and the profile mode, so asking
+    the same thing about the same data lands on the same thread. Every
+    checkpoint is tagged with the dataset digest for ``prepare_run``.
+    """
+    question = " ".join(query.split()).casefold()
+    return {
+        "configurable": {"thread_id": profile_cache.key(file_path, query=question, profile_mode=profile_mode)},
+        "metadata": {"dataset": profile_cache.key(file_path)},
+    }
+
+
+def _query(inputs: dict) -> str:
+    content = inputs["messages"][-1].content
+    return content if isinstance(content, str) else str(content)
+
+
+def _reusable_state(checkpointer, dataset: str) -> dict:
+    """Dataset-level results of the latest planned run on the same data, if any."""
+    for saved in checkpointer.list(None, filter={"dataset": dataset}, limit=_REUSE_LOOKBACK):
+        values = saved.checkpoint.get("channel_values", {})
+        if values.get("strategy") and values.get("profile_data"):
+            return {key: values[key] for key in REUSED_KEYS if key in values}
+    return {}
+
+
+def _prune(checkpointer) -> None:
+    """Delete the least recently written threads beyond CHECKPOINT_MAX_THREADS."""
+    if hasattr(checkpointer, "conn"):
+        # checkpoint IDs are time-ordered, so the latest one dates the thread
+        with checkpointer.lock:
+            rows = checkpointer.conn.execute(
+                "SELECT thread_id FROM checkpoints GROUP BY thread_id ORDER BY MAX(checkpoint_id)"
+            ).fetchall()
+        threads = [row[0] for row in rows]
+    else:
+        # Insertion order; looking up an unknown thread leaves an empty entry
+        storage = getattr(checkpointer, "storage", {})
+        threads = [thread_id for thread_id, namespaces in storage.items() if any(namespaces.values())]
+    # Make room for the thread about to start
+    for thread_id in threads[: max(len(threads) - CHECKPOINT_MAX_THREADS + 1, 0)]:
+        checkpointer.delete_thread(thread_id)
+
+
+def prepare_run(graph: Any, inputs: dict) -> tuple:
+    """
+    Decide how to run ``inputs`` on a checkpointed graph.
+
+    Parameters
+    ----------
+    graph : CompiledStateGraph
+        A compiled workflow graph; without a checkpointer the inputs are
+        run as they are.
+    inputs : dict
+        Initial state with ``messages`` (the question last), ``file_path``
+        and optionally ``profile_mode``.
+
+    Returns
+    -------
+    tuple
+        ``(run_inputs, config, finished_state)``. ``finished_state`` is the
+        stored final state when this question was already answered for this
+        data; nothing needs to run. Otherwise stream ``run_inputs`` with
+        ``config``: None resumes a thread that failed or was cancelled from
+        its last completed node, and a new thread starts from ``inputs``
+        seeded with the profile, relationships and strategy of the latest
+        run on the same dataset, so the planner is not called again.
+    """
+    checkpointer = getattr(graph, "checkpointer", None)
+    if checkpointer is None:
+        return inputs, None, None
+
+    config = run_config(inputs["file_path"], _query(inputs), inputs.get("profile_mode"))
+    thread_id = config["configurable"]["thread_id"][:12]
+    snapshot = graph.get_state(config)
+    if snapshot.values and not snapshot.next:
+        logger.info(f"Thread {thread_id} already complete; reusing its final state")
+        return None, config, snapshot.values
+    if snapshot.values:
+        logger.info(f"Resuming thread {thread_id} at {', '.join(snapshot.next)}")
+        return None, config, None
+
+    _prune(checkpointer)
+    reused = _reusable_state(checkpointer, config["metadata"]["dataset"])
+    if reused:
+        logger.info(f"Thread {thread_id} starts from an earlier run's profile and strategy")
+    return {**inputs, **reused}, config, None
@@ -1,49 +1,97 @@
-from src.Agents.agent_manager import agent_manager
+from src.Agents.agent_manager import get_agent_manager
 from src.Graph.state import AgentState
+from src.utils.instrumentation import span
 from langchain_core.messages import ToolMessage, SystemMessage, HumanMessage
 from langgraph.graph import END
+from concurrent.futures import ThreadPoolExecutor
 from typing import Literal
+import asyncio
+import contextvars
+import functools
+import os
+
+# Upper bound on tool calls running at once in the async workflow. Tools are
+# CPU-bound (pandas), so they run on this pool instead of the event loop.
+TOOL_CONCURRENCY = int(os.getenv("TOOL_CONCURRENCY", "4"))
+_tool_executor = ThreadPoolExecutor(max_workers=TOOL_CONCURRENCY, thread_name_prefix="eda-tool")
 
 def llm_call(state: AgentState):
     """Node that calls the appropriate agent"""
     # For now, we always use EDA agent
     # Later you can add logic to select agent based on state
-    agent = agent_manager.get_agent("eda")
+    agent = get_agent_manager().get_agent("eda")
     return agent.execute_profiler(state)
 
-def tool_node(state: AgentState):
-    """Node that executes tools"""
-    agent = agent_manager.get_agent("eda")
-    result = []
+async def allm_call(state: AgentState):
+    """Async variant of llm_call"""
+    agent = get_agent_manager().get_agent("eda")
+    return await agent.aexecute_profiler(state)
+
+def _run_tool_call(agent, tool_call, state: AgentState) -> tuple:
+    """Execute one tool call; returns its ToolMessage and the raw observation"""
+    tool = agent.tools_by_name[tool_call["name"]]
     
-    for tool_call in state["messages"][-1].tool_calls:
-        tool = agent.tools_by_name[tool_call["name"]]
-        
-        args = tool_call["args"]
-        if "file_path" in args and state.get("file_path"):
-            args["file_path"] = state["file_path"]
-        
+    args = tool_call["args"]
+    if "file_path" in args and state.get("file_path"):
+        args["file_path"] = state["file_path"]
+    # A run-level profile mode (e.g. "fast" for interactive use) applies
+    # unless the model asked for a specific one
+    if tool_call["name"] == "dataset_profile_tool" and state.get("profile_mode"):
+        args.setdefault("mode", state["profile_mode"])
+    
+    with span(f"tool:{tool_call['name']}", kind="tool"):
         observation = tool.invoke(args)
         observation_str = agent._format_observation(observation)
-        
-        result.append(
-            ToolMessage(content=observation_str, tool_call_id=tool_call["id"])
-        )
     
-    # Extract dataset_profile from the tool results for downstream nodes
-    # Assuming the first/only tool is dataset_profile_tool
-    dataset_profile_content = result[0].content if result else ""
-    
-    return {
+    return ToolMessage(content=observation_str, tool_call_id=tool_call["id"]), observation
+
+def tool_node(state: AgentState):
+    """Node that executes tools"""
+    agent = get_agent_manager().get_agent("eda")
+    tool_calls = state["messages"][-1].tool_calls
+    outputs = [_run_tool_call(agent, tool_call, state) for tool_call in tool_calls]
+    return _tool_node_update(tool_calls, outputs)
+
+async def atool_node(state: AgentState):
+    """Async variant of tool_node: all tool calls from one AI message run concurrently"""
+    agent = get_agent_manager().get_agent("eda")
+    loop = asyncio.get_running_loop()
+    tool_calls = state["messages"][-1].tool_calls
+    # run_in_executor does not carry contextvars over; copy them per call so
+    # tool spans land in the run's trace
+    outputs = await asyncio.gather(*(
+        loop.run_in_executor(
+            _tool_executor,
+            functools.partial(contextvars.copy_context().run, _run_tool_call, agent, tool_call, state)
+        )
+        for tool_call in tool_calls
+    ))
+    return _tool_node_update(tool_calls, list(outputs))
+
+def _tool_node_update(tool_calls: list, outputs: list):
+    """State update shared by the sync and async tool nodes"""
+    result = [message for message, _ in outputs]
+    update = {
         "messages": result,
-        "dataset_profile": dataset_profile_content
+        # Full outputs live here once the messages are compacted
+        "artifacts": {message.tool_call_id: message.content for message in result}
     }
+    # Formatted results feed the planner; the structured profile feeds
+    # rule-based steps such as the designer fast path
+    by_tool = {}
+    for tool_call, output in zip(tool_calls, outputs):
+        by_tool.setdefault(tool_call["name"], []).append(output)
+    if "dataset_profile_tool" in by_tool:
+        message, observation = by_tool["dataset_profile_tool"][-1]
+        update["dataset_profile"] = message.content
+        if isinstance(observation, dict):
+            update["profile_data"] = observation
+    if "correlation_tool" in by_tool:
+        update["relationships"] = by_tool["correlation_tool"][-1][0].content
+    return update
 
 
-def planning_node(state: AgentState):
-    """Business logic node: Identifies domain and hypotheses."""
-    profile = state.get("dataset_profile", "")
-    PLANNER_PROMPT = """You are a Senior Data Scientist. 
+PLANNER_PROMPT = """You are a Senior Data Scientist. 
         Analyze the Dataset Profile provided and create a Strategic EDA Plan.
         
         1. Identify the Business Domain (e.g., Finance, Marketing, Operations).
@@ -52,12 +100,35 @@ def planning_node(state: AgentState):
         4. Outline a visualization strategy: Which segments should we compare? Which trends matter?
         
         Output your plan in clear Markdown. Focus on 'Why', not 'How'."""
-    
+
+def _planner_messages(state: AgentState):
+    profile = state.get("dataset_profile", "")
+    content = f"Dataset Profile:\n{profile}"
+    if state.get("relationships"):
+        content += f"\n\nStrongest Relationships:\n{state['relationships']}"
     # This prompt is generic because it asks the LLM to identify the domain
-    response = agent_manager.llm.invoke([
+    return [
         SystemMessage(content=PLANNER_PROMPT),
-        HumanMessage(content=f"Dataset Profile:\n{profile}")
-    ])
+        HumanMessage(content=content)
+    ]
+
+def planning_node(state: AgentState):
+    """Business logic node: Identifies domain and hypotheses."""
+    # A strategy carried over from an earlier run on the same dataset is kept
+    if state.get("strategy"):
+        return {}
+    response = get_agent_manager().llm.invoke(_planner_messages(state))
+    
+    return {
+        "strategy": response.content,
+        "llm_calls": state.get("llm_calls", 0) + 1
+    }
+
+async def aplanning_node(state: AgentState):
+    """Async variant of planning_node"""
+    if state.get("strategy"):
+        return {}
+    response = await get_agent_manager().llm.ainvoke(_planner_messages(state))
     
     return {
         "strategy": response.content,
@@ -66,9 +137,31 @@ def planning_node(state: AgentState):
 
 def designer_node(state: AgentState):
     """Technical logic node: Converts strategy to JSON."""
-    agent = agent_manager.get_agent("eda")
+    agent = get_agent_manager().get_agent("eda")
     return agent.execute_designer(state)
 
+async def adesigner_node(state: AgentState):
+    """Async variant of designer_node"""
+    agent = get_agent_manager().get_agent("eda")
+    return await agent.aexecute_designer(state)
+
+def render_node(state: AgentState):
+    """Rendering node: draws the PlotPlan against the dataset."""
+    # Imported here: pandas and the render pool are only needed once a plan exists
+    from src.tools.plot_renderer import RENDER_ENABLED, render_plot_plan
+    if not RENDER_ENABLED or not state.get("plot_plan"):
+        return {"figures": []}
+    with span("render_plot_plan", kind="tool"):
+        figures = render_plot_plan(state["plot_plan"], state["file_path"])
+    return {"figures": figures}
+
+async def arender_node(state: AgentState):
+    """Async variant of render_node: aggregation runs on the tool pool, off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _tool_executor, functools.partial(contextvars.copy_context().run, render_node, state)
+    )
+
 # src/Graph/nodes.py
 
 # def should_continue(state: AgentState):
@@ -1,12 +1,18 @@
 from langchain_core.messages import AnyMessage
 from typing_extensions import TypedDict, Annotated
+from src.utils.message_history import add_and_compact_messages
 import operator
 
 # 1. State Definition
 class AgentState(TypedDict):
-    messages: Annotated[list[AnyMessage], operator.add]
+    messages: Annotated[list[AnyMessage], add_and_compact_messages]
     file_path: str
     llm_calls: int
     dataset_profile: str
+    profile_data: dict  # latest dataset_profile_tool result, unformatted
+    relationships: str  # latest correlation_tool result, formatted
     strategy: str
-    plot_plan: dict
\ No newline at end of file
+    plot_plan: dict
+    figures: list  # one record per rendered plot, see src/tools/plot_renderer.py
+    artifacts: Annotated[dict[str, str], operator.or_]  # full tool outputs by tool_call_id
+    profile_mode: str  # default dataset_profile_tool mode for this run, e.g. "fast"
\ No newline at end of file
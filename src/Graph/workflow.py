@@ -1,24 +1,48 @@
-from src.Graph.nodes import tool_node, should_continue, llm_call, planning_node, designer_node
+from src.Graph.nodes import (
+    tool_node, should_continue, llm_call, planning_node, designer_node, render_node,
+    atool_node, allm_call, aplanning_node, adesigner_node, arender_node,
+)
 from langgraph.graph import StateGraph, START, END
 from src.Graph.state import AgentState
+from src.Graph.checkpoints import get_checkpointer, prepare_run
 from langchain_core.messages import HumanMessage
 from src.utils.logger import logger
+from src.utils.instrumentation import instrument_node, trace_run
 from dotenv import load_dotenv
-import os
+from functools import lru_cache
+from typing import Optional
+import json
 
+# LANGSMITH_API_KEY / LANGSMITH_TRACING / LANGSMITH_PROJECT / LANGSMITH_ENDPOINT
+# are read from the environment (or .env) by langsmith itself; unset ones are
+# simply left unset
 load_dotenv()
-os.environ['LANGSMITH_API_KEY'] = os.getenv('LANGSMITH_API_KEY')
-os.environ['LANGSMITH_TRACING'] = os.getenv('LANGSMITH_TRACING')
-os.environ['LANGSMITH_PROJECT'] = os.getenv('LANGSMITH_PROJECT')
-os.environ['LANGSMITH_ENDPOINT'] = os.getenv('LANGSMITH_ENDPOINT')
 
-def build_graph():
+def build_graph(use_async: bool = False, checkpointer=None):
+    """
+    Build and compile the EDA workflow graph.
+
+    With ``use_async=True`` the nodes are coroutines: LLM calls use
+    ``ainvoke`` and the tool calls of one AI message run concurrently. Run
+    such a graph with ``ainvoke``/``astream``.
+
+    Every node is wrapped with ``instrument_node``: inside ``trace_run`` each
+    execution is recorded with its latency, tokens, memory and cache hits.
+
+    With a ``checkpointer`` the state is saved after every node; runs then
+    need a ``thread_id`` in their config (see src/Graph/checkpoints.py).
+    """
     builder = StateGraph(AgentState)
     
-    builder.add_node("profiler", llm_call)
-    builder.add_node("tool_node", tool_node)
-    builder.add_node("planner", planning_node)  # The strategy brain
-    builder.add_node("designer", designer_node) # The JSON spec writer
+    nodes = {
+        "profiler": allm_call if use_async else llm_call,
+        "tool_node": atool_node if use_async else tool_node,
+        "planner": aplanning_node if use_async else planning_node,  # The strategy brain
+        "designer": adesigner_node if use_async else designer_node,  # The JSON spec writer
+        "renderer": arender_node if use_async else render_node,  # Draws the PlotPlan
+    }
+    for name, fn in nodes.items():
+        builder.add_node(name, instrument_node(name, fn))
     
     builder.add_edge(START, "profiler")
     
@@ -34,37 +58,86 @@ def build_graph():
     
     builder.add_edge("tool_node", "profiler")
     builder.add_edge("planner", "designer")
-    builder.add_edge("designer", END)
+    builder.add_edge("designer", "renderer")
+    builder.add_edge("renderer", END)
     
-    return builder.compile()
+    return builder.compile(checkpointer=checkpointer)
 
 
+@lru_cache(maxsize=2)
+def get_compiled_graph(use_async: bool = False):
+    """
+    Build the workflow graph once per process and reuse it across runs.
 
+    The sync graph (CLI, Streamlit job queue) is checkpointed with
+    ``get_checkpointer``; batch runs on the async graph resume from their
+    results file instead.
+    """
+    return build_graph(use_async=use_async, checkpointer=None if use_async else get_checkpointer())
 
-def run_workflow_with_streaming(query: str, file_path: str):
-    """Run workflow with streaming updates and display specific state outputs"""
-    
-    agent = build_graph()
-    save_graph_image(agent, "eda_workflow.jpg")
-    
-    inputs = {
+
+def _initial_state(query: str, file_path: str) -> dict:
+    return {
         "messages": [HumanMessage(content=query)],
         "file_path": file_path,
         "llm_calls": 0,
         "dataset_profile": "", # Initialize for clarity
+        "profile_data": {},
+        "relationships": "",
         "strategy": "",
-        "plot_plan": {}
+        "plot_plan": {},
+        "figures": []
     }
+
+
+def run_workflow_with_streaming(query: str, file_path: str, graph_image_path: Optional[str] = None):
+    """
+    Run the workflow once, streaming node updates and returning the final state.
+
+    The final state is taken from the last ``values`` snapshot of the same
+    stream, so the graph (and every LLM call in it) executes exactly once.
+    Pass ``graph_image_path`` to also render the mermaid diagram, which needs
+    a network round trip. With TRACE_EXPORT on, a per-node trace of the run
+    is exported to TRACE_DIR (see src/utils/instrumentation.py).
+
+    With checkpointing on, asking the same question about the same data
+    again returns the stored answer, a run that failed part-way resumes
+    after its last completed node, and a new question reuses the profile
+    and strategy of an earlier run on the dataset.
+    """
+    
+    agent = get_compiled_graph()
+    if graph_image_path:
+        save_graph_image(agent, graph_image_path)
+    
+    inputs = _initial_state(query, file_path)
     
     logger.info("=" * 80)
     logger.info(f"Starting workflow for: {file_path}")
     logger.info("=" * 80)
     
-    # Stream events to observe state changes
+    with trace_run():
+        final_state = _stream_and_print(agent, inputs)
+    
+    logger.info("WORKFLOW COMPLETE")
+    return final_state
+
+def _stream_and_print(agent, inputs: dict) -> dict:
+    run_inputs, config, finished_state = prepare_run(agent, inputs)
+    if finished_state is not None:
+        return finished_state
+
+    # Stream node updates for logging and full state snapshots for the result
     final_state = inputs
-    for event in agent.stream(inputs, stream_mode="updates"):
-        for node_name, node_output in event.items():
+    for mode, chunk in agent.stream(run_inputs, config, stream_mode=["updates", "values"]):
+        if mode == "values":
+            final_state = chunk
+            continue
+
+        for node_name, node_output in chunk.items():
             logger.info(f"\nNode Completed: {node_name}")
+            if not node_output:
+                continue
             
             # Print the Profile if the profiler/tool_node just updated it
             if "dataset_profile" in node_output and node_output["dataset_profile"]:
@@ -72,21 +145,45 @@ def run_workflow_with_streaming(query: str, file_path: str):
                 print(node_output["dataset_profile"])
                 print("=" * 77 + "\n")
 
+            # Print the relationships if the tool_node just computed them
+            if node_output.get("relationships"):
+                print("\n" + "=" * 30 + " RELATIONSHIPS " + "=" * 32)
+                print(node_output["relationships"])
+                print("=" * 77 + "\n")
+
             # Print the Plot Plan if the designer node just finished
             if "plot_plan" in node_output and node_output["plot_plan"]:
-                import json
                 print("\n" + "=" * 30 + " FINAL PLOT JSON " + "=" * 30)
                 print(json.dumps(node_output["plot_plan"], indent=2))
                 print("=" * 77 + "\n")
-        
-        # Keep track of the full state
-        final_state.update(event)
-    
-    # Final result invocation to get the absolute last state
-    final_result = agent.invoke(inputs)
-    
-    logger.info("WORKFLOW COMPLETE")
-    return final_result
+
+            # List the figures once the renderer has drawn the plan
+            if node_output.get("figures"):
+                print("\n" + "=" * 30 + " FIGURES " + "=" * 38)
+                for figure in node_output["figures"]:
+                    target = figure.get("path") or f"skipped: {figure.get('error')}"
+                    print(f"{figure['type']} ({figure.get('x')}, {figure.get('y')}): {target}")
+                print("=" * 77 + "\n")
+    return final_state
+
+async def arun_workflow(query: str, file_path: str) -> dict:
+    """
+    Run the async workflow graph and return the final state.
+
+    Must be awaited from an event loop; several runs can share one loop.
+    """
+    agent = get_compiled_graph(use_async=True)
+    final_state = _initial_state(query, file_path)
+    logger.info(f"Starting async workflow for: {file_path}")
+    with trace_run():
+        async for mode, chunk in agent.astream(final_state, stream_mode=["updates", "values"]):
+            if mode == "values":
+                final_state = chunk
+            else:
+                for node_name in chunk:
+                    logger.info(f"Node Completed: {node_name}")
+    logger.info("ASYNC WORKFLOW COMPLETE")
+    return final_state
 
 def save_graph_image(agent, filename="workflow_graph.jpg"):
     """Saves the LangGraph workflow visualization as an image"""
@@ -104,7 +201,8 @@ def save_graph_image(agent, filename="workflow_graph.jpg"):
 if __name__ == "__main__":
     result = run_workflow_with_streaming(
         query="Give me a summary of the columns and entire dataset.",
-        file_path="data/data.csv"
+        file_path="data/data.csv",
+        graph_image_path="eda_workflow.jpg"
     )
     
     print("\n" + "=" * 80)
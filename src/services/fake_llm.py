@@ -0,0 +1,139 @@
+import asyncio
+import json
+import math
+import time
+import uuid
+from typing import Any, List, Optional, Sequence
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+
+STRATEGY_RESPONSE = """## Business Domain
+Operations analytics.
+
+## Target Variable
+The last column, tracked as the primary outcome.
+
+## Hypotheses
+1. Numeric drivers shift the target mean.
+2. Categorical segments differ in target distribution.
+3. Missing values cluster in specific segments.
+4. Outliers concentrate in a few features.
+5. Duplicate rows inflate segment counts.
+
+## Visualization Strategy
+Compare segments against the target and check distributions of numeric drivers."""
+
+PLOT_PLAN_RESPONSE = json.dumps({
+    "plots": [
+        {"type": "histogram", "x": "<numeric>", "bins": 30},
+        {"type": "box", "x": "<categorical>", "y": "<target>"},
+        {"type": "scatter", "x": "<numeric>", "y": "<target>", "sample_rows": 50000},
+    ]
+})
+
+PROFILER_SUMMARY = """1. DATASET_SNAPSHOT
+- Dimensions, target and distribution taken from the profile above.
+2. FEATURE_REGISTRY
+| Column Name | Logical Type | Data Stats | Technical Directive |
+| :--- | :--- | :--- | :--- |
+3. DATA_QUALITY_ALERTS
+- None blocking.
+4. AGENT_INSTRUCTIONS
+- Scale numeric features; one-hot encode low-cardinality categoricals."""
+
+
+def _approx_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Deterministic offline chat model that follows the EDA workflow script.
+
+    Responds the way the real model does at each step so the whole graph can
+    run without credentials:
+
+    - with tools bound and no tool result since the last human message, it
+      calls every bound tool in one message, as a model gathering data in
+      parallel does (``file_path`` is filled in by the tool node);
+    - to the designer prompt it returns a fixed PlotPlan JSON;
+    - to the planner prompt it returns a fixed Markdown strategy;
+    - otherwise it returns a short profiler summary.
+
+    Every call sleeps ``latency_seconds`` (``asyncio.sleep`` for async calls)
+    to stand in for network time and reports ``usage_metadata`` estimated at
+    ~4 characters per token.
+    """
+
+    latency_seconds: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"latency_seconds": self.latency_seconds}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        """Bind tools the way chat model integrations do (as ``tools`` kwargs)"""
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _respond(self, messages: List[BaseMessage], tools: Optional[list]) -> AIMessage:
+        system = messages[0].content if messages else ""
+        last_human = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1
+        )
+        tool_answered = any(isinstance(m, ToolMessage) for m in messages[last_human + 1:])
+
+        if tools and not tool_answered:
+            tool_calls = [
+                {"name": tool["function"]["name"], "args": {"file_path": ""}, "id": f"call_{uuid.uuid4().hex[:8]}"}
+                for tool in tools
+            ]
+            message = AIMessage(content="", tool_calls=tool_calls)
+        elif "Visualization Expert" in system:
+            message = AIMessage(content=PLOT_PLAN_RESPONSE)
+        elif "Senior Data Scientist" in system:
+            message = AIMessage(content=STRATEGY_RESPONSE)
+        else:
+            message = AIMessage(content=PROFILER_SUMMARY)
+
+        prompt_tokens = sum(_approx_tokens(str(m.content)) for m in messages)
+        completion_tokens = _approx_tokens(message.content) + 10 * len(message.tool_calls)
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        self.calls += 1
+        return message
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        message = self._respond(messages, kwargs.get("tools"))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        message = self._respond(messages, kwargs.get("tools"))
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from src.utils.instrumentation import trace_run
+from src.utils.logger import logger
+
+
+# Analysis runs executing at once in this process; further jobs wait in FIFO order.
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "4"))
+# Finished jobs kept for lookup before the oldest are forgotten.
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "200"))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+_FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class Job:
+    """State of one analysis request, updated by the worker thread running it."""
+
+    def __init__(self, inputs: dict):
+        self.id = uuid.uuid4().hex[:12]
+        self.inputs = inputs
+        self.status = QUEUED
+        self.progress: list = []  # (node name, seconds since start) per completed node
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in _FINISHED
+
+    def snapshot(self) -> dict:
+        """JSON-friendly view of the job for UIs and logs."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": list(self.progress),
+            "error": self.error,
+            "queued_seconds": round((self.started_at or time.time()) - self.created_at, 3),
+            "elapsed_seconds": round(
+                (self.finished_at or time.time()) - self.started_at, 3
+            ) if self.started_at else 0.0,
+        }
+
+
+class JobQueue:
+    """
+    Runs workflow invocations on a bounded worker pool, keyed by job ID.
+
+    ``submit`` returns immediately; callers poll ``get`` for status, the
+    nodes completed so far and, once done, the final state. At most
+    ``max_workers`` runs execute concurrently per process, so a slow run only
+    delays jobs queued behind a full pool, never other sessions' UI.
+
+    Cancellation is cooperative: a queued job is dropped before it starts; a
+    running job stops after the node currently executing (LLM calls in
+    flight are not interrupted). On a checkpointed graph, submitting the
+    same inputs again resumes a cancelled or failed run.
+    """
+
+    def __init__(self, max_workers: int = ANALYSIS_WORKERS, history: int = JOB_HISTORY):
+        self.max_workers = max_workers
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="eda-job")
+        self._jobs: dict = {}
+        self._lock = threading.Lock()
+
+    def submit(self, inputs: dict, graph: Any = None) -> str:
+        """
+        Queue a workflow run and return its job ID.
+
+        ``inputs`` is the initial graph state; ``graph`` defaults to the
+        shared compiled sync graph.
+        """
+        job = Job(inputs)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job, graph)
+        logger.info(f"Job {job.id} queued")
+        return job.id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation; returns False if the job is unknown or already finished."""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            # Never started: the worker will not run it
+            job.status = CANCELLED
+            job.finished_at = time.time()
+        return True
+
+    def stats(self) -> dict:
+        """Job counts by status."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {status: 0 for status in (QUEUED, RUNNING, *_FINISHED)}
+        for job in jobs:
+            counts[job.status] += 1
+        return {"max_workers": self.max_workers, **counts}
+
+    def _run(self, job: Job, graph: Any) -> None:
+        if job.cancel_event.is_set():
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            return
+        if graph is None:
+            from src.Graph.workflow import get_compiled_graph
+            graph = get_compiled_graph()
+        from src.Graph.checkpoints import prepare_run
+
+        job.status = RUNNING
+        job.started_at = time.time()
+        final_state = job.inputs
+        try:
+            with trace_run(run_id=job.id):
+                # A repeated question returns its stored state; a failed or
+                # cancelled one resumes from its last completed node
+                run_inputs, config, finished_state = prepare_run(graph, job.inputs)
+                if finished_state is not None:
+                    final_state = finished_state
+                else:
+                    for mode, chunk in graph.stream(run_inputs, config, stream_mode=["updates", "values"]):
+                        if mode == "values":
+                            final_state = chunk
+                            continue
+                        for node_name in chunk:
+                            job.progress.append((node_name, round(time.time() - job.started_at, 3)))
+                        if job.cancel_event.is_set():
+                            break
+            job.result = final_state
+            job.status = CANCELLED if job.cancel_event.is_set() else DONE
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            logger.info(f"Job {job.id} {job.status} after {job.finished_at - job.started_at:.1f}s")
+
+    def _prune(self) -> None:
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in sorted(finished, key=lambda j: j.finished_at)[: max(len(finished) - self.history, 0)]:
+            del self._jobs[job.id]
+
+
+# Singleton instance shared by every Streamlit session in the process
+job_queue = JobQueue()
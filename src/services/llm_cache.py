@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from src.utils.instrumentation import record_cache_hit
+
+
+CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", "data/cache/llm_responses.sqlite"))
+CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168")) * 3600
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024
+CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+
+# Message fields that vary between otherwise identical calls
+_VOLATILE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if k not in _VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        # Prompts are built from indented f-strings; trailing spaces are noise
+        return "\n".join(line.rstrip() for line in value.strip().splitlines())
+    return value
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """
+    Hash a serialized prompt and model configuration into a cache key.
+
+    ``prompt`` is the serialized message list LangChain passes to caches and
+    ``llm_string`` encodes the model, its parameters and any bound tools, so
+    a different model, temperature or tool set never shares an entry.
+    """
+    try:
+        prompt = json.dumps(_normalize(json.loads(prompt)), sort_keys=True)
+    except ValueError:
+        pass
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+
+def _serialize(generations: list) -> str:
+    payload = []
+    for gen in generations:
+        if isinstance(gen, ChatGeneration):
+            payload.append({"message": message_to_dict(gen.message)})
+        else:
+            payload.append({"text": gen.text})
+    return json.dumps(payload)
+
+
+def _deserialize(value: str) -> list:
+    generations = []
+    for item in json.loads(value):
+        if "message" in item:
+            generations.append(ChatGeneration(message=messages_from_dict([item["message"]])[0]))
+        else:
+            generations.append(Generation(text=item["text"]))
+    return generations
+
+
+class SQLiteResponseCache(BaseCache):
+    """
+    Persistent LLM response cache stored in a local SQLite file.
+
+    Plugs into LangChain through ``BaseCache`` (pass it as ``cache=`` to a
+    chat model), so cached calls return without touching the network. Entries
+    expire after ``ttl_seconds``; once the cache holds more than
+    ``max_entries`` rows or ``max_bytes`` of payload, the least recently used
+    entries are evicted. Hit/miss counters are kept per process.
+
+    One SQLite connection is opened on first use and shared by every thread
+    that calls the model; the instance lock serializes access to it.
+    """
+
+    def __init__(
+        self,
+        path: Path = CACHE_PATH,
+        ttl_seconds: Optional[float] = CACHE_TTL_SECONDS,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """The shared connection, opened on first use. Call with ``_lock`` held."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[list]:
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            # The connection's context manager commits; it does not close
+            with self._connection() as conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.expired += 1
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        record_cache_hit("llm")
+        return _deserialize(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: list) -> None:
+        key = cache_key(prompt, llm_string)
+        value = _serialize(return_val)
+        now = time.time()
+        with self._lock:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value), now, now)
+                )
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        for key, size in conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            self.evictions += 1
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            if self._conn is not None or self.path.exists():
+                with self._connection() as conn:
+                    conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the shared connection; the next call reopens it."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict:
+        """Hit/miss/expiry/eviction counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+_default_cache: Optional[SQLiteResponseCache] = None
+
+
+def get_default_llm_cache() -> Optional[SQLiteResponseCache]:
+    """Process-wide response cache, or None when LLM_CACHE_ENABLED is off."""
+    global _default_cache
+    if not CACHE_ENABLED:
+        return None
+    if _default_cache is None:
+        _default_cache = SQLiteResponseCache()
+    return _default_cache
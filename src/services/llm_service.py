@@ -2,9 +2,19 @@ from dotenv import load_dotenv
 import os
 from typing import Iterable, Optional
 
-from langchain.chat_models import init_chat_model
+from langchain_core.caches import BaseCache
+from langchain_core.rate_limiters import BaseRateLimiter
 from langchain_core.tools import BaseTool
 
+from src.services.llm_cache import get_default_llm_cache
+from src.utils.instrumentation import token_usage_callback
+
+# Chat model used across the app. LLM_PROVIDER=fake selects the scripted
+# offline model (src/services/fake_llm.py) used by the benchmarks.
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-5-chat")
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "azure_openai")
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0")) / 1000
+
 
 def _configure_env() -> None:
     """
@@ -21,25 +31,57 @@ def _configure_env() -> None:
     os.environ["AZURE_OPENAI_ENDPOINT"] = os.getenv("AZURE_OPENAI_ENDPOINT", "")
 
 
-def get_chat_model(temperature: float = 0.0):
+def get_chat_model(
+    temperature: float = 0.0,
+    rate_limiter: Optional[BaseRateLimiter] = None,
+    cache: Optional[BaseCache] = None,
+):
     """
-    Initialize and return the Azure OpenAI chat model used across the app.
+    Initialize and return the chat model used across the app.
+
+    The model and provider come from LLM_MODEL / LLM_PROVIDER (default
+    ``gpt-5-chat`` on ``azure_openai``). With ``LLM_PROVIDER=fake`` a
+    ``ScriptedChatModel`` is returned instead, which needs no credentials and
+    sleeps FAKE_LLM_LATENCY_MS per call.
 
     Parameters
     ----------
     temperature : float, default 0.0
         Sampling temperature for the model.
+    rate_limiter : Optional[BaseRateLimiter]
+        Limiter applied to every request made through this model. Share one
+        instance between models to enforce a global request rate.
+    cache : Optional[BaseCache]
+        Response cache consulted before every request. Defaults to the local
+        SQLite cache (src/services/llm_cache.py) for deterministic
+        temperature 0.0 models; set LLM_CACHE_ENABLED=false to disable.
 
     Returns
     -------
-    langchain_openai.chat_models.azure.AzureChatOpenAI
+    langchain_core.language_models.BaseChatModel
         Configured chat model instance.
     """
+    if cache is None and temperature == 0.0:
+        cache = get_default_llm_cache()
+    if LLM_PROVIDER == "fake":
+        from src.services.fake_llm import ScriptedChatModel
+        return ScriptedChatModel(
+            latency_seconds=FAKE_LLM_LATENCY_SECONDS,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            callbacks=[token_usage_callback],
+        )
+    # Imported here: the provider SDK is only loaded once a model is needed
+    from langchain.chat_models import init_chat_model
     _configure_env()
     return init_chat_model(
-        "gpt-5-chat",
-        model_provider="azure_openai",
+        LLM_MODEL,
+        model_provider=LLM_PROVIDER,
         temperature=temperature,
+        rate_limiter=rate_limiter,
+        cache=cache,
+        # Token usage is attributed to the active workflow span, if any
+        callbacks=[token_usage_callback],
     )
 
 
@@ -0,0 +1,89 @@
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import BinaryIO
+
+import pandas as pd
+
+
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "data/uploads"))
+_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def _safe_name(name: str) -> str:
+    name = Path(name).name
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name) or "upload.csv"
+
+
+def _chunks(fileobj: BinaryIO):
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(_CHUNK_BYTES), b""):
+        yield chunk
+    fileobj.seek(0)
+
+
+def content_digest(fileobj: BinaryIO) -> str:
+    """SHA-256 of a file-like object's content, read in 8 MB chunks."""
+    h = hashlib.sha256()
+    for chunk in _chunks(fileobj):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def save_upload(fileobj: BinaryIO, name: str, upload_dir: Path = UPLOAD_DIR) -> tuple:
+    """
+    Store an uploaded file under a content-addressed path, writing it only once.
+
+    Parameters
+    ----------
+    fileobj : binary file-like
+        The upload (e.g. a Streamlit ``UploadedFile``); must support seek.
+    name : str
+        Original file name, kept as the last path component.
+    upload_dir : Path
+        Root directory for uploads. Defaults to UPLOAD_DIR (data/uploads).
+
+    Returns
+    -------
+    tuple[str, str]
+        ``(file_path, digest)`` where ``file_path`` is
+        ``<upload_dir>/<digest[:16]>/<name>``.
+
+    Notes
+    -----
+    - When that path already exists, nothing is written. The same content
+      uploaded again maps to the same path, so profile, columnar and LLM
+      caches keyed on the path or content keep hitting.
+    - New content is streamed in 8 MB chunks to a temporary file and renamed
+      into place, so a partial write is never visible.
+    """
+    digest = content_digest(fileobj)
+    path = Path(upload_dir) / digest[:16] / _safe_name(name)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            for chunk in _chunks(fileobj):
+                f.write(chunk)
+        os.replace(tmp, path)
+    return str(path), digest
+
+
+def csv_shape(file_path: str) -> tuple:
+    """
+    ``(rows, columns)`` of a CSV without parsing it.
+
+    Rows are counted as newlines after the header (plus an unterminated last
+    line), so quoted fields that contain newlines are over-counted.
+    """
+    columns = len(pd.read_csv(file_path, nrows=0).columns)
+    lines = 0
+    last = b"\n"
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_BYTES), b""):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0), columns
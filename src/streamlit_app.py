@@ -8,7 +8,10 @@ import os
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from src.Graph.workflow import build_graph
+from src.Graph.workflow import get_compiled_graph
+from src.services.job_queue import job_queue, DONE, FAILED
+from src.services.upload_manager import csv_shape, save_upload
+from src.tools.columnar_cache import read_dataset
 from langchain_core.messages import HumanMessage
 
 # Page config
@@ -20,7 +23,7 @@ st.set_page_config(
 
 # Initialize session state
 if 'agent' not in st.session_state:
-    st.session_state.agent = build_graph()
+    st.session_state.agent = get_compiled_graph()
 
 if 'file_path' not in st.session_state:
     st.session_state.file_path = None
@@ -28,6 +31,23 @@ if 'file_path' not in st.session_state:
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
 
+if 'active_job' not in st.session_state:
+    st.session_state.active_job = None
+
+if 'upload' not in st.session_state:
+    st.session_state.upload = None
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def upload_preview(digest: str, file_path: str):
+    """
+    First rows and shape of an upload; cached by content hash across reruns and sessions.
+
+    Read through the columnar copy, whose conversion the profiling run then reuses.
+    """
+    return read_dataset(file_path, nrows=5), csv_shape(file_path)
+
+
 # Title
 st.title("🤖 Multi-Agent Data Science Workflow")
 st.markdown("Upload your CSV and let AI agents analyze your data!")
@@ -39,22 +59,22 @@ with st.sidebar:
     uploaded_file = st.file_uploader("Choose a CSV file", type=['csv'])
     
     if uploaded_file is not None:
-        # Save uploaded file
-        upload_dir = Path("data/uploads")
-        upload_dir.mkdir(parents=True, exist_ok=True)
+        # Save each upload once: reruns with the same upload skip hashing and
+        # writing, and identical content is stored at a single path
+        upload = st.session_state.upload
+        if upload is None or upload["file_id"] != uploaded_file.file_id:
+            file_path, digest = save_upload(uploaded_file, uploaded_file.name)
+            upload = {"file_id": uploaded_file.file_id, "file_path": file_path, "digest": digest}
+            st.session_state.upload = upload
         
-        file_path = upload_dir / uploaded_file.name
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        
-        st.session_state.file_path = str(file_path)
+        st.session_state.file_path = upload["file_path"]
         st.success(f"✅ File uploaded: {uploaded_file.name}")
         
         # Show data preview
         with st.expander("📊 Data Preview"):
-            df = pd.read_csv(file_path, nrows=5)
+            df, (n_rows, n_cols) = upload_preview(upload["digest"], upload["file_path"])
             st.dataframe(df)
-            st.info(f"Shape: {df.shape[0]} rows × {df.shape[1]} columns (showing first 5 rows)")
+            st.info(f"Shape: {n_rows} rows × {n_cols} columns (showing first 5 rows)")
     
     st.divider()
     
@@ -92,65 +112,74 @@ st.header("💬 Chat with Your Data")
 for message in st.session_state.chat_history:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
+        for figure in message.get("figures", []):
+            st.image(figure)
+
+
+def submit_query(query: str):
+    """Queue an analysis run in the background worker pool and remember its job ID"""
+    st.session_state.chat_history.append({"role": "user", "content": query})
+    inputs = {
+        "messages": [HumanMessage(content=query)],
+        "file_path": st.session_state.file_path,
+        "llm_calls": 0,
+        # Sampled profile first; the exact one is cached in the background
+        "profile_mode": "fast"
+    }
+    st.session_state.active_job = job_queue.submit(inputs, graph=st.session_state.agent)
+
+
+@st.fragment(run_every=1.0)
+def show_active_job():
+    """Poll the running job, streaming completed nodes until it finishes"""
+    job = job_queue.get(st.session_state.active_job)
+    if job is None:
+        st.session_state.active_job = None
+        return
+
+    with st.chat_message("assistant"):
+        if not job.finished:
+            done = ", ".join(f"{node} ({seconds:.1f}s)" for node, seconds in job.progress)
+            st.markdown(f"🤔 Analyzing... job `{job.id}` is {job.status}")
+            if done:
+                st.caption(f"Completed: {done}")
+            if st.button("⏹️ Cancel", key=f"cancel-{job.id}"):
+                job_queue.cancel(job.id)
+            return
+
+    figures = []
+    if job.status == DONE:
+        response = job.result['messages'][-1].content
+        response += f"\n\n_🔄 LLM Calls: {job.result.get('llm_calls', 0)}_"
+        figures = [f["path"] for f in job.result.get("figures", []) if f.get("path")]
+    elif job.status == FAILED:
+        response = f"⚠️ Analysis failed: {job.error}"
+    else:
+        response = "⏹️ Analysis cancelled."
+    st.session_state.chat_history.append({"role": "assistant", "content": response, "figures": figures})
+    st.session_state.active_job = None
+    st.rerun(scope="app")
+
 
 # Handle quick query button clicks
 if 'quick_query' in st.session_state and st.session_state.quick_query:
     query = st.session_state.quick_query
     st.session_state.quick_query = None  # Clear it
     
-    # Add to chat history
-    st.session_state.chat_history.append({"role": "user", "content": query})
-    
-    # Process query
-    if st.session_state.file_path:
-        with st.chat_message("user"):
-            st.markdown(query)
-        
-        with st.chat_message("assistant"):
-            with st.spinner("🤔 Analyzing..."):
-                inputs = {
-                    "messages": [HumanMessage(content=query)],
-                    "file_path": st.session_state.file_path,
-                    "llm_calls": 0
-                }
-                
-                result = st.session_state.agent.invoke(inputs)
-                response = result['messages'][-1].content
-                
-                st.markdown(response)
-                st.caption(f"🔄 LLM Calls: {result.get('llm_calls', 0)}")
-        
-        st.session_state.chat_history.append({"role": "assistant", "content": response})
+    if st.session_state.file_path and not st.session_state.active_job:
+        submit_query(query)
         st.rerun()
 
+# Progress of the background analysis, if one is running
+if st.session_state.active_job:
+    show_active_job()
+
 # Chat input
-if prompt := st.chat_input("Ask me anything about your data..."):
+if prompt := st.chat_input("Ask me anything about your data...", disabled=bool(st.session_state.active_job)):
     if not st.session_state.file_path:
         st.warning("⚠️ Please upload a CSV file first!")
     else:
-        # Add user message to chat
-        st.session_state.chat_history.append({"role": "user", "content": prompt})
-        
-        with st.chat_message("user"):
-            st.markdown(prompt)
-        
-        # Get agent response
-        with st.chat_message("assistant"):
-            with st.spinner("🤔 Analyzing..."):
-                inputs = {
-                    "messages": [HumanMessage(content=prompt)],
-                    "file_path": st.session_state.file_path,
-                    "llm_calls": 0
-                }
-                
-                result = st.session_state.agent.invoke(inputs)
-                response = result['messages'][-1].content
-                
-                st.markdown(response)
-                st.caption(f"🔄 LLM Calls: {result.get('llm_calls', 0)}")
-        
-        # Add assistant response to chat
-        st.session_state.chat_history.append({"role": "assistant", "content": response})
+        submit_query(prompt)
         st.rerun()
 
 # Footer
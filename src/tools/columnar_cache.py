@@ -0,0 +1,145 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import pandas as pd
+
+from src.utils.logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional; without it every load parses the CSV
+    pa = None
+    feather = None
+
+
+COLUMNAR_DIR = Path(os.getenv("COLUMNAR_CACHE_DIR", "data/columnar"))
+# CSVs above this size are not converted (conversion loads the file once in full).
+COLUMNAR_MAX_BYTES = int(os.getenv("COLUMNAR_MAX_MB", "1024")) * 1024 * 1024
+
+_SOURCE_SIZE = b"eda_source_size"
+_SOURCE_MTIME = b"eda_source_mtime_ns"
+
+
+def columnar_path(file_path: str) -> Path:
+    """Location of the Arrow copy of ``file_path`` inside COLUMNAR_DIR."""
+    source = os.path.realpath(file_path)
+    tag = hashlib.sha1(source.encode()).hexdigest()[:12]
+    return COLUMNAR_DIR / f"{Path(source).stem}-{tag}.arrow"
+
+
+def fresh_columnar_path(file_path: str) -> Optional[Path]:
+    """
+    Return the Arrow copy of ``file_path`` if it exists and matches the CSV.
+
+    Freshness is checked against the source size and mtime recorded in the
+    Arrow schema metadata at conversion time.
+    """
+    if pa is None:
+        return None
+    path = columnar_path(file_path)
+    if not path.exists():
+        return None
+    st = os.stat(file_path)
+    try:
+        with pa.memory_map(str(path)) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    if (
+        metadata.get(_SOURCE_SIZE) == str(st.st_size).encode()
+        and metadata.get(_SOURCE_MTIME) == str(st.st_mtime_ns).encode()
+    ):
+        return path
+    return None
+
+
+def ensure_columnar(file_path: str) -> Optional[Path]:
+    """
+    Convert a CSV to an uncompressed Arrow IPC (Feather v2) file once.
+
+    Returns the path of a fresh Arrow copy, or None when pyarrow is not
+    installed, the CSV is larger than COLUMNAR_MAX_MB, or its columns cannot
+    be represented in Arrow (e.g. mixed-type object columns).
+    """
+    path = fresh_columnar_path(file_path)
+    if path is not None or pa is None:
+        return path
+
+    st = os.stat(file_path)
+    if st.st_size > COLUMNAR_MAX_BYTES:
+        return None
+
+    try:
+        table = pa.Table.from_pandas(pd.read_csv(file_path), preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+        logger.warning(f"Columnar conversion skipped for {file_path}: {e}")
+        return None
+
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        _SOURCE_SIZE: str(st.st_size).encode(),
+        _SOURCE_MTIME: str(st.st_mtime_ns).encode(),
+    })
+
+    path = columnar_path(file_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    # Uncompressed so later reads can memory-map the buffers without copying
+    feather.write_feather(table, str(tmp), compression="uncompressed")
+    os.replace(tmp, path)
+    logger.info(f"Columnar copy written: {path}")
+    return path
+
+
+def read_dataset(
+    file_path: str,
+    columns: Optional[Sequence[str]] = None,
+    nrows: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Load a dataset, preferring its memory-mapped Arrow copy over the CSV.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the source CSV file.
+    columns : sequence of str, optional
+        Only load these columns.
+    nrows : int, optional
+        Only load the first ``nrows`` rows.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Same dtypes as ``pd.read_csv(file_path)`` would produce.
+    """
+    path = ensure_columnar(file_path)
+    if path is None:
+        return pd.read_csv(file_path, usecols=columns, nrows=nrows)
+
+    table = feather.read_table(
+        str(path),
+        columns=list(columns) if columns is not None else None,
+        memory_map=True
+    )
+    if nrows is not None:
+        table = table.slice(0, nrows)
+    return table.to_pandas()
+
+
+def iter_columnar_chunks(
+    path: Path,
+    chunksize: int,
+    columns: Optional[Sequence[str]] = None
+) -> Iterable[pd.DataFrame]:
+    """Yield DataFrame chunks (of only ``columns``, if given) from a memory-mapped Arrow file."""
+    table = feather.read_table(
+        str(path),
+        columns=list(columns) if columns is not None else None,
+        memory_map=True
+    )
+    for batch in table.to_batches(max_chunksize=chunksize):
+        yield batch.to_pandas()
@@ -0,0 +1,386 @@
+import os
+import tempfile
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Strongest pairs returned per measure.
+CORR_TOP_K = int(os.getenv("CORR_TOP_K", "20"))
+# Working memory for the blocked products, in MB. Prepared columns beyond it
+# are kept in a temporary memory-mapped file.
+CORR_MEMORY_MB = int(os.getenv("CORR_MEMORY_MB", "256"))
+# Most columns in one block of a block-pair product.
+CORR_BLOCK_COLUMNS = int(os.getenv("CORR_BLOCK_COLUMNS", "512"))
+# Larger tables are correlated on a uniform sample of this many rows.
+CORR_MAX_ROWS = int(os.getenv("CORR_MAX_ROWS", "200000"))
+# Categorical columns with more levels than this are skipped for Cramér's V.
+CORR_MAX_LEVELS = int(os.getenv("CORR_MAX_LEVELS", "50"))
+
+METHODS = ("pearson", "spearman")
+# Pairs observed together on fewer rows are not reported
+_MIN_PERIODS = 3
+# float32 arrays alive per row chunk of a block-pair product
+_CHUNK_ARRAYS = 8
+# Bytes budgeted per loaded value: the value plus its prepared float32 copy,
+# with headroom for strings
+_VALUE_BYTES = 16
+
+
+class _TopK:
+    """Running top-k of pairs by absolute value."""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.scores = np.empty(0)
+        self.rows: list = []
+
+    def offer(self, scores: np.ndarray, rows: list) -> None:
+        if self.k <= 0 or not len(scores):
+            return
+        scores = np.concatenate([self.scores, scores])
+        rows = self.rows + rows
+        if len(scores) > self.k:
+            keep = np.argpartition(-np.abs(scores), self.k - 1)[: self.k]
+            scores, rows = scores[keep], [rows[i] for i in keep]
+        self.scores, self.rows = scores, rows
+
+    def result(self) -> list:
+        order = sorted(
+            range(len(self.rows)),
+            key=lambda i: (-abs(self.scores[i]), str(self.rows[i]["x"]), str(self.rows[i]["y"]))
+        )
+        return [self.rows[i] for i in order]
+
+
+def _budget(memory_mb: Optional[int]) -> int:
+    return (memory_mb or CORR_MEMORY_MB) * 1024 * 1024
+
+
+def _dtype(name: str):
+    try:
+        return pd.api.types.pandas_dtype(name)
+    except (TypeError, ValueError):
+        return None
+
+
+def correlation_columns(profile: dict) -> list:
+    """
+    Columns of a profiled table that ``relationship_summary`` can use.
+
+    Numeric and bool columns with at least 3 values, and other non-datetime
+    columns with 2 to CORR_MAX_LEVELS distinct values, read off the
+    profile's dtypes, null counts and distinct counts. For a sampled
+    profile the lower ends of the distinct-count intervals are used, so no
+    candidate is dropped on an overestimate; the pair functions check the
+    loaded columns again. Columns with unrecognized dtypes are kept.
+    """
+    rows = profile["shape"]["rows"]
+    intervals = profile.get("sampling", {}).get("intervals", {}).get("unique_values", {})
+    columns = []
+    for col in profile["columns"]:
+        dtype = _dtype(profile["dtypes"][col])
+        if dtype is None:
+            columns.append(col)
+        elif pd.api.types.is_numeric_dtype(dtype):
+            if rows - profile["nulls"][col]["null_count"] >= _MIN_PERIODS:
+                columns.append(col)
+        elif not pd.api.types.is_datetime64_any_dtype(dtype):
+            unique = intervals.get(col, [profile["unique_values"][col]])[0]
+            if 2 <= unique <= CORR_MAX_LEVELS:
+                columns.append(col)
+    return columns
+
+
+def sample_limit(n_columns: int, memory_mb: Optional[int] = None) -> int:
+    """Rows of ``n_columns`` columns to load within the budget, at most CORR_MAX_ROWS."""
+    return max(_MIN_PERIODS, min(CORR_MAX_ROWS, _budget(memory_mb) // (max(n_columns, 1) * _VALUE_BYTES)))
+
+
+def _sample_rows(df: pd.DataFrame) -> pd.DataFrame:
+    if len(df) > CORR_MAX_ROWS:
+        return df.sample(CORR_MAX_ROWS, random_state=0)
+    return df
+
+
+def _storage(n_rows: int, n_cols: int, budget: int):
+    """Column-major float32 matrix, in memory if it fits the budget, else memory-mapped."""
+    if n_rows * n_cols * 4 <= budget:
+        return np.empty((n_rows, n_cols), dtype=np.float32, order="F")
+    return np.memmap(tempfile.TemporaryFile(), dtype=np.float32, mode="w+", shape=(n_rows, n_cols), order="F")
+
+
+def _prepare(df: pd.DataFrame, columns: list, method: str, budget: int) -> tuple:
+    """
+    Centered float32 copy of ``columns`` (ranks for Spearman), NaN kept.
+
+    Columns are converted a few at a time so the float64 temporaries stay
+    within the budget. Returns ``(matrix, has_nulls)``.
+    """
+    n_rows = len(df)
+    matrix = _storage(n_rows, len(columns), budget)
+    has_nulls = np.zeros(len(columns), dtype=bool)
+    width = max(1, budget // max(n_rows * 8 * 3, 1))
+    for start in range(0, len(columns), width):
+        block = df[columns[start:start + width]]
+        if method == "spearman":
+            block = block.rank()
+        values = block.to_numpy(dtype="float64", na_value=np.nan, copy=True)
+        nulls = np.isnan(values)
+        values -= np.nanmean(values, axis=0)
+        matrix[:, start:start + width] = values
+        has_nulls[start:start + width] = nulls.any(axis=0)
+    return matrix, has_nulls
+
+
+def _block_correlation(matrix, left: slice, right: slice, nulls: bool, chunk_rows: int) -> tuple:
+    """
+    Pairwise-complete correlations between two column blocks.
+
+    Each row chunk adds float32 matrix products into float64 accumulators.
+    Without nulls one product suffices because the columns are centered;
+    with nulls the counts, sums and sums of squares over rows where both
+    columns are present are accumulated too, which gives the same result
+    as ``DataFrame.corr``. Returns ``(corr, counts)``.
+    """
+    n_rows = matrix.shape[0]
+    shape = (left.stop - left.start, right.stop - right.start)
+    cross = np.zeros(shape)
+    if not nulls:
+        sq_left, sq_right = np.zeros(shape[0]), np.zeros(shape[1])
+        for start in range(0, n_rows, chunk_rows):
+            a = np.asarray(matrix[start:start + chunk_rows, left])
+            b = np.asarray(matrix[start:start + chunk_rows, right])
+            cross += a.T @ b
+            sq_left += np.einsum("ij,ij->j", a, a, dtype=np.float64)
+            sq_right += np.einsum("ij,ij->j", b, b, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return cross / np.sqrt(np.outer(sq_left, sq_right)), np.full(shape, n_rows)
+
+    counts, sum_left, sum_right = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    sq_left, sq_right = np.zeros(shape), np.zeros(shape)
+    for start in range(0, n_rows, chunk_rows):
+        a = np.asarray(matrix[start:start + chunk_rows, left])
+        b = np.asarray(matrix[start:start + chunk_rows, right])
+        mask_a, mask_b = (~np.isnan(a)).astype(np.float32), (~np.isnan(b)).astype(np.float32)
+        a, b = np.nan_to_num(a), np.nan_to_num(b)
+        counts += mask_a.T @ mask_b
+        sum_left += a.T @ mask_b
+        sum_right += mask_a.T @ b
+        cross += a.T @ b
+        sq_left += (a * a).T @ mask_b
+        sq_right += mask_a.T @ (b * b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = cross - sum_left * sum_right / counts
+        var_left = sq_left - sum_left ** 2 / counts
+        var_right = sq_right - sum_right ** 2 / counts
+        return cov / np.sqrt(var_left * var_right), counts
+
+
+def correlation_pairs(
+    df: pd.DataFrame,
+    method: str = "pearson",
+    top_k: Optional[int] = None,
+    memory_mb: Optional[int] = None
+) -> list:
+    """
+    Strongest pairwise correlations between numeric columns.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Input data; numeric and bool columns are used.
+    method : {"pearson", "spearman"}, default "pearson"
+        Spearman is Pearson on average ranks.
+    top_k : int, optional
+        Pairs returned. Defaults to CORR_TOP_K (20).
+    memory_mb : int, optional
+        Working memory budget. Defaults to CORR_MEMORY_MB (256).
+
+    Returns
+    -------
+    list[dict]
+        ``{"x", "y", "value", "n"}`` per pair, strongest absolute value
+        first; ``n`` is the number of rows where both are present.
+
+    Notes
+    -----
+    - Columns are correlated in blocks of up to CORR_BLOCK_COLUMNS with
+      float32 matrix products over row chunks, and only the running top-k
+      is kept, so the p x p matrix is never materialized. Memory is the
+      budget plus six block x block float64 accumulators.
+    - Pearson matches ``DataFrame.corr``, including pairwise deletion of
+      nulls, to the 4 decimals reported. Spearman ranks each
+      column over all its non-null rows, so with nulls it can differ
+      slightly from pandas, which re-ranks each pair's common rows.
+    - Tables longer than CORR_MAX_ROWS are sampled uniformly first.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown correlation method '{method}'. Choose from {METHODS}")
+    top_k = CORR_TOP_K if top_k is None else top_k
+    if top_k <= 0:
+        return []
+    budget = _budget(memory_mb)
+    df = _sample_rows(df)
+
+    numeric = df.select_dtypes(include=["number", "bool"])
+    counts = numeric.count()
+    columns = [col for col in numeric.columns if counts[col] >= _MIN_PERIODS]
+    # Null-free columns first, so most block pairs take the single-product
+    # path; pairs are reported in the original column order
+    position = {col: i for i, col in enumerate(numeric.columns)}
+    columns.sort(key=lambda col: counts[col] < len(numeric))
+    if len(columns) < 2:
+        return []
+    matrix, has_nulls = _prepare(numeric, columns, method, budget)
+
+    width = min(CORR_BLOCK_COLUMNS, len(columns))
+    chunk_rows = max(256, budget // (width * 4 * _CHUNK_ARRAYS))
+    best = _TopK(top_k)
+    blocks = [slice(start, min(start + width, len(columns))) for start in range(0, len(columns), width)]
+    for i, left in enumerate(blocks):
+        for right in blocks[i:]:
+            nulls = has_nulls[left].any() or has_nulls[right].any()
+            corr, n_pairs = _block_correlation(matrix, left, right, nulls, chunk_rows)
+            valid = np.isfinite(corr) & (n_pairs >= _MIN_PERIODS)
+            if left == right:
+                valid &= np.triu(np.ones_like(valid), k=1)
+            li, ri = np.nonzero(valid)
+            if len(li) > top_k:
+                keep = np.argpartition(-np.abs(corr[li, ri]), top_k - 1)[:top_k]
+                li, ri = li[keep], ri[keep]
+            values = np.clip(corr[li, ri], -1.0, 1.0)
+            best.offer(values, [
+                dict(zip(("x", "y"), sorted((columns[left.start + a], columns[right.start + b]), key=position.get)),
+                     value=round(float(v), 4), n=int(n_pairs[a, b]))
+                for a, b, v in zip(li, ri, values)
+            ])
+    return best.result()
+
+
+def _cramers_v(table: np.ndarray) -> float:
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    k = min(table.shape)
+    n = table.sum()
+    if k < 2 or n == 0:
+        return float("nan")
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    chi2 = ((table - expected) ** 2 / expected).sum()
+    return float(np.sqrt(chi2 / n / (k - 1)))
+
+
+def _one_hot(codes: list, levels: list, rows: slice) -> np.ndarray:
+    """One-hot float32 encoding of several factorized columns side by side; nulls are all-zero rows."""
+    n = rows.stop - rows.start
+    out = np.zeros((n, sum(levels)), dtype=np.float32)
+    offset = 0
+    for col_codes, n_levels in zip(codes, levels):
+        chunk = col_codes[rows]
+        present = np.flatnonzero(chunk >= 0)
+        out[present, offset + chunk[present]] = 1.0
+        offset += n_levels
+    return out
+
+
+def cramers_v_pairs(
+    df: pd.DataFrame,
+    top_k: Optional[int] = None,
+    memory_mb: Optional[int] = None
+) -> list:
+    """
+    Strongest Cramér's V associations between categorical columns.
+
+    Non-numeric, non-datetime columns with 2 to CORR_MAX_LEVELS distinct
+    values are one-hot encoded in blocks; one float32 matrix product per
+    block pair and row chunk yields every contingency table of the pair
+    at once. Rows where either column is null are left out of that pair's
+    table. Returns ``{"x", "y", "value", "n"}`` per pair, strongest first.
+    """
+    top_k = CORR_TOP_K if top_k is None else top_k
+    if top_k <= 0:
+        return []
+    budget = _budget(memory_mb)
+    df = _sample_rows(df)
+
+    columns, codes, levels = [], [], []
+    for col in df.columns:
+        dtype = df[col].dtype
+        if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype):
+            continue
+        col_codes, uniques = pd.factorize(df[col])
+        if 2 <= len(uniques) <= CORR_MAX_LEVELS:
+            columns.append(col)
+            codes.append(col_codes)
+            levels.append(len(uniques))
+    if len(columns) < 2:
+        return []
+
+    # Blocks of columns whose one-hot width fits CORR_BLOCK_COLUMNS levels
+    blocks, start, width = [], 0, 0
+    for i, n_levels in enumerate(levels):
+        if width and width + n_levels > max(CORR_BLOCK_COLUMNS, CORR_MAX_LEVELS):
+            blocks.append((start, i))
+            start, width = i, 0
+        width += n_levels
+    blocks.append((start, len(columns)))
+    chunk_rows = max(256, budget // (max(CORR_BLOCK_COLUMNS, CORR_MAX_LEVELS) * 4 * _CHUNK_ARRAYS))
+
+    best = _TopK(top_k)
+    n_rows = len(df)
+    for i, (lo_a, hi_a) in enumerate(blocks):
+        for lo_b, hi_b in blocks[i:]:
+            tables = 0.0
+            for row in range(0, n_rows, chunk_rows):
+                rows = slice(row, min(row + chunk_rows, n_rows))
+                left = _one_hot(codes[lo_a:hi_a], levels[lo_a:hi_a], rows)
+                right = left if lo_b == lo_a else _one_hot(codes[lo_b:hi_b], levels[lo_b:hi_b], rows)
+                tables = tables + (left.T @ right).astype(np.float64)
+            offsets_a = np.cumsum([0] + levels[lo_a:hi_a])
+            offsets_b = np.cumsum([0] + levels[lo_b:hi_b])
+            scores, rows_out = [], []
+            for a in range(lo_a, hi_a):
+                for b in range(max(lo_b, a + 1), hi_b):
+                    table = tables[
+                        offsets_a[a - lo_a]:offsets_a[a - lo_a + 1],
+                        offsets_b[b - lo_b]:offsets_b[b - lo_b + 1]
+                    ]
+                    n = int(table.sum())
+                    value = _cramers_v(table)
+                    if n >= _MIN_PERIODS and np.isfinite(value):
+                        scores.append(value)
+                        rows_out.append({"x": columns[a], "y": columns[b], "value": round(value, 4), "n": n})
+            best.offer(np.asarray(scores), rows_out)
+    return best.result()
+
+
+def relationship_summary(
+    df: pd.DataFrame,
+    method: str = "pearson",
+    top_k: Optional[int] = None,
+    memory_mb: Optional[int] = None,
+    rows: Optional[int] = None
+) -> dict:
+    """
+    Strongest numeric correlations and categorical associations of a table.
+
+    ``rows`` is the length of the full table when ``df`` is already a
+    sample of it.
+
+    Returns
+    -------
+    dict
+        ``{"method", "rows", "sampled_rows", "correlations", "associations"}``
+        where ``correlations`` comes from ``correlation_pairs`` and
+        ``associations`` (Cramér's V) from ``cramers_v_pairs``;
+        ``sampled_rows`` is None unless fewer rows than the table's were used.
+    """
+    rows = len(df) if rows is None else rows
+    used = min(len(df), CORR_MAX_ROWS)
+    return {
+        "method": method,
+        "rows": int(rows),
+        "sampled_rows": int(used) if used < rows else None,
+        "correlations": correlation_pairs(df, method=method, top_k=top_k, memory_mb=memory_mb),
+        "associations": cramers_v_pairs(df, top_k=top_k, memory_mb=memory_mb),
+    }
@@ -0,0 +1,253 @@
+import os
+from typing import Optional, Sequence
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from src.tools.columnar_cache import ensure_columnar, feather, pa
+from src.tools.streaming_profile import DEFAULT_CHUNK_SIZE
+
+
+# Rows read up front to choose each column's compact dtype.
+COMPACT_SAMPLE_ROWS = int(os.getenv("COMPACT_SAMPLE_ROWS", "10000"))
+# String columns with at most this many distinct values (and at most half as
+# many distinct values as sampled rows) are loaded as categoricals.
+CATEGORY_MAX_UNIQUE = int(os.getenv("COMPACT_CATEGORY_MAX_UNIQUE", "1000"))
+
+
+def _is_string(s: pd.Series) -> bool:
+    if pd.api.types.is_object_dtype(s.dtype):
+        # Object columns also hold other values, e.g. booleans with missing values
+        return pd.api.types.infer_dtype(s, skipna=True) == "string"
+    return pd.api.types.is_string_dtype(s.dtype)
+
+
+def _looks_like_dates(s: pd.Series) -> bool:
+    """True if every sampled value is an ISO-8601 date of one fixed width."""
+    values = s.dropna()
+    if values.empty or values.str.len().nunique() != 1:
+        return False
+    parsed = pd.to_datetime(values, format="ISO8601", errors="coerce")
+    return not parsed.isna().any()
+
+
+def infer_compact_plan(sample: pd.DataFrame, parse_dates: bool = True) -> dict:
+    """
+    Choose a compact representation per column from a sample read with default dtypes.
+
+    Returns ``{col: kind}`` with kind one of ``"int"`` (downcast to the
+    narrowest width that holds the values), ``"category"``, ``"date"`` or
+    ``"string"`` (pyarrow-backed). Float, bool and other columns are absent
+    and keep their default dtype: narrowing floats to float32 would change
+    min/max/mean. With ``parse_dates=False`` ISO date strings are planned
+    like any other strings.
+    """
+    plan = {}
+    for col in sample.columns:
+        s = sample[col]
+        if pd.api.types.is_integer_dtype(s.dtype):
+            plan[col] = "int"
+        elif _is_string(s):
+            if parse_dates and _looks_like_dates(s):
+                plan[col] = "date"
+                continue
+            n_unique = s.nunique(dropna=True)
+            if n_unique <= CATEGORY_MAX_UNIQUE and n_unique * 2 <= s.notna().sum():
+                plan[col] = "category"
+            elif pa is not None and pd.api.types.is_object_dtype(s.dtype):
+                plan[col] = "string"
+    return plan
+
+
+def _compact_chunk(chunk: pd.DataFrame, plan: dict, failed_dates: set) -> pd.DataFrame:
+    for col, kind in plan.items():
+        if col not in chunk:
+            continue
+        s = chunk[col]
+        if kind == "int" and pd.api.types.is_integer_dtype(s.dtype):
+            # Exact: downcast checks this chunk's actual range
+            chunk[col] = pd.to_numeric(s, downcast="integer")
+        elif kind == "category":
+            chunk[col] = s.astype("category")
+        elif kind == "string" and pd.api.types.is_object_dtype(s.dtype):
+            chunk[col] = s.astype("string[pyarrow]")
+        elif kind == "date" and col not in failed_dates:
+            parsed = pd.to_datetime(s, format="ISO8601", errors="coerce")
+            if parsed.isna().sum() == s.isna().sum():
+                chunk[col] = parsed
+            else:
+                failed_dates.add(col)
+    return chunk
+
+
+def _concat_column(parts: list) -> pd.Series:
+    if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+        try:
+            return pd.Series(union_categoricals(parts, ignore_order=True), name=parts[0].name)
+        except TypeError:
+            # Categories of different dtypes, e.g. an all-NaN chunk parsed as float
+            return pd.concat([p.astype(object) for p in parts], ignore_index=True).astype("category")
+    return pd.concat(parts, ignore_index=True)
+
+
+def read_csv_compact(
+    file_path: str,
+    usecols: Optional[Sequence[str]] = None,
+    nrows: Optional[int] = None,
+    sample_rows: Optional[int] = None,
+    parse_dates: bool = True
+) -> tuple:
+    """
+    Read a CSV with memory-lean dtypes while keeping its values exact.
+
+    Reads the memory-mapped Arrow copy of the CSV when there is one (see
+    ``src/tools/columnar_cache.py``), and the CSV text otherwise.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the CSV file.
+    usecols : sequence of str, optional
+        Only load these columns.
+    nrows : int, optional
+        Only load the first ``nrows`` rows.
+    sample_rows : int, optional
+        Rows used to choose dtypes. Defaults to ``COMPACT_SAMPLE_ROWS``.
+    parse_dates : bool, default True
+        Load columns of ISO-8601 date strings as datetime64. Turn off when
+        statistics must match a default read, which keeps them as strings.
+
+    Returns
+    -------
+    tuple[pandas.DataFrame, dict]
+        The frame and a report::
+
+            {"default_dtypes": {col: str},   # what pd.read_csv would infer
+             "compact_dtypes": {col: str},   # columns whose dtype changed
+             "plan": {col: kind},            # see infer_compact_plan
+             "sample": DataFrame,            # first rows, default dtypes
+             "memory": {"default_bytes_estimate", "compact_bytes",
+                        "saved_bytes", "saved_percent"}}
+
+    Notes
+    -----
+    - From the Arrow copy, columns are converted to pandas and compacted
+      one at a time, so peak memory is about the compact frame plus one
+      default-dtype column.
+    - Otherwise the file is parsed in chunks and each chunk is compacted before the
+      next is read. Chunks are concatenated one column at a time, so peak
+      memory is about the compact frame plus one default-dtype chunk and
+      one column.
+    - Integers are downcast per chunk with ``pd.to_numeric`` and chunks are
+      concatenated at their common width, so a value outside the sampled
+      range widens the column instead of overflowing. A column that turns
+      out to contain NaN ends as float64, as a default read would.
+    - Categoricals are merged across chunks with ``union_categoricals``.
+    - Date columns that fail to parse in any chunk are re-read as strings.
+    - ``default_bytes_estimate`` scales the sample's default-dtype memory
+      use to the full row count.
+    """
+    sample_rows = sample_rows or COMPACT_SAMPLE_ROWS
+    path = ensure_columnar(file_path)
+    if path is not None:
+        df, sample, plan = _read_columnar_compact(path, usecols, nrows, sample_rows, parse_dates)
+        return df, _compact_report(df, sample, plan, set())
+
+    sample = pd.read_csv(file_path, usecols=usecols, nrows=min(sample_rows, nrows or sample_rows))
+    plan = infer_compact_plan(sample, parse_dates=parse_dates)
+
+    failed_dates: set = set()
+    # Per-column lists of independent arrays, so each column's chunks can be
+    # released as soon as that column is concatenated
+    parts: dict = {}
+    with pd.read_csv(file_path, usecols=usecols, nrows=nrows, chunksize=DEFAULT_CHUNK_SIZE) as reader:
+        for chunk in reader:
+            chunk = _compact_chunk(chunk, plan, failed_dates)
+            for col in chunk.columns:
+                parts.setdefault(col, []).append(chunk[col].copy())
+            del chunk
+
+    if not parts:
+        df = sample.iloc[:0]
+    else:
+        df = pd.DataFrame({col: _concat_column(parts.pop(col)) for col in list(parts)})
+
+    for col in failed_dates:
+        df[col] = pd.read_csv(file_path, usecols=[col], nrows=nrows)[col]
+    return df, _compact_report(df, sample, plan, failed_dates)
+
+
+def _read_columnar_compact(
+    path,
+    usecols: Optional[Sequence[str]],
+    nrows: Optional[int],
+    sample_rows: int,
+    parse_dates: bool
+) -> tuple:
+    """Compact frame, default-dtype sample and plan from a memory-mapped Arrow copy."""
+    table = feather.read_table(
+        str(path),
+        columns=list(usecols) if usecols is not None else None,
+        memory_map=True
+    )
+    if nrows is not None:
+        table = table.slice(0, nrows)
+    sample = table.slice(0, sample_rows).to_pandas()
+    plan = infer_compact_plan(sample, parse_dates=parse_dates)
+
+    # One column at a time leaves the mapped file as the only full copy; a
+    # date column that fails to parse simply keeps its default dtype
+    columns = {}
+    for name in table.column_names:
+        column = table.select([name]).to_pandas()
+        columns[name] = _compact_chunk(column, plan, set())[name]
+        del column
+    df = pd.DataFrame(columns) if columns else sample.iloc[:0]
+    return df, sample, plan
+
+
+def _compact_report(df: pd.DataFrame, sample: pd.DataFrame, plan: dict, failed_dates: set) -> dict:
+    """The report returned by ``read_csv_compact``."""
+    default_dtypes = {}
+    for col in df.columns:
+        kind = plan.get(col)
+        if kind == "int":
+            default_dtypes[col] = "int64" if pd.api.types.is_integer_dtype(df[col].dtype) else str(df[col].dtype)
+        elif kind is not None and col not in failed_dates:
+            default_dtypes[col] = str(sample[col].dtype)
+        else:
+            default_dtypes[col] = str(df[col].dtype)
+
+    n_sample = max(len(sample), 1)
+    default_bytes = int(sample.memory_usage(index=False, deep=True).sum() / n_sample * len(df))
+    compact_bytes = int(df.memory_usage(index=False, deep=True).sum())
+    saved = max(default_bytes - compact_bytes, 0)
+    return {
+        "default_dtypes": default_dtypes,
+        "compact_dtypes": {
+            col: str(dtype) for col, dtype in df.dtypes.items() if str(dtype) != default_dtypes[col]
+        },
+        "plan": plan,
+        "sample": sample,
+        "memory": {
+            "default_bytes_estimate": default_bytes,
+            "compact_bytes": compact_bytes,
+            "saved_bytes": saved,
+            "saved_percent": round(saved / default_bytes * 100, 1) if default_bytes else 0.0,
+        },
+    }
+
+
+def default_records(df: pd.DataFrame, report: dict, n: int) -> list:
+    """
+    First ``n`` rows of a compact frame as records, valued as a default read would be.
+
+    Parsed dates and pyarrow strings are taken from the default-dtype sample;
+    categoricals and downcast integers already convert to the same values.
+    """
+    head = df.head(n).copy()
+    sample = report["sample"]
+    for col, kind in report["plan"].items():
+        if kind in ("date", "string") and col in head and len(sample) >= len(head):
+            head[col] = sample[col].head(len(head)).to_numpy()
+    return head.to_dict(orient="records")
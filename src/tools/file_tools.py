@@ -1,10 +1,34 @@
-from langchain.tools import tool
+from langchain_core.tools import tool
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+from typing import Optional
 import pandas as pd
 import numpy as np
-from src.tools.utils import dataset_profile_logic
+from src.tools.utils import PROFILE_SCHEMA, dataset_profile_logic
+from src.tools.streaming_profile import sample_csv_rows, stream_profile
+from src.tools.profile_cache import CACHE_ENABLED, profile_cache
+from src.tools.columnar_cache import read_dataset
+from src.tools.parallel_profile import parallel_profile
+from src.tools.incremental_profile import has_state, incremental_profile
+from src.tools.sampled_profile import sampled_profile
+from src.tools.dtype_inference import default_records, read_csv_compact
+from src.tools.correlation import CORR_TOP_K, correlation_columns, relationship_summary, sample_limit
+from src.utils.logger import logger
+
+# Files larger than this are profiled chunk by chunk in "auto" mode.
+STREAMING_THRESHOLD_BYTES = int(os.getenv("PROFILE_STREAMING_THRESHOLD_MB", "256")) * 1024 * 1024
+# After a "fast" sampled profile, compute the exact one in the background.
+FAST_REFINE = os.getenv("PROFILE_FAST_REFINE", "true").lower() not in ("0", "false", "no")
+# Load with compact dtypes (categoricals, narrow ints, ...) in "full" mode.
+COMPACT_DTYPES = os.getenv("PROFILE_COMPACT_DTYPES", "true").lower() not in ("0", "false", "no")
+
+_refine_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="eda-refine")
+_refining: set = set()
+_refining_lock = threading.Lock()
 
 @tool
-def load_dataset(file_path):
+def load_dataset(file_path, compact: bool = False):
     """
     Load a CSV dataset from disk into a pandas DataFrame.
 
@@ -12,6 +36,10 @@ def load_dataset(file_path):
     ----------
     file_path : str or os.PathLike
         Path to the CSV file to read.
+    compact : bool, default False
+        Load with memory-lean dtypes: categoricals for low-cardinality
+        strings, the narrowest integer widths, pyarrow-backed strings and
+        parsed ISO dates (see src/tools/dtype_inference.py).
 
     Returns
     -------
@@ -26,15 +54,25 @@ def load_dataset(file_path):
         If the CSV file is empty.
     pd.errors.ParserError
         If the CSV cannot be parsed.
+
+    Notes
+    -----
+    - Reads the memory-mapped Arrow copy of the CSV when pyarrow is installed,
+      converting it once on first use (see src/tools/columnar_cache.py).
     """
-    df = pd.read_csv(file_path)
+    if compact:
+        df, _ = read_csv_compact(file_path)
+        return df
+    df = read_dataset(file_path)
     return df
 
 
 @tool
 def dataset_profile_tool(
     file_path: str,
-    sample_rows: int = 5
+    sample_rows: int = 5,
+    mode: str = "auto",
+    approximate: bool = False
 ) -> dict:
     """
     Generate a minimal, JSON-serializable profile from a CSV file path for agentic EDA.
@@ -45,6 +83,27 @@ def dataset_profile_tool(
         Path to the CSV file to load and profile.
     sample_rows : int, default 5
         Number of first rows to include as a sample in the profile.
+    mode : {"auto", "full", "streaming", "parallel", "incremental", "fast"}, default "auto"
+        "full" loads the whole file into memory, "streaming" reads it in
+        chunks with memory bounded by the chunk size and fixed-size sketches
+        (distinct and duplicate counts stay exact up to
+        PROFILE_EXACT_DISTINCT_LIMIT values per column and
+        PROFILE_EXACT_ROWS_LIMIT rows, then become HyperLogLog estimates),
+        "parallel" spreads columns or row
+        ranges over PROFILE_WORKERS processes, "incremental" parses only the
+        rows appended since the previous incremental run, "fast" estimates
+        the profile from a sample of rows with 95% confidence intervals and
+        returns in well under a second for any file size. "auto" continues
+        incrementally when a saved state exists and otherwise streams files
+        larger than PROFILE_STREAMING_THRESHOLD_MB (256 MB by default).
+    approximate : bool, default False
+        Estimate distinct counts with HyperLogLog sketches (about 1.6%
+        relative error): in the chunked modes those of every column, in
+        "full" mode those of columns without exact top values once the file
+        has PROFILE_APPROX_MIN_ROWS rows, when duplicate rows are also
+        counted from row fingerprints (see ``dataset_profile_logic``). Not used by
+        "fast" mode, which has its own estimates and refines to the exact
+        profile.
 
     Returns
     -------
@@ -58,12 +117,196 @@ def dataset_profile_tool(
         - unique_values: dict[str, int]
         - numeric_summary: dict[str, {"min": float | None, "max": float | None, "mean": float | None}]
         - sample_rows: list[dict]
+        - quantiles, histograms, top_values, target_balance: distribution
+          summaries; see ``dataset_profile_logic``
+        - sampling: estimation details and intervals ("fast" mode only)
+        - memory: bytes saved by compact dtypes ("full" mode with
+          PROFILE_COMPACT_DTYPES on)
 
     Notes
     -----
-    - Loads the dataset with pandas.read_csv and delegates profiling to the in-notebook
-      dataset_profile function to avoid non-JSON argument types in tool schemas.
+    - Loads the dataset via its columnar Arrow copy (falling back to pandas.read_csv),
+      compacting its dtypes column by column when PROFILE_COMPACT_DTYPES is on
+      (src/tools/dtype_inference.py), and delegates profiling to the in-notebook dataset_profile function to avoid non-JSON argument types in tool schemas.
+    - Streaming and parallel modes fold chunks or partitions into mergeable
+      accumulators and return the same schema; see src/tools/streaming_profile.py
+      and src/tools/parallel_profile.py.
+    - Profiles are cached on disk keyed by file content hash plus options,
+      including the mode "auto" resolves to, so a streaming or parallel
+      profile (which may hold estimates) is never served as a full one
+      (src/tools/profile_cache.py); set PROFILE_CACHE_ENABLED=false to disable.
+    - Incremental mode skips that cache: hashing a whole append-only file
+      would cost more than parsing its new tail. Its own saved state is
+      described in src/tools/incremental_profile.py.
+    - Fast mode returns the exact cached profile when one exists. Otherwise it
+      samples (src/tools/sampled_profile.py) and, unless PROFILE_FAST_REFINE is
+      off, computes the exact profile into the cache in the background. Later
+      calls then pick up the exact profile.
+    - In full mode the file is loaded with compact dtypes unless
+      PROFILE_COMPACT_DTYPES is off. The statistics, dtypes and sample rows
+      are still reported as a default ``pd.read_csv`` would give them.
     - All values are cast to built-in Python types for JSON serialization.
     """
-    df = pd.read_csv(file_path)
-    return dataset_profile_logic(df, sample_rows)
+    if mode == "fast":
+        return _fast_profile(file_path, sample_rows)
+
+    if mode == "incremental" or (mode == "auto" and has_state(file_path, sample_rows, approximate)):
+        return incremental_profile(file_path, sample_rows, approximate=approximate)
+
+    # Keyed by the resolved mode: streaming and parallel profiles may hold
+    # estimates, which must not be served to a "full" caller
+    mode = _resolve_mode(file_path, mode)
+    if CACHE_ENABLED:
+        key = profile_cache.key(
+            file_path, sample_rows=sample_rows, mode=mode, approximate=approximate, schema=PROFILE_SCHEMA
+        )
+        cached = profile_cache.get(key)
+        if cached is not None:
+            return cached
+
+    profile = _build_profile(file_path, sample_rows, mode, approximate)
+
+    if CACHE_ENABLED:
+        profile_cache.put(key, profile)
+    return profile
+
+
+@tool
+def correlation_tool(file_path: str, method: str = "pearson", top_k: int = CORR_TOP_K) -> dict:
+    """
+    Find the strongest relationships between columns of a CSV file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the CSV file to analyze.
+    method : {"pearson", "spearman"}, default "pearson"
+        Correlation between numeric columns; "spearman" is rank-based and
+        catches monotonic, non-linear relationships.
+    top_k : int, default 20
+        Number of strongest pairs returned per measure.
+
+    Returns
+    -------
+    dict
+        - method: str
+        - rows: int
+        - sampled_rows: int | None (set when the table was sampled)
+        - correlations: list[{"x", "y", "value", "n"}], numeric pairs by |value|
+        - associations: list[{"x", "y", "value", "n"}], Cramér's V between
+          categorical columns
+
+    Notes
+    -----
+    - Only the columns that can be paired are read, chosen from the cached
+      profile (or a sampled one) by dtype and distinct count.
+    - When those columns would not fit CORR_MEMORY_MB, or the table exceeds
+      CORR_MAX_ROWS, a uniform sample of rows is read chunk by chunk
+      instead of the whole table.
+    - Computed in column blocks with float32 matrix products within the
+      CORR_MEMORY_MB budget; see src/tools/correlation.py.
+    - Results are cached next to profiles, keyed by file content and options.
+    """
+    if CACHE_ENABLED:
+        key = profile_cache.key(file_path, correlation=method, top_k=top_k)
+        cached = profile_cache.get(key)
+        if cached is not None:
+            return cached
+
+    profile = _cached_profile(file_path) or sampled_profile(file_path)
+    columns = correlation_columns(profile)
+    limit = sample_limit(len(columns))
+    if not columns:
+        df, rows = pd.DataFrame(), profile["shape"]["rows"]
+    elif profile["shape"]["rows"] <= limit:
+        df = read_dataset(file_path, columns=columns)
+        rows = len(df)
+    else:
+        df, rows = sample_csv_rows(file_path, limit / profile["shape"]["rows"], columns)
+    result = relationship_summary(df, method=method, top_k=top_k, rows=rows)
+
+    if CACHE_ENABLED:
+        profile_cache.put(key, result)
+    return result
+
+
+def _cached_profile(file_path: str, sample_rows: int = 5) -> Optional[dict]:
+    """The exact profile of ``file_path`` if one is cached, else None."""
+    if not CACHE_ENABLED:
+        return None
+    # known_key never hashes the file, which would blow the latency budget.
+    # Same key as an exact full-mode profile, which is what refining stores
+    key = profile_cache.known_key(
+        file_path, sample_rows=sample_rows, mode="full", approximate=False, schema=PROFILE_SCHEMA
+    )
+    return profile_cache.get(key) if key else None
+
+
+def _fast_profile(file_path: str, sample_rows: int) -> dict:
+    """Exact profile if already cached, else a sampled estimate (refined in the background)."""
+    cached = _cached_profile(file_path, sample_rows)
+    if cached is not None:
+        return cached
+
+    profile = sampled_profile(file_path, sample_rows)
+    if CACHE_ENABLED and FAST_REFINE and not profile["sampling"]["exact"]:
+        _refine_in_background(file_path, sample_rows)
+    return profile
+
+
+def _refine_in_background(file_path: str, sample_rows: int) -> None:
+    """Compute the exact profile into the profile cache on a background thread."""
+    job = (os.path.realpath(file_path), sample_rows)
+    with _refining_lock:
+        if job in _refining:
+            return
+        _refining.add(job)
+
+    def refine():
+        try:
+            key = profile_cache.key(
+                file_path, sample_rows=sample_rows, mode="full", approximate=False, schema=PROFILE_SCHEMA
+            )
+            if profile_cache.get(key) is None:
+                # Full mode, whatever the file size: streaming would switch
+                # to estimates past its exact-count limits
+                profile_cache.put(key, _build_profile(file_path, sample_rows, "full", False))
+                logger.info(f"Exact profile of {file_path} ready in the profile cache")
+        except Exception as e:
+            logger.error(f"Background profile of {file_path} failed: {e}")
+        finally:
+            with _refining_lock:
+                _refining.discard(job)
+
+    _refine_executor.submit(refine)
+
+
+def _resolve_mode(file_path: str, mode: str) -> str:
+    """The mode that "auto" stands for with this file; other modes as given."""
+    if mode == "auto":
+        return "streaming" if os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES else "full"
+    return mode
+
+
+def _build_profile(file_path: str, sample_rows: int, mode: str, approximate: bool) -> dict:
+    """Profile the file from scratch with the requested mode."""
+    mode = _resolve_mode(file_path, mode)
+    if mode == "streaming":
+        return stream_profile(file_path, sample_rows, approximate=approximate)
+    if mode == "parallel":
+        return parallel_profile(file_path, sample_rows, approximate=approximate)
+    if mode != "full":
+        raise ValueError(f"Unknown profile mode '{mode}'")
+
+    if not COMPACT_DTYPES:
+        df = read_dataset(file_path)
+        return dataset_profile_logic(df, sample_rows, approximate=approximate)
+
+    # Dates stay strings, as in a default read, so they keep their top values
+    df, report = read_csv_compact(file_path, parse_dates=False)
+    profile = dataset_profile_logic(df, sample_rows, approximate=approximate)
+    # Report the dtypes and sample values of a default load, not the compact ones
+    profile["dtypes"] = report["default_dtypes"]
+    profile["sample_rows"] = default_records(df, report, sample_rows)
+    profile["memory"] = {**report["memory"], "compact_dtypes": report["compact_dtypes"]}
+    return profile
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Optional
+
+from src.tools.streaming_profile import ProfileAccumulator, csv_header, iter_csv_range_chunks
+from src.utils.logger import logger
+
+
+STATE_DIR = Path(os.getenv("PROFILE_STATE_DIR", "data/cache/profile_state"))
+
+# Bump when the pickled layout changes so stale states are rebuilt
+_STATE_VERSION = 3
+# Bytes hashed at the start of the file and just before the covered offset
+_GUARD_BLOCK = 1024 * 1024
+
+
+def state_path(file_path: str, sample_rows: int, approximate: bool) -> Path:
+    """Location of the saved accumulator for a file and profiling options."""
+    source = os.path.realpath(file_path)
+    tag = hashlib.sha1(f"{source}|{sample_rows}|{approximate}".encode()).hexdigest()[:16]
+    return STATE_DIR / f"{Path(source).stem}-{tag}.pkl"
+
+
+def has_state(file_path: str, sample_rows: int = 5, approximate: bool = False) -> bool:
+    return state_path(file_path, sample_rows, approximate).exists()
+
+
+def _guard_digest(file_path: str, offset: int) -> str:
+    """Hash of the first and last ``_GUARD_BLOCK`` bytes of ``[0, offset)``."""
+    h = hashlib.sha256(str(offset).encode())
+    with open(file_path, "rb") as f:
+        h.update(f.read(min(_GUARD_BLOCK, offset)))
+        if offset > _GUARD_BLOCK:
+            f.seek(max(_GUARD_BLOCK, offset - _GUARD_BLOCK))
+            h.update(f.read(offset - f.tell()))
+    return h.hexdigest()
+
+
+def _complete_rows_end(file_path: str, start: int, size: int) -> int:
+    """Offset just past the last newline in ``[start, size)``, or ``start`` if none."""
+    block = 64 * 1024
+    with open(file_path, "rb") as f:
+        pos = size
+        while pos > start:
+            lo = max(start, pos - block)
+            f.seek(lo)
+            data = f.read(pos - lo)
+            i = data.rfind(b"\n")
+            if i >= 0:
+                return lo + i + 1
+            pos = lo
+    return start
+
+
+def _load_state(path: Path) -> Optional[dict]:
+    try:
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    return state if state.get("version") == _STATE_VERSION else None
+
+
+def _save_state(path: Path, state: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def incremental_profile(
+    file_path: str,
+    sample_rows: int = 5,
+    approximate: bool = False,
+    chunksize: Optional[int] = None
+) -> dict:
+    """
+    Profile an append-only CSV, parsing only the bytes added since last time.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the CSV file to profile.
+    sample_rows : int, default 5
+        Number of first rows to include as a sample in the profile.
+    approximate : bool, default False
+        Estimate per-column distinct counts with HyperLogLog sketches.
+    chunksize : int, optional
+        Rows per chunk when parsing. Defaults to ``PROFILE_CHUNK_SIZE``.
+
+    Returns
+    -------
+    dict
+        A profile with the same keys as ``dataset_profile_logic``.
+
+    Notes
+    -----
+    - The ProfileAccumulator (counts, sums, min/max, distinct sketches and
+      row fingerprints) is pickled to PROFILE_STATE_DIR with the byte offset
+      and row count it covers. The next call verifies the covered prefix is
+      unchanged and folds in only ``[offset, EOF)``.
+    - The prefix check compares the header and hashes the first and last
+      1 MB before the offset, so it costs the same for any file size. It catches
+      truncation and rewrites of the file head or the covered tail. It does
+      not catch an in-place edit in the middle of the prefix. Files edited
+      in place need a full profile (``mode="streaming"``).
+    - A trailing line without a newline is left for the next call, so a row
+      that is still being written is never counted half-parsed.
+    - State size is bounded whatever the file size. Duplicate detection keeps
+      8 bytes per distinct row up to PROFILE_EXACT_ROWS_LIMIT rows, and each
+      column 8 bytes per distinct value up to PROFILE_EXACT_DISTINCT_LIMIT
+      (none with ``approximate``). Past a limit, that counter becomes a 16 KB
+      HyperLogLog sketch; see ``DistinctCounter`` in src/tools/sketches.py.
+    - New fingerprints are merged into the saved sorted sets in linear time,
+      so a small append does not re-sort the state.
+    """
+    path = state_path(file_path, sample_rows, approximate)
+    size = os.path.getsize(file_path)
+    names, data_start = csv_header(file_path)
+
+    state = _load_state(path) if path.exists() else None
+    if state is not None and (
+        state["names"] != names
+        or state["offset"] > size
+        or state["guard"] != _guard_digest(file_path, state["offset"])
+    ):
+        logger.info(f"Saved profile state for {file_path} no longer matches; rebuilding")
+        state = None
+
+    if state is None:
+        acc = ProfileAccumulator(sample_rows=sample_rows, approximate=approximate)
+        start = data_start
+    else:
+        acc = state["accumulator"]
+        start = state["offset"]
+
+    end = _complete_rows_end(file_path, start, size)
+    if state is not None and end == start:
+        return acc.to_profile()
+
+    rows_before = acc.n_rows
+    for chunk in iter_csv_range_chunks(file_path, start, end, names, chunksize):
+        acc.update(chunk)
+    logger.info(
+        f"Incremental profile of {file_path}: parsed bytes [{start}, {end}), "
+        f"{acc.n_rows - rows_before} new rows, {acc.n_rows} total"
+    )
+
+    _save_state(path, {
+        "version": _STATE_VERSION,
+        "names": names,
+        "offset": end,
+        "rows": acc.n_rows,
+        "guard": _guard_digest(file_path, end),
+        "accumulator": acc,
+    })
+    return acc.to_profile()
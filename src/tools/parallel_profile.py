@@ -0,0 +1,195 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional
+
+import numpy as np
+
+from src.tools.columnar_cache import feather, fresh_columnar_path, read_dataset
+from src.tools.sketches import FingerprintSet, hash_rows
+from src.tools.streaming_profile import (
+    DEFAULT_CHUNK_SIZE,
+    ProfileAccumulator,
+    csv_header,
+    iter_csv_range_chunks,
+    split_byte_ranges,
+)
+from src.tools.utils import column_stats, finish_profile
+from src.utils.processes import pool_context
+
+
+# Worker processes for parallel profiling; override with PROFILE_WORKERS.
+DEFAULT_WORKERS = int(os.getenv("PROFILE_WORKERS", str(os.cpu_count() or 1)))
+
+# Odd 64-bit multiplier used to fold per-shard row hashes into one row hash.
+_ROW_HASH_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _profile_column_shard(path: str, columns: list, approximate: bool) -> tuple:
+    """Worker: column stats and row hashes for a column subset of the Arrow file."""
+    df = feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    return column_stats(df, approximate=approximate), hash_rows(df)
+
+
+def _profile_row_slice(
+    path: str,
+    offset: int,
+    length: int,
+    sample_rows: int,
+    approximate: bool,
+    chunksize: int
+) -> ProfileAccumulator:
+    """Worker: accumulate a zero-copy row slice of the memory-mapped Arrow file."""
+    table = feather.read_table(path, memory_map=True).slice(offset, length)
+    acc = ProfileAccumulator(sample_rows=sample_rows, approximate=approximate)
+    for batch in table.to_batches(max_chunksize=chunksize):
+        acc.update(batch.to_pandas())
+    return acc
+
+
+def _profile_byte_range(
+    file_path: str,
+    start: int,
+    end: int,
+    names: list,
+    sample_rows: int,
+    approximate: bool,
+    chunksize: int
+) -> ProfileAccumulator:
+    """Worker: accumulate the CSV rows stored in bytes ``[start, end)``."""
+    acc = ProfileAccumulator(sample_rows=sample_rows, approximate=approximate)
+    for chunk in iter_csv_range_chunks(file_path, start, end, names, chunksize):
+        acc.update(chunk)
+    return acc
+
+
+def _merge_in_order(futures, sample_rows: int, approximate: bool) -> dict:
+    acc = ProfileAccumulator(sample_rows=sample_rows, approximate=approximate)
+    for future in futures:
+        acc.merge(future.result())
+    return acc.to_profile()
+
+
+def _shard(items: list, parts: int) -> list:
+    size = -(-len(items) // parts)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def parallel_profile(
+    file_path: str,
+    sample_rows: int = 5,
+    approximate: bool = False,
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None
+) -> dict:
+    """
+    Profile a CSV file across a pool of worker processes.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the CSV file to profile.
+    sample_rows : int, default 5
+        Number of first rows to include as a sample in the profile.
+    approximate : bool, default False
+        Use HyperLogLog sketches for per-column distinct counts.
+    workers : int, optional
+        Size of the process pool. Defaults to ``PROFILE_WORKERS`` (CPU count).
+    chunksize : int, optional
+        Rows per chunk inside each worker.
+
+    Returns
+    -------
+    dict
+        A profile with the same keys as ``dataset_profile_logic``.
+
+    Notes
+    -----
+    - When a fresh columnar Arrow copy exists, workers memory-map it, so the
+      data is shared through the page cache instead of being pickled. Wide
+      tables are sharded by column (each worker projects its columns); narrow
+      ones are sharded into zero-copy row slices.
+    - Otherwise the CSV is split into newline-aligned byte ranges and each
+      worker parses and streams its range into a ProfileAccumulator. No
+      Arrow copy is built first, since that would parse the whole file on
+      one core before any worker starts.
+    - Column shards return row hashes of their columns, which the parent
+      folds together as shards finish to count duplicate rows over all
+      columns; each shard's result is dropped once folded, so the parent
+      holds a few row-hash arrays at a time rather than one per shard.
+    - Workers are started with forkserver (spawn where unavailable), not
+      fork; see ``pool_context``.
+    """
+    workers = max(1, workers or DEFAULT_WORKERS)
+    chunksize = chunksize or DEFAULT_CHUNK_SIZE
+    columnar = fresh_columnar_path(file_path)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as pool:
+        if columnar is None:
+            names, data_start = csv_header(file_path)
+            futures = [
+                pool.submit(_profile_byte_range, file_path, start, end, names,
+                            sample_rows, approximate, chunksize)
+                for start, end in split_byte_ranges(file_path, data_start, workers)
+            ]
+            return _merge_in_order(futures, sample_rows, approximate)
+
+        path = str(columnar)
+        head = read_dataset(file_path, nrows=sample_rows)
+        columns = list(head.columns)
+
+        if len(columns) < 2 * workers:
+            n_rows = feather.read_table(path, memory_map=True).num_rows
+            step = -(-n_rows // workers) or 1
+            futures = [
+                pool.submit(_profile_row_slice, path, offset, step,
+                            sample_rows, approximate, chunksize)
+                for offset in range(0, max(n_rows, 1), step)
+            ]
+            return _merge_in_order(futures, sample_rows, approximate)
+
+        stats = {
+            "nulls": {}, "unique_values": {}, "numeric_summary": {},
+            "quantiles": {}, "histograms": {}, "top_values": {}
+        }
+        row_hash = None
+        # Several shards per worker so uneven column costs balance out. No
+        # list of futures is kept: as_completed drops each one once yielded,
+        # so a shard's row hashes are freed as soon as they are folded in.
+        # The fold order differs between runs but is the same for every
+        # row, which is all duplicate detection needs.
+        for future in as_completed([
+            pool.submit(_profile_column_shard, path, shard, approximate)
+            for shard in _shard(columns, workers * 4)
+        ]):
+            shard_stats, shard_hash = future.result()
+            del future
+            for key in stats:
+                stats[key].update(shard_stats[key])
+            row_hash = shard_hash if row_hash is None else row_hash * _ROW_HASH_MIX ^ shard_hash
+            del shard_hash
+
+    n_rows = len(row_hash)
+    fingerprints = FingerprintSet()
+    fingerprints.add_hashes(row_hash)
+    return finish_profile({
+        "shape": {
+            "rows": int(n_rows),
+            "columns": len(columns)
+        },
+        "columns": columns,
+        "dtypes": {col: str(dtype) for col, dtype in head.dtypes.items()},
+        "duplicates": {
+            "duplicate_rows": int(n_rows - fingerprints.cardinality())
+        },
+        "nulls": {col: stats["nulls"][col] for col in columns},
+        "unique_values": {col: stats["unique_values"][col] for col in columns},
+        "numeric_summary": {
+            col: stats["numeric_summary"][col]
+            for col in columns if col in stats["numeric_summary"]
+        },
+        "sample_rows": head.to_dict(orient="records"),
+        **{
+            key: {col: stats[key][col] for col in columns if col in stats[key]}
+            for key in ("quantiles", "histograms", "top_values")
+        }
+    })
@@ -0,0 +1,482 @@
+import json
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.tools.columnar_cache import read_dataset
+from src.tools.profile_cache import profile_cache
+from src.tools.streaming_profile import csv_header
+from src.utils.logger import logger
+from src.utils.processes import pool_context
+
+
+# Rendered PNGs, named after the plot spec and the data's content hash.
+FIGURE_DIR = Path(os.getenv("FIGURE_CACHE_DIR", "data/cache/figures"))
+FIGURE_CACHE_MAX_ENTRIES = int(os.getenv("FIGURE_CACHE_MAX_ENTRIES", "512"))
+# Worker processes drawing figures; override with RENDER_WORKERS.
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+RENDER_ENABLED = os.getenv("PLOT_RENDER_ENABLED", "true").lower() not in ("0", "false", "no")
+# Scatter plots with more points than this are drawn as 2-D density bins.
+SCATTER_MAX_POINTS = int(os.getenv("PLOT_SCATTER_MAX_POINTS", "50000"))
+SCATTER_BINS = int(os.getenv("PLOT_SCATTER_BINS", "200"))
+# Groups (box/violin), bars and stacks beyond this are dropped or folded into "Other".
+MAX_CATEGORIES = int(os.getenv("PLOT_MAX_CATEGORIES", "20"))
+# Time series without a date_freq use the finest of D/W/M/Q/Y giving at most this many points.
+TIME_SERIES_MAX_POINTS = int(os.getenv("PLOT_TIME_SERIES_MAX_POINTS", "1000"))
+
+# Bump when the drawing code changes so cached figures are redrawn
+_RENDER_VERSION = 1
+_VIOLIN_BINS = 64
+_PLOT_TYPES = {
+    "scatter": "scatter",
+    "box": "box", "boxplot": "box",
+    "violin": "violin",
+    "time_series": "time_series", "timeseries": "time_series", "line": "time_series",
+    "stacked_bar": "stacked_bar", "stacked": "stacked_bar",
+    "histogram": "histogram", "hist": "histogram",
+    "bar": "bar", "count": "bar", "countplot": "bar",
+}
+# Pandas 3 spellings of the period-end aliases designers tend to emit
+_FREQ_ALIASES = {"M": "ME", "Q": "QE", "Y": "YE", "A": "YE", "H": "h", "T": "min", "S": "s"}
+_AUTO_FREQS = [("D", 1), ("W", 7), ("MS", 30.4), ("QS", 91.3), ("YS", 365.25)]
+_AGGS = ("mean", "sum", "count", "median", "min", "max")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def parse_plot_plan(plan: Any) -> list:
+    """
+    Extract plot specs from a designer PlotPlan.
+
+    Accepts the parsed plan or the model's raw text (optionally wrapped in a
+    Markdown code fence), shaped as ``{"plots": [...]}``, a list of specs or a
+    single spec. Returns a list of dicts; an unparseable plan yields ``[]``.
+    """
+    if isinstance(plan, str):
+        text = plan.strip()
+        fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+        if fenced:
+            text = fenced.group(1)
+        try:
+            plan = json.loads(text)
+        except ValueError:
+            logger.warning("PlotPlan is not valid JSON; nothing to render")
+            return []
+    if isinstance(plan, dict):
+        plan = plan.get("plots", plan.get("charts", [plan] if "type" in plan else []))
+    if not isinstance(plan, list):
+        return []
+    return [spec for spec in plan if isinstance(spec, dict)]
+
+
+def _normalize_spec(spec: dict) -> dict:
+    plot_type = _PLOT_TYPES.get(str(spec.get("type", "")).lower().replace("-", "_"))
+    hue = spec.get("hue") or spec.get("color") or spec.get("stack") or spec.get("group")
+    normalized = {
+        "type": plot_type or str(spec.get("type")),
+        "x": spec.get("x"),
+        "y": spec.get("y"),
+        "hue": hue,
+        "title": spec.get("title"),
+    }
+    for option in ("sample_rows", "date_freq", "freq", "normalize", "bins", "agg"):
+        if spec.get(option) is not None:
+            normalized[option] = spec[option]
+    return normalized
+
+
+def _is_numeric(s: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype)
+
+
+def _top_categories(s: pd.Series, limit: int = MAX_CATEGORIES) -> list:
+    return s.value_counts().index[:limit].tolist()
+
+
+def _aggregate_scatter(df: pd.DataFrame, spec: dict) -> dict:
+    x, y = spec["x"], spec["y"]
+    if not (_is_numeric(df[x]) and _is_numeric(df[y])):
+        raise ValueError("scatter needs numeric x and y")
+    d = df[[x, y]].dropna()
+    xs, ys = d[x].to_numpy(dtype="float64"), d[y].to_numpy(dtype="float64")
+    limit = int(spec.get("sample_rows") or SCATTER_MAX_POINTS)
+    if len(d) <= limit:
+        return {"kind": "points", "x": xs, "y": ys, "rows": len(d), "aggregation": "raw points"}
+    counts, xedges, yedges = np.histogram2d(xs, ys, bins=SCATTER_BINS)
+    return {
+        "kind": "density", "counts": counts, "xedges": xedges, "yedges": yedges, "rows": len(d),
+        "aggregation": f"{SCATTER_BINS}x{SCATTER_BINS} density bins of {len(d)} points",
+    }
+
+
+def _box_columns(df: pd.DataFrame, spec: dict) -> tuple:
+    """(value column, group column or None) for a box/violin spec."""
+    x, y = spec["x"], spec["y"]
+
+    def groupable(col):
+        return col is None or not _is_numeric(df[col]) or df[col].nunique() <= MAX_CATEGORIES
+
+    if y is not None and _is_numeric(df[y]) and groupable(x):
+        return y, x
+    if x is not None and _is_numeric(df[x]) and groupable(y):
+        return x, y
+    raise ValueError(f"{spec['type']} needs a numeric value column and a categorical group")
+
+
+def _aggregate_distribution(df: pd.DataFrame, spec: dict) -> dict:
+    value, group = _box_columns(df, spec)
+    d = df[[value] + ([group] if group else [])].dropna()
+    if group is None:
+        keys = pd.Series("all", index=d.index)
+        groups = ["all"]
+    else:
+        groups = _top_categories(d[group])
+        d = d[d[group].isin(groups)]
+        keys = d[group]
+    v = d[value].astype("float64")
+
+    q = v.groupby(keys).quantile([0.0, 0.25, 0.5, 0.75, 1.0]).unstack()
+    iqr = q[0.75] - q[0.25]
+    lo_fence, hi_fence = keys.map(q[0.25] - 1.5 * iqr), keys.map(q[0.75] + 1.5 * iqr)
+    whislo = v.where(v >= lo_fence).groupby(keys).min()
+    whishi = v.where(v <= hi_fence).groupby(keys).max()
+    outliers = ((v < lo_fence) | (v > hi_fence)).groupby(keys).sum()
+    counts = keys.value_counts()
+    mean = v.groupby(keys).mean()
+
+    stats = [{
+        "label": str(g), "whislo": float(whislo[g]), "q1": float(q.at[g, 0.25]),
+        "med": float(q.at[g, 0.5]), "q3": float(q.at[g, 0.75]), "whishi": float(whishi[g]),
+        "mean": float(mean[g]), "fliers": [], "n": int(counts[g]), "outliers": int(outliers[g]),
+    } for g in groups if g in q.index]
+    payload = {
+        "kind": "box", "stats": stats, "value": value, "group": group, "rows": len(d),
+        "aggregation": f"quantiles of {len(stats)} groups",
+    }
+
+    if spec["type"] == "violin" and len(d):
+        lo, hi = float(v.min()), float(v.max())
+        edges = np.linspace(lo, hi if hi > lo else lo + 1.0, _VIOLIN_BINS + 1)
+        codes = pd.Categorical(keys, categories=groups).codes.astype("int64")
+        bins = np.clip(np.searchsorted(edges, v.to_numpy(), side="right") - 1, 0, _VIOLIN_BINS - 1)
+        density = np.bincount(
+            codes * _VIOLIN_BINS + bins, minlength=len(groups) * _VIOLIN_BINS
+        ).reshape(len(groups), _VIOLIN_BINS).astype("float64")
+        density /= np.maximum(density.max(axis=1, keepdims=True), 1.0)
+        payload.update({"kind": "violin", "edges": edges, "density": density,
+                        "aggregation": f"quantiles and {_VIOLIN_BINS}-bin densities of {len(stats)} groups"})
+    return payload
+
+
+def _resample_freq(spec: dict, dates: pd.Series) -> str:
+    freq = spec.get("date_freq") or spec.get("freq")
+    if freq:
+        return _FREQ_ALIASES.get(str(freq), str(freq))
+    span_days = max((dates.max() - dates.min()).days, 1)
+    for freq, days in _AUTO_FREQS:
+        if span_days / days <= TIME_SERIES_MAX_POINTS:
+            return freq
+    return _AUTO_FREQS[-1][0]
+
+
+def _aggregate_time_series(df: pd.DataFrame, spec: dict) -> dict:
+    x, y, hue = spec["x"], spec["y"], spec["hue"]
+    dates = pd.to_datetime(df[x], errors="coerce")
+    if dates.notna().sum() == 0:
+        raise ValueError(f"time_series needs a date column; {x!r} has no parseable dates")
+    if y is not None and not _is_numeric(df[y]):
+        raise ValueError("time_series needs a numeric y (or none, to count rows)")
+    agg = spec.get("agg", "mean" if y is not None else "count")
+    if agg not in _AGGS:
+        raise ValueError(f"unsupported agg {agg!r}; use one of {', '.join(_AGGS)}")
+
+    d = pd.DataFrame({"date": dates, "value": df[y] if y is not None else 1})
+    if hue is not None:
+        d["hue"] = df[hue]
+        d = d[d["hue"].isin(_top_categories(d["hue"]))]
+    d = d.dropna()
+    freq = _resample_freq(spec, d["date"])
+    keys = [pd.Grouper(key="date", freq=freq)] + (["hue"] if hue is not None else [])
+    series = d.groupby(keys)["value"].agg(agg)
+    table = series.unstack() if hue is not None else series.to_frame(y or "rows")
+    return {
+        "kind": "lines", "index": table.index.to_numpy(), "values": table.to_numpy(dtype="float64"),
+        "labels": [str(c) for c in table.columns], "ylabel": f"{agg}({y})" if y else "rows",
+        "rows": len(d), "aggregation": f"{agg} per {freq} period ({len(table)} points)",
+    }
+
+
+def _fold_other(s: pd.Series) -> pd.Series:
+    top = _top_categories(s)
+    return s.astype(object).where(s.isin(top), "Other")
+
+
+def _aggregate_stacked_bar(df: pd.DataFrame, spec: dict) -> dict:
+    x = spec["x"]
+    stack = spec["hue"] or spec["y"]
+    if stack is None:
+        raise ValueError("stacked_bar needs a column to stack by (hue or y)")
+    d = df[[x, stack]].dropna()
+    table = pd.crosstab(_fold_other(d[x]), _fold_other(d[stack]))
+    normalize = str(spec.get("normalize", "")).lower() in ("percent", "percentage", "true", "index", "1")
+    if normalize:
+        table = table.div(table.sum(axis=1).replace(0, 1), axis=0) * 100
+    return {
+        "kind": "stacked", "categories": [str(c) for c in table.index],
+        "labels": [str(c) for c in table.columns], "values": table.to_numpy(dtype="float64"),
+        "ylabel": "percent of rows" if normalize else "rows", "rows": len(d),
+        "aggregation": f"{table.shape[0]}x{table.shape[1]} crosstab",
+    }
+
+
+def _aggregate_bars(df: pd.DataFrame, spec: dict) -> dict:
+    x = spec["x"]
+    s = df[x].dropna()
+    if spec["type"] == "histogram" and _is_numeric(s):
+        counts, edges = np.histogram(s.to_numpy(dtype="float64"), bins=int(spec.get("bins", 30)))
+        return {"kind": "histogram", "counts": counts, "edges": edges, "rows": len(s),
+                "aggregation": f"{len(counts)}-bin histogram"}
+    counts = s.value_counts().iloc[:MAX_CATEGORIES]
+    return {"kind": "bars", "categories": [str(c) for c in counts.index], "counts": counts.to_numpy(),
+            "rows": len(s), "aggregation": f"top {len(counts)} of {s.nunique()} values"}
+
+
+_AGGREGATORS = {
+    "scatter": _aggregate_scatter,
+    "box": _aggregate_distribution,
+    "violin": _aggregate_distribution,
+    "time_series": _aggregate_time_series,
+    "stacked_bar": _aggregate_stacked_bar,
+    "histogram": _aggregate_bars,
+    "bar": _aggregate_bars,
+}
+
+
+def aggregate_plot(df: pd.DataFrame, spec: dict) -> dict:
+    """
+    Reduce the data behind one normalized plot spec to what its figure draws.
+
+    Scatter plots above ``sample_rows`` (default PLOT_SCATTER_MAX_POINTS)
+    points become 2-D density bins; box/violin plots become per-group
+    quantiles, whiskers and (violin) binned densities; time series are
+    resampled to ``date_freq``; stacked bars become a crosstab. The result
+    holds small arrays only, so it is cheap to send to a render worker.
+    """
+    payload = _AGGREGATORS[spec["type"]](df, spec)
+    payload["spec"] = spec
+    return payload
+
+
+def _init_worker() -> None:
+    os.environ["MPLBACKEND"] = "Agg"
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _render_figure(payload: dict, path: str) -> str:
+    """Worker: draw an aggregated plot with the Agg backend and write it as PNG."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.colors import LogNorm
+    from matplotlib.figure import Figure
+
+    spec = payload["spec"]
+    fig = Figure(figsize=(8, 5), dpi=100)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    kind = payload["kind"]
+
+    if kind == "points":
+        ax.scatter(payload["x"], payload["y"], s=4, alpha=0.5, linewidths=0)
+    elif kind == "density":
+        counts = np.ma.masked_equal(payload["counts"].T, 0)
+        mesh = ax.pcolormesh(payload["xedges"], payload["yedges"], counts, norm=LogNorm(), cmap="viridis")
+        fig.colorbar(mesh, ax=ax, label="rows per bin")
+    elif kind in ("box", "violin"):
+        stats = payload["stats"]
+        if kind == "violin":
+            edges = payload["edges"]
+            centers = (edges[:-1] + edges[1:]) / 2
+            for i, row in enumerate(payload["density"][:len(stats)]):
+                ax.fill_betweenx(centers, i + 1 - 0.4 * row, i + 1 + 0.4 * row, alpha=0.4, linewidth=0)
+        ax.bxp(stats, showfliers=False, showmeans=True, widths=0.15 if kind == "violin" else 0.5)
+        ax.set_ylabel(payload["value"])
+        if payload["group"]:
+            ax.set_xlabel(payload["group"])
+        ax.tick_params(axis="x", labelrotation=45)
+    elif kind == "lines":
+        values = payload["values"]
+        for j, label in enumerate(payload["labels"]):
+            ax.plot(payload["index"], values[:, j], label=label, linewidth=1.2)
+        if len(payload["labels"]) > 1:
+            ax.legend(fontsize="small")
+        ax.set_ylabel(payload["ylabel"])
+        fig.autofmt_xdate()
+    elif kind == "stacked":
+        bottom = np.zeros(len(payload["categories"]))
+        for j, label in enumerate(payload["labels"]):
+            ax.bar(payload["categories"], payload["values"][:, j], bottom=bottom, label=label)
+            bottom += payload["values"][:, j]
+        ax.legend(fontsize="small")
+        ax.set_ylabel(payload["ylabel"])
+        ax.tick_params(axis="x", labelrotation=45)
+    elif kind == "histogram":
+        edges = payload["edges"]
+        ax.bar(edges[:-1], payload["counts"], width=np.diff(edges), align="edge")
+        ax.set_ylabel("rows")
+    elif kind == "bars":
+        ax.bar(payload["categories"], payload["counts"])
+        ax.set_ylabel("rows")
+        ax.tick_params(axis="x", labelrotation=45)
+
+    if kind in ("points", "density"):
+        ax.set_xlabel(spec["x"])
+        ax.set_ylabel(spec["y"])
+    elif kind in ("lines", "stacked", "histogram", "bars"):
+        ax.set_xlabel(spec["x"])
+    title = spec.get("title") or " by ".join(str(c) for c in (spec["y"], spec["x"]) if c)
+    ax.set_title(f"{title}\n({payload['aggregation']})", fontsize="medium")
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    fig.savefig(tmp, format="png", bbox_inches="tight")
+    os.replace(tmp, path)
+    return path
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    # Kept alive across runs so workers import matplotlib only once. Created
+    # from whichever thread renders first, so workers are not forked (see
+    # pool_context)
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, RENDER_WORKERS), mp_context=pool_context(), initializer=_init_worker
+            )
+        return _pool
+
+
+def _discard_pool(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool that lost a worker, so the next render starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _evict_figures(figure_dir: Path) -> None:
+    entries = sorted(figure_dir.glob("*.png"), key=lambda p: p.stat().st_mtime_ns)
+    for entry in entries[: max(len(entries) - FIGURE_CACHE_MAX_ENTRIES, 0)]:
+        entry.unlink(missing_ok=True)
+
+
+def render_plot_plan(plan: Any, file_path: str, figure_dir: Path = FIGURE_DIR) -> list:
+    """
+    Render every plot of a PlotPlan against a dataset.
+
+    Parameters
+    ----------
+    plan : dict, list or str
+        The designer's PlotPlan (see ``parse_plot_plan``).
+    file_path : str
+        Path to the CSV file the plan describes.
+    figure_dir : Path
+        Where PNGs are written. Defaults to FIGURE_CACHE_DIR
+        (data/cache/figures).
+
+    Returns
+    -------
+    list[dict]
+        One record per plot spec, in plan order::
+
+            {"type", "x", "y", "hue", "path", "cached": bool,
+             "rows": int, "aggregation": str}
+
+        or ``{"type", "x", "y", "hue", "error": str}`` for a spec that
+        cannot be drawn (unknown type or column, unsuitable dtypes).
+
+    Notes
+    -----
+    - Figures are keyed by the normalized spec and the SHA-256 of the file
+      content (via the profile cache's stat index, so unchanged files are
+      not re-hashed). A cached figure is returned without loading the data.
+    - Columns used by uncached plots are loaded once (from the columnar copy
+      when available) and each plot is pre-aggregated in this process; see
+      ``aggregate_plot``. Only the aggregates go to the worker processes,
+      which draw in parallel with the Agg backend.
+    """
+    specs = [_normalize_spec(spec) for spec in parse_plot_plan(plan)]
+    if not specs:
+        return []
+    names = set(csv_header(file_path)[0])
+    figure_dir = Path(figure_dir)
+
+    figures, pending = [], []
+    for spec in specs:
+        record = {key: spec[key] for key in ("type", "x", "y", "hue")}
+        figures.append(record)
+        if spec["type"] not in _AGGREGATORS:
+            record["error"] = f"unsupported plot type {spec['type']!r}"
+            continue
+        missing = [c for c in (spec["x"], spec["y"], spec["hue"]) if c is not None and c not in names]
+        if spec["x"] is None and spec["y"] is None:
+            missing = ["x"]
+        if missing:
+            record["error"] = f"unknown column(s): {', '.join(map(str, missing))}"
+            continue
+        key = profile_cache.key(file_path, plot=spec, renderer=_RENDER_VERSION)
+        path = figure_dir / f"{key[:32]}.png"
+        if path.exists():
+            os.utime(path)
+            record.update({"path": str(path), "cached": True})
+            continue
+        if spec["x"] is None:
+            spec = {**spec, "x": spec["y"], "y": None}
+        pending.append((record, spec, path))
+
+    if not pending:
+        return figures
+
+    columns = sorted({c for _, spec, _ in pending for c in (spec["x"], spec["y"], spec["hue"]) if c is not None})
+    df = read_dataset(file_path, columns=columns)
+    figure_dir.mkdir(parents=True, exist_ok=True)
+    pool = _get_pool()
+    futures = []
+    for record, spec, path in pending:
+        try:
+            payload = aggregate_plot(df, spec)
+        except (ValueError, TypeError, KeyError) as e:
+            record["error"] = str(e)
+            continue
+        record.update({"rows": payload["rows"], "aggregation": payload["aggregation"]})
+        try:
+            future = pool.submit(_render_figure, payload, str(path))
+        except BrokenProcessPool:
+            # A worker died during an earlier render; start a new pool
+            _discard_pool(pool)
+            pool = _get_pool()
+            future = pool.submit(_render_figure, payload, str(path))
+        futures.append((record, future))
+    del df
+
+    broken = False
+    for record, future in futures:
+        try:
+            record.update({"path": future.result(), "cached": False})
+        except Exception as e:
+            logger.error(f"Rendering {record['type']} plot failed: {e}")
+            record["error"] = f"{type(e).__name__}: {e}"
+            broken = broken or isinstance(e, BrokenProcessPool)
+    if broken:
+        _discard_pool(pool)
+    _evict_figures(figure_dir)
+    logger.info(f"Rendered {len(futures)} figure(s) for {file_path}, {len(specs) - len(pending)} cached or skipped")
+    return figures
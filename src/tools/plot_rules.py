@@ -0,0 +1,129 @@
+import os
+from typing import Optional
+
+import pandas as pd
+
+from src.tools.plot_renderer import MAX_CATEGORIES
+from src.tools.utils import guess_target_column
+
+
+# Build the PlotPlan from the profile without an LLM call when the rules apply.
+RULES_ENABLED = os.getenv("DESIGNER_RULES", "true").lower() not in ("0", "false", "no")
+# Upper bound on plots in a rule-based plan.
+RULE_MAX_PLOTS = int(os.getenv("DESIGNER_RULE_MAX_PLOTS", "8"))
+
+# Columns with at least this share of distinct values are treated as identifiers
+_ID_RATIO = 0.99
+
+
+def _looks_like_dates(values: list) -> bool:
+    """True if every sampled value is an ISO-8601 date string."""
+    values = [v for v in values if isinstance(v, str) and v]
+    if not values or not all(v[:1].isdigit() and ("-" in v or "/" in v) for v in values):
+        return False
+    parsed = pd.to_datetime(pd.Series(values), format="ISO8601", errors="coerce")
+    return not parsed.isna().any()
+
+
+def classify_columns(profile: dict) -> dict:
+    """
+    Logical type of each profiled column, from dtypes and distinct counts.
+
+    Returns ``{col: kind}`` with kind one of ``"numeric"``, ``"categorical"``
+    (at most PLOT_MAX_CATEGORIES distinct values), ``"temporal"`` (datetime
+    dtype, or strings whose sampled values are ISO dates), ``"id"`` (integers
+    or strings that are nearly all distinct), ``"text"`` (other
+    high-cardinality strings) or ``"constant"``.
+    """
+    rows = profile.get("shape", {}).get("rows", 0)
+    samples = profile.get("sample_rows", [])
+    kinds = {}
+    for col in profile.get("columns", []):
+        dtype = str(profile.get("dtypes", {}).get(col, ""))
+        unique = profile.get("unique_values", {}).get(col, 0)
+        nearly_all_distinct = rows > 0 and unique >= _ID_RATIO * rows
+        if unique <= 1:
+            kinds[col] = "constant"
+        elif dtype.startswith("datetime"):
+            kinds[col] = "temporal"
+        elif col in profile.get("numeric_summary", {}) and dtype != "bool":
+            if unique <= MAX_CATEGORIES:
+                kinds[col] = "categorical"
+            elif nearly_all_distinct and dtype.startswith(("int", "uint")):
+                kinds[col] = "id"
+            else:
+                kinds[col] = "numeric"
+        elif _looks_like_dates([row.get(col) for row in samples]):
+            kinds[col] = "temporal"
+        elif unique <= MAX_CATEGORIES:
+            kinds[col] = "categorical"
+        else:
+            kinds[col] = "id" if nearly_all_distinct else "text"
+    return kinds
+
+
+def rule_based_plot_plan(profile: dict, hint: Optional[str] = None) -> Optional[dict]:
+    """
+    Build a PlotPlan from a structured profile with the designer's mapping rules.
+
+    Parameters
+    ----------
+    profile : dict
+        A profile as returned by ``dataset_profile_tool``.
+    hint : str, optional
+        Text naming the target (profiler summary, strategy); see
+        ``guess_target_column``.
+
+    Returns
+    -------
+    dict or None
+        ``{"plots": [...], "target": str, "source": "rules"}``, or None when
+        the rules do not cover the dataset (no recognizable numeric or
+        categorical target, or no feature to relate it to), in which case
+        the designer falls back to the LLM.
+
+    Notes
+    -----
+    The same rules the designer prompt gives the model:
+
+    - categorical target: its class balance (bar), categorical features as
+      ``stacked_bar`` with ``normalize=percent``, numeric features as
+      ``box`` by target;
+    - numeric target: its distribution (histogram), numeric features as
+      ``scatter`` (the renderer bins large ones), categorical features as
+      ``box``;
+    - a temporal column adds a ``time_series`` of the target.
+
+    Features are taken in column order, least-null first, skipping IDs,
+    free text and constants. The plan depends only on the profile, so the
+    same data always yields the same plan.
+    """
+    kinds = classify_columns(profile)
+    target = guess_target_column(profile, hint)
+    if target is None or kinds.get(target) not in ("numeric", "categorical"):
+        return None
+
+    nulls = profile.get("nulls", {})
+    features = sorted(
+        (col for col in profile.get("columns", []) if col != target),
+        key=lambda col: nulls.get(col, {}).get("null_percentage", 0.0)
+    )
+    numeric = [col for col in features if kinds[col] == "numeric"]
+    categorical = [col for col in features if kinds[col] == "categorical"]
+    temporal = [col for col in features if kinds[col] == "temporal"]
+
+    plots = []
+    if kinds[target] == "categorical":
+        plots.append({"type": "bar", "x": target})
+        plots += [{"type": "stacked_bar", "x": col, "y": target, "normalize": "percent"} for col in categorical[:2]]
+        plots += [{"type": "box", "x": target, "y": col} for col in numeric[:3]]
+        plots += [{"type": "time_series", "x": col, "hue": target} for col in temporal[:1]]
+    else:
+        plots.append({"type": "histogram", "x": target, "bins": 30})
+        plots += [{"type": "scatter", "x": col, "y": target} for col in numeric[:3]]
+        plots += [{"type": "box", "x": col, "y": target} for col in categorical[:2]]
+        plots += [{"type": "time_series", "x": col, "y": target} for col in temporal[:1]]
+
+    if len(plots) < 2:
+        return None
+    return {"plots": plots[:RULE_MAX_PLOTS], "target": target, "source": "rules"}
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from src.utils.instrumentation import record_cache_hit
+from src.utils.logger import logger
+
+
+CACHE_DIR = Path(os.getenv("PROFILE_CACHE_DIR", "data/cache/profiles"))
+MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "256"))
+MAX_BYTES = int(os.getenv("PROFILE_CACHE_MAX_MB", "256")) * 1024 * 1024
+CACHE_ENABLED = os.getenv("PROFILE_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+
+_HASH_BLOCK = 1024 * 1024
+
+
+def file_digest(file_path: str, stat_index: Optional[dict] = None) -> str:
+    """
+    Return the SHA-256 of a file's content.
+
+    When ``stat_index`` already has an entry for the file with the same size
+    and mtime, the recorded digest is returned without reading the file.
+    """
+    path = os.path.realpath(file_path)
+    st = os.stat(path)
+    if stat_index is not None:
+        known = stat_index.get(path)
+        if known and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+            return known["digest"]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            h.update(block)
+    digest = h.hexdigest()
+
+    if stat_index is not None:
+        stat_index[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": digest}
+    return digest
+
+
+class ProfileCache:
+    """
+    Persistent, size-bounded LRU cache of dataset profiles.
+
+    Entries are JSON files named after the SHA-256 of the file content plus
+    the profiling options, so a renamed or re-uploaded copy of the same data
+    still hits. A stat index (path -> size, mtime, digest) lets unchanged
+    files skip hashing. Recency is tracked with entry mtimes, which are
+    bumped on every hit; the oldest entries are evicted once the cache
+    exceeds ``max_entries`` or ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = CACHE_DIR,
+        max_entries: int = MAX_ENTRIES,
+        max_bytes: int = MAX_BYTES
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.entries_dir = self.cache_dir / "entries"
+        self.index_path = self.cache_dir / "stat_index.json"
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._stat_index: Optional[dict] = None
+
+    def _load_index(self) -> dict:
+        if self._stat_index is None:
+            try:
+                self._stat_index = json.loads(self.index_path.read_text())
+            except (OSError, ValueError):
+                self._stat_index = {}
+        return self._stat_index
+
+    def _save_index(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._stat_index))
+        os.replace(tmp, self.index_path)
+
+    def key(self, file_path: str, **options) -> str:
+        """Cache key for a file's content and the options that shape its profile."""
+        with self._lock:
+            index = self._load_index()
+            known = index.get(os.path.realpath(file_path))
+            digest = file_digest(file_path, index)
+            # file_digest stores a fresh entry only when it had to re-hash
+            if index.get(os.path.realpath(file_path)) is not known:
+                self._save_index()
+        return self._entry_key(digest, options)
+
+    def known_key(self, file_path: str, **options) -> Optional[str]:
+        """
+        Like :meth:`key`, but never hashes the file.
+
+        Returns None when the stat index has no digest for the file's current
+        size and mtime, so callers on a latency budget can skip the cache.
+        """
+        path = os.path.realpath(file_path)
+        st = os.stat(path)
+        with self._lock:
+            known = self._load_index().get(path)
+        if not known or known["size"] != st.st_size or known["mtime_ns"] != st.st_mtime_ns:
+            return None
+        return self._entry_key(known["digest"], options)
+
+    @staticmethod
+    def _entry_key(digest: str, options: dict) -> str:
+        payload = json.dumps(options, sort_keys=True, default=str)
+        return hashlib.sha256(f"{digest}|{payload}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached profile for ``key``, or None on a miss."""
+        path = self.entries_dir / f"{key}.json"
+        try:
+            profile = json.loads(path.read_text())
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        record_cache_hit("profile")
+        logger.debug(f"Profile cache hit: {key[:12]}")
+        return profile
+
+    def put(self, key: str, profile: dict) -> None:
+        """Store a profile and evict least recently used entries over the limits."""
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        path = self.entries_dir / f"{key}.json"
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(profile, default=str))
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in self.entries_dir.glob("*.json"):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, entry))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, entry = entries.pop(0)
+            entry.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every cached profile and the stat index."""
+        with self._lock:
+            for entry in self.entries_dir.glob("*.json"):
+                entry.unlink(missing_ok=True)
+            self.index_path.unlink(missing_ok=True)
+            self._stat_index = {}
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Singleton instance
+profile_cache = ProfileCache()
@@ -0,0 +1,240 @@
+import json
+import math
+import os
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Optional
+
+
+# Default token budget for a profile pasted into a prompt.
+PROFILE_TOKEN_BUDGET = int(os.getenv("PROFILE_TOKEN_BUDGET", "3000"))
+
+_SIG_DIGITS = 4
+# Quantiles shown per numeric column and most frequent values per column.
+_SHOWN_QUANTILES = ("p1", "p25", "p50", "p75", "p99")
+_SHOWN_TOP_VALUES = 3
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:  # tiktoken missing or encoding unavailable offline
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate how many tokens ``text`` costs in a prompt.
+
+    Uses tiktoken's o200k_base encoding when available and falls back to
+    the usual ~4 characters per token heuristic otherwise.
+    """
+    enc = _encoding()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def _fmt(value: Any) -> str:
+    """Short, delimiter-safe rendering of one cell."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.{_SIG_DIGITS}g}"
+    text = str(value).replace("|", "/").replace("\n", " ")
+    return text if len(text) <= 40 else text[:37] + "..."
+
+
+def _column_row(profile: dict, col: str) -> str:
+    nulls = profile.get("nulls", {}).get(col, {})
+    numeric = profile.get("numeric_summary", {}).get(col, {})
+    return "|".join([
+        _fmt(col),
+        profile.get("dtypes", {}).get(col, ""),
+        _fmt(nulls.get("null_percentage")),
+        _fmt(profile.get("unique_values", {}).get(col)),
+        _fmt(numeric.get("min")),
+        _fmt(numeric.get("max")),
+        _fmt(numeric.get("mean")),
+    ])
+
+
+def _quantile_row(col: str, quantiles: dict) -> str:
+    return "|".join([_fmt(col)] + [_fmt(quantiles.get(key)) for key in _SHOWN_QUANTILES])
+
+
+def _top_values_row(profile: dict, col: str, top: dict) -> str:
+    rows = profile.get("shape", {}).get("rows") or 0
+    approx = "" if top.get("exact") else "~"
+    values = ",".join(
+        f"{_fmt(value)}:{approx}{_fmt(round(100 * count / rows, 1)) if rows else 0}%"
+        for value, count in top["values"][:_SHOWN_TOP_VALUES]
+    )
+    return f"{_fmt(col)}|{values}"
+
+
+def _target_line(balance: dict) -> str:
+    classes = ", ".join(
+        f"{_fmt(c['value'])} {_fmt(c['percent'])}%" for c in balance["classes"][:_SHOWN_TOP_VALUES * 2]
+    )
+    line = f"target={_fmt(balance['column'])} classes: {classes}"
+    if balance.get("other_percent"):
+        line += f", other {_fmt(balance['other_percent'])}%"
+    if balance.get("imbalance_ratio") is not None:
+        line += f"; imbalance_ratio={_fmt(balance['imbalance_ratio'])}"
+    return line
+
+
+def _section(lines: list, title: list, body: list, used: int, budget: int) -> int:
+    """Append ``title`` plus as many ``body`` lines as fit; returns the new ``used``."""
+    cost = sum(estimate_tokens(line) + 1 for line in title)
+    fitted = []
+    for line in body:
+        line_cost = estimate_tokens(line) + 1
+        if used + cost + line_cost > budget:
+            break
+        fitted.append(line)
+        cost += line_cost
+    if fitted:
+        lines.extend(title + fitted)
+        return used + cost
+    return used
+
+
+def _summarize_rest(profile: dict, cols: list) -> str:
+    dtypes = Counter(profile.get("dtypes", {}).get(col, "?") for col in cols)
+    nulls = profile.get("nulls", {})
+    with_nulls = [col for col in cols if nulls.get(col, {}).get("null_count")]
+    parts = [
+        f"{len(cols)} more columns not listed",
+        "dtypes " + ", ".join(f"{dt}:{n}" for dt, n in dtypes.most_common()),
+    ]
+    if with_nulls:
+        shown = ", ".join(_fmt(col) for col in with_nulls[:20])
+        more = f" (+{len(with_nulls) - 20})" if len(with_nulls) > 20 else ""
+        parts.append(f"with nulls: {shown}{more}")
+    return "# " + "; ".join(parts)
+
+
+def compact_profile(profile: dict, token_budget: Optional[int] = None) -> str:
+    """
+    Serialize a dataset profile as a compact, token-budgeted text table.
+
+    Parameters
+    ----------
+    profile : dict
+        Output of ``dataset_profile_tool`` / ``dataset_profile_logic``.
+    token_budget : int, optional
+        Upper bound on the estimated tokens of the result. Defaults to
+        ``PROFILE_TOKEN_BUDGET`` (3000).
+
+    Returns
+    -------
+    str
+        One ``name|dtype|null%|unique|min|max|mean`` row per column with
+        numbers rounded to 4 significant digits, followed, as the budget
+        allows, by quantiles of numeric columns, the most frequent values
+        of each column (share of rows, ``~`` when approximate) and sample
+        rows in the same pipe-delimited layout. The target's class balance,
+        when known, is part of the header. When everything does not fit,
+        the first columns that fit are listed and the rest are summarized
+        (dtype counts and which have nulls); the optional sections are
+        dropped first, sample rows before top values before quantiles.
+    """
+    budget = token_budget or PROFILE_TOKEN_BUDGET
+    shape = profile.get("shape", {})
+    columns = profile.get("columns", [])
+
+    header = [
+        f"rows={shape.get('rows')} columns={shape.get('columns')} "
+        f"duplicate_rows={profile.get('duplicates', {}).get('duplicate_rows')}",
+        "name|dtype|null%|unique|min|max|mean",
+    ]
+    sampling = profile.get("sampling")
+    if sampling and not sampling.get("exact"):
+        header.insert(1, f"# estimated from {sampling['sampled_rows']} sampled rows; "
+                         "counts, null%, unique and mean are approximate, min/max are sample extremes")
+    if profile.get("target_balance"):
+        header.insert(1, _target_line(profile["target_balance"]))
+    used = sum(estimate_tokens(line) + 1 for line in header)
+
+    # Reserve room for the trailing summary line in case columns are cut
+    reserve = estimate_tokens(_summarize_rest(profile, columns)) + 1
+    rows = []
+    for col in columns:
+        line = _column_row(profile, col)
+        cost = estimate_tokens(line) + 1
+        if used + cost + reserve > budget:
+            break
+        rows.append(line)
+        used += cost
+    listed = len(rows)
+
+    lines = header + rows
+    if listed < len(columns):
+        lines.append(_summarize_rest(profile, columns[listed:]))
+        return "\n".join(lines)
+
+    quantiles = profile.get("quantiles") or {}
+    used = _section(
+        lines, ["quantiles:", "name|" + "|".join(_SHOWN_QUANTILES)],
+        [_quantile_row(col, quantiles[col]) for col in columns if quantiles.get(col, {}).get("p50") is not None],
+        used, budget
+    )
+    top_values = profile.get("top_values") or {}
+    used = _section(
+        lines, ["top_values:"],
+        [_top_values_row(profile, col, top_values[col]) for col in columns if top_values.get(col, {}).get("values")],
+        used, budget
+    )
+    samples = profile.get("sample_rows") or []
+    _section(
+        lines, ["sample_rows:", "|".join(_fmt(col) for col in columns)],
+        ["|".join(_fmt(record.get(col)) for col in columns) for record in samples],
+        used, budget
+    )
+
+    return "\n".join(lines)
+
+
+def compact_relationships(result: dict) -> str:
+    """
+    Serialize a ``correlation_tool`` result as pipe-delimited pair lists.
+
+    One ``x|y|value|n`` row per pair, numeric correlations first, then
+    Cramér's V associations between categorical columns.
+    """
+    lines = [f"rows={result.get('rows')} method={result.get('method')}"]
+    if result.get("sampled_rows"):
+        lines[0] += f" sampled_rows={result['sampled_rows']}"
+    for title, pairs in (
+        (f"correlations ({result.get('method')}):", result.get("correlations") or []),
+        ("associations (cramers_v):", result.get("associations") or []),
+    ):
+        if pairs:
+            lines += [title, "x|y|value|n"]
+            lines += ["|".join([_fmt(p["x"]), _fmt(p["y"]), _fmt(p["value"]), _fmt(p["n"])]) for p in pairs]
+    if len(lines) == 1:
+        lines.append("# no numeric or categorical column pairs to relate")
+    return "\n".join(lines)
+
+
+def format_observation(observation: Any, token_budget: Optional[int] = None) -> str:
+    """Render a tool observation for an LLM prompt without pretty-printing."""
+    if hasattr(observation, 'to_string'):  # DataFrame
+        return f"Dataset loaded. Shape: {observation.shape}. Use profiling tools for details."
+    if isinstance(observation, dict):
+        if "columns" in observation and "shape" in observation:
+            return compact_profile(observation, token_budget)
+        if "correlations" in observation and "associations" in observation:
+            return compact_relationships(observation)
+        return json.dumps(observation, separators=(",", ":"), default=str)
+    return str(observation)
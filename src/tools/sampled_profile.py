@@ -0,0 +1,231 @@
+import io
+import math
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.tools.sketches import hash_rows
+from src.tools.streaming_profile import csv_header
+from src.tools.utils import dataset_profile_logic, finish_profile
+
+
+# Target number of sampled rows and strata for mode="fast".
+FAST_SAMPLE_ROWS = int(os.getenv("PROFILE_FAST_SAMPLE_ROWS", "20000"))
+FAST_STRATA = int(os.getenv("PROFILE_FAST_STRATA", "32"))
+
+# Two-sided 95% normal quantile used for every interval
+_Z = 1.959963984540054
+_PROBE_BYTES = 64 * 1024
+
+
+def wilson_interval(successes: int, n: int, z: float = _Z) -> tuple:
+    """Wilson score interval for a binomial proportion, as fractions."""
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def distinct_estimate(counts: np.ndarray, n: int, total: float) -> tuple:
+    """
+    Estimate the distinct values of a population from a sample.
+
+    ``counts`` are the per-value frequencies in a sample of ``n`` items drawn
+    from ``total`` items. Returns ``(estimate, lower, upper)``. The bounds
+    are the GEE bounds (Charikar et al., 2000): the lower bound is the number
+    of distinct values observed, and the upper bound scales values seen once
+    by total / n. The estimate is bias-corrected Chao1, d + f1(f1-1)/(2(f2+1)),
+    clipped to the bounds. Unlike the GEE point estimate (which scales values
+    seen once by sqrt(total / n)), it approaches ``total`` for key-like columns
+    where nearly every sampled value is seen once.
+    """
+    if n == 0:
+        return 0, 0, 0
+    observed = len(counts)
+    f1 = int((counts == 1).sum())
+    f2 = int((counts == 2).sum())
+    ratio = max(total / n, 1.0)
+    upper = min(ratio * f1 + (observed - f1), max(total, observed))
+    estimate = min(observed + f1 * (f1 - 1) / (2 * (f2 + 1)), upper)
+    return int(round(estimate)), observed, int(round(upper))
+
+
+def _head_row_bytes(file_path: str, data_start: int) -> float:
+    """Average bytes per line over the first 64 KB of data."""
+    with open(file_path, "rb") as f:
+        f.seek(data_start)
+        probe = f.read(_PROBE_BYTES)
+    return len(probe) / max(probe.count(b"\n"), 1)
+
+
+def _sample_blocks(
+    file_path: str,
+    data_start: int,
+    size: int,
+    row_bytes: float,
+    rows: int,
+    strata: int,
+    seed: int
+) -> bytes:
+    """
+    Read one contiguous block of whole lines at a random offset in each stratum.
+
+    The data region is split into ``strata`` equal byte ranges; each block
+    holds about ``rows / strata`` lines of ``row_bytes`` bytes.
+    """
+    with open(file_path, "rb") as f:
+        block_bytes = int(row_bytes * max(rows // strata, 1)) + 1
+        stratum = (size - data_start) / strata
+        rng = np.random.default_rng(seed)
+        blocks = []
+        for i in range(strata):
+            lo = data_start + int(i * stratum)
+            hi = data_start + int((i + 1) * stratum)
+            start = lo + int(rng.integers(0, max(hi - lo - block_bytes, 0) + 1))
+            f.seek(start)
+            data = f.read(block_bytes)
+            # Drop the partial line at each end of the block
+            if start > data_start:
+                data = data[data.find(b"\n") + 1:] if b"\n" in data else b""
+            blocks.append(data[: data.rfind(b"\n") + 1])
+    return b"".join(blocks)
+
+
+def sampled_profile(
+    file_path: str,
+    sample_rows: int = 5,
+    n_samples: Optional[int] = None,
+    strata: Optional[int] = None,
+    seed: int = 0
+) -> dict:
+    """
+    Estimate a dataset profile from stratified block samples of a CSV file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the CSV file to profile.
+    sample_rows : int, default 5
+        Number of first rows to include as a sample in the profile.
+    n_samples : int, optional
+        Rows to sample. Defaults to ``PROFILE_FAST_SAMPLE_ROWS`` (20,000).
+    strata : int, optional
+        Equal byte ranges sampled independently. Defaults to
+        ``PROFILE_FAST_STRATA`` (32).
+    seed : int, default 0
+        Seed for the block offsets, so repeated calls return the same profile.
+
+    Returns
+    -------
+    dict
+        The ``dataset_profile_logic`` schema with estimated values, plus a
+        ``sampling`` entry::
+
+            {"exact": bool, "sampled_rows": int, "confidence": 0.95,
+             "intervals": {
+                 "rows": [lo, hi],
+                 "null_percentage": {col: [lo, hi]},   # Wilson score
+                 "mean": {col: [lo, hi]},              # normal approximation
+                 "unique_values": {col: [lo, hi]},     # GEE bounds
+                 "duplicate_rows": [lo, hi]}}
+
+    Notes
+    -----
+    - Only about ``n_samples`` rows worth of bytes are read, so the cost does
+      not grow with the file size. Files that small are profiled exactly.
+    - Blocks start at random byte offsets and are aligned to newlines, so a
+      quoted field that contains newlines can misalign a block.
+    - Intervals treat sampled rows as independent. Rows within a block are
+      neighbours, so for data sorted or clustered on disk the true
+      uncertainty is larger; more strata reduce that effect.
+    - Row counts are estimated from the sampled bytes per row; min/max are
+      the extremes seen in the sample, not bounds on the file.
+    - Quantiles are those of the sample; histogram, top-value and target
+      class counts are sample counts scaled to the estimated row count.
+    """
+    n_samples = n_samples or FAST_SAMPLE_ROWS
+    strata = strata or FAST_STRATA
+    names, data_start = csv_header(file_path)
+    size = os.path.getsize(file_path)
+
+    row_bytes = _head_row_bytes(file_path, data_start)
+    if size - data_start <= 2 * n_samples * row_bytes:
+        profile = dataset_profile_logic(pd.read_csv(file_path), sample_rows)
+        profile["sampling"] = {"exact": True, "sampled_rows": profile["shape"]["rows"]}
+        return profile
+
+    data = _sample_blocks(file_path, data_start, size, row_bytes, n_samples, strata, seed)
+    sample = pd.read_csv(io.BytesIO(data), header=None, names=names)
+    n = len(sample)
+    sampled_row_bytes = len(data) / max(n, 1)
+    est_rows = (size - data_start) / sampled_row_bytes
+
+    profile = dataset_profile_logic(sample, sample_rows=0)
+    profile["sample_rows"] = pd.read_csv(file_path, nrows=sample_rows).to_dict(orient="records")
+    profile["shape"]["rows"] = int(round(est_rows))
+
+    # Bytes per row are a mean over sampled rows; its standard error bounds the count
+    lengths = np.diff(np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n")), prepend=-1)
+    se = lengths.std(ddof=1) / math.sqrt(n) if n > 1 else 0.0
+    intervals = {
+        "rows": [
+            int((size - data_start) / (sampled_row_bytes + _Z * se)),
+            int((size - data_start) / max(sampled_row_bytes - _Z * se, 1.0)),
+        ],
+        "null_percentage": {},
+        "mean": {},
+        "unique_values": {},
+    }
+
+    nulls = sample.isna().sum()
+    for col in names:
+        null_count = int(nulls[col])
+        lo, hi = wilson_interval(null_count, n)
+        profile["nulls"][col] = {
+            "null_count": int(round(null_count / n * est_rows)) if n else 0,
+            "null_percentage": round(null_count / n * 100, 2) if n else 0.0
+        }
+        intervals["null_percentage"][col] = [round(lo * 100, 2), round(hi * 100, 2)]
+
+        values = sample[col].dropna()
+        est, lo, hi = distinct_estimate(
+            values.value_counts().to_numpy(), len(values), len(values) / n * est_rows if n else 0
+        )
+        profile["unique_values"][col] = est
+        intervals["unique_values"][col] = [lo, hi]
+
+        if col in profile["numeric_summary"] and len(values) > 1:
+            mean = profile["numeric_summary"][col]["mean"]
+            half = _Z * float(values.astype("float64").std(ddof=1)) / math.sqrt(len(values))
+            intervals["mean"][col] = [mean - half, mean + half]
+
+    # Histogram and top-value counts seen in the sample, scaled to the file
+    scale = est_rows / n if n else 0.0
+    for histogram in profile["histograms"].values():
+        if histogram:
+            histogram["counts"] = [int(round(count * scale)) for count in histogram["counts"]]
+    for top in profile["top_values"].values():
+        top["values"] = [[value, int(round(count * scale))] for value, count in top["values"]]
+        top["exact"] = False
+    finish_profile(profile)
+
+    row_counts = pd.Series(hash_rows(sample)).value_counts().to_numpy()
+    distinct, distinct_lo, distinct_hi = distinct_estimate(row_counts, n, est_rows)
+    profile["duplicates"]["duplicate_rows"] = max(0, int(round(est_rows)) - distinct)
+    intervals["duplicate_rows"] = [
+        max(0, int(round(est_rows)) - distinct_hi),
+        max(0, int(round(est_rows)) - distinct_lo),
+    ]
+
+    profile["sampling"] = {
+        "exact": False,
+        "sampled_rows": n,
+        "confidence": 0.95,
+        "intervals": intervals,
+    }
+    return profile
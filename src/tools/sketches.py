@@ -0,0 +1,489 @@
+import math
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+def hash_values(s: pd.Series) -> np.ndarray:
+    """
+    Hash the non-null values of a column to uint64 fingerprints.
+
+    Integer columns are hashed as float64 so that a column inferred as int64
+    in one chunk and float64 in another fingerprints its values identically.
+    Adding 0.0 turns -0.0 into 0.0, which pandas counts as the same value.
+    """
+    s = s.dropna()
+    if pd.api.types.is_integer_dtype(s.dtype):
+        s = s.astype("float64")
+    elif pd.api.types.is_float_dtype(s.dtype):
+        s = s + 0.0
+    return pd.util.hash_pandas_object(s, index=False).to_numpy()
+
+
+def hash_rows(df: pd.DataFrame) -> np.ndarray:
+    """Hash whole rows to uint64 fingerprints, numeric columns as ``hash_values`` does."""
+    int_cols = [c for c, dt in df.dtypes.items() if pd.api.types.is_integer_dtype(dt)]
+    float_cols = [c for c, dt in df.dtypes.items() if pd.api.types.is_float_dtype(dt)]
+    if int_cols or float_cols:
+        df = df.astype({c: "float64" for c in int_cols})
+        df[float_cols] = df[float_cols] + 0.0
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def count_values(s: pd.Series) -> pd.Series:
+    """
+    Occurrences of each non-null value of a column, in first-seen order.
+
+    Same counts as ``Series.value_counts()`` without the sort, from one
+    ``factorize`` pass, which for pyarrow strings costs about a third as
+    much. ``len()`` of the result is the distinct count.
+    """
+    codes, uniques = pd.factorize(s)
+    return pd.Series(np.bincount(codes[codes >= 0], minlength=len(uniques)), index=uniques)
+
+
+def sorted_unique(values: np.ndarray) -> np.ndarray:
+    """
+    Sorted distinct values of a 1-d array.
+
+    Same result as ``np.unique``, which in numpy 2.x hashes instead of
+    sorting and is several times slower on uint64 fingerprints.
+    """
+    values = np.sort(values)
+    if len(values) < 2:
+        return values
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+class FingerprintSet:
+    """
+    Exact distinct counter over uint64 fingerprints.
+
+    Memory is 8 bytes per distinct fingerprint. Two different values collide
+    with probability 2**-64, so over n distinct values the expected number of
+    lost distinct values is at most n**2 / 2**65 (about 3e-4 for n = 10**8).
+    """
+
+    def __init__(self):
+        self._sorted = np.empty(0, dtype=np.uint64)
+        self._pending: list = []
+        self._pending_size = 0
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        self._pending.append(sorted_unique(hashes))
+        self._pending_size += len(self._pending[-1])
+        # Amortize the sort: only compact once the buffer outgrows the set
+        if self._pending_size > max(len(self._sorted), 1 << 16):
+            self._compact()
+
+    def merge(self, other: "FingerprintSet") -> None:
+        other._compact()
+        self.add_hashes(other._sorted)
+
+    def _compact(self) -> None:
+        if not self._pending:
+            return
+        new = self._pending[0] if len(self._pending) == 1 else sorted_unique(np.concatenate(self._pending))
+        # Merge into the sorted set in linear time rather than re-sorting it,
+        # so a small append to a large set costs about the size of the append
+        pos = np.searchsorted(self._sorted, new)
+        present = pos < len(self._sorted)
+        present[present] = self._sorted[pos[present]] == new[present]
+        self._sorted = np.insert(self._sorted, pos[~present], new[~present])
+        self._pending = []
+        self._pending_size = 0
+
+    def cardinality(self) -> int:
+        self._compact()
+        return int(len(self._sorted))
+
+    def size_bound(self) -> int:
+        """Upper bound on the cardinality that does not compact the buffer."""
+        return len(self._sorted) + self._pending_size
+
+    def fingerprints(self) -> np.ndarray:
+        """The distinct fingerprints, sorted."""
+        self._compact()
+        return self._sorted
+
+    def __getstate__(self):
+        self._compact()
+        return self.__dict__
+
+
+class HyperLogLog:
+    """
+    Mergeable HyperLogLog distinct-count sketch over uint64 fingerprints.
+
+    Uses ``2**precision`` one-byte registers. The relative standard error of
+    the estimate is ``1.04 / sqrt(2**precision)``: about 1.6% for the default
+    precision of 12 (4 KB per column) and 0.8% for precision 14 (16 KB).
+    Small cardinalities fall back to linear counting and are near exact.
+    Sketches with the same precision merge by taking the register-wise max,
+    so partitions can be sketched independently (other chunks, other
+    processes) and combined afterwards.
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        p = self.precision
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        idx = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        # Rank = leading zeros of the remaining 64 - p bits, plus one. frexp's
+        # exponent is the bit length; the float conversion is exact below
+        # 2**53, and the clip covers the rounding above it (precision < 11).
+        bits = np.minimum(np.frexp(rest.astype(np.float64))[1], 64 - p)
+        rank = (64 - p) - bits + 1
+        # Largest rank per register: sort (register, rank) keys and keep the
+        # last key of each register's run
+        keys = np.sort((idx << 6) | rank)
+        registers = keys >> 6
+        last = np.empty(len(keys), dtype=bool)
+        last[-1] = True
+        np.not_equal(registers[1:], registers[:-1], out=last[:-1])
+        keys = keys[last]
+        registers = keys >> 6
+        self.registers[registers] = np.maximum(self.registers[registers], keys & 63)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def cardinality(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class DistinctCounter:
+    """
+    Distinct counter that is exact up to ``limit`` distinct fingerprints.
+
+    Holds a :class:`FingerprintSet` until it would exceed ``limit``
+    fingerprints, then folds them into a :class:`HyperLogLog` of
+    ``precision`` and drops the set. Memory therefore never exceeds about
+    ``8 * limit`` bytes plus ``2**precision`` registers, and the count is
+    exact whenever the true cardinality is within the limit (1.04 /
+    sqrt(2**precision) relative standard error beyond it: 0.8% for the
+    default precision of 14). Two counters merge exactly while both are
+    exact and their union stays within the limit.
+    """
+
+    def __init__(self, limit: int, precision: int = 14):
+        self.limit = limit
+        self.precision = precision
+        self.exact: Optional[FingerprintSet] = FingerprintSet()
+        self.sketch: Optional[HyperLogLog] = None
+
+    @property
+    def is_exact(self) -> bool:
+        return self.sketch is None
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        if self.sketch is not None:
+            self.sketch.add_hashes(hashes)
+            return
+        self.exact.add_hashes(hashes)
+        # The size bound is cheap; only compact when it crosses the limit
+        if self.exact.size_bound() > self.limit and self.exact.cardinality() > self.limit:
+            self._spill()
+
+    def _spill(self) -> None:
+        self.sketch = HyperLogLog(self.precision)
+        self.sketch.add_hashes(self.exact.fingerprints())
+        self.exact = None
+
+    def merge(self, other: "DistinctCounter") -> None:
+        if other.sketch is None:
+            self.add_hashes(other.exact.fingerprints())
+            return
+        if self.sketch is None:
+            self._spill()
+        self.sketch.merge(other.sketch)
+
+    def cardinality(self) -> int:
+        return self.exact.cardinality() if self.sketch is None else self.sketch.cardinality()
+
+
+class KLLSketch:
+    """
+    Mergeable KLL quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Items live in levels; an item at level h stands for 2**h inputs. When a
+    level exceeds its capacity it is sorted and every other item (random
+    offset) is promoted to the next level. Capacities shrink geometrically
+    (factor 2/3) below the top level, so memory is about ``3 * k`` floats
+    whatever the input size, and rank error is about ``1.7 / k`` (under 1%
+    for the default ``k=200``). Sketches merge by concatenating levels and
+    compacting again. ``seed`` fixes the coin flips, so the same inputs in
+    the same order always give the same sketch.
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels: list = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels)
+        return max(8, int(np.ceil(self.k * (2 / 3) ** (depth - level - 1))))
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        self.n += other.n
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+
+    def _compress(self) -> None:
+        while True:
+            over = [h for h, items in enumerate(self.levels) if len(items) > self._capacity(h)]
+            if not over:
+                return
+            h = over[0]
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[h])
+            # An odd item stays behind so only whole pairs are compacted
+            keep, items = items[: len(items) % 2], items[len(items) % 2:]
+            self.levels[h] = keep
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[int(self._rng.integers(2))::2]])
+
+    def quantiles(self, qs) -> list:
+        """Approximate values at each rank fraction in ``qs``; None when empty."""
+        if self.n == 0:
+            return [None for _ in qs]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_h), 2 ** h) for h, items_h in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side="left")
+        return [float(items[i]) for i in np.clip(idx, 0, len(items) - 1)]
+
+
+class DyadicHistogram:
+    """
+    Mergeable histogram with at most ``max_bins`` equal-width bins.
+
+    Bin edges are multiples of a power-of-two width. When new values fall
+    outside the covered range and the bins would exceed ``max_bins``, the
+    width doubles and adjacent bins are summed. The final width is the
+    smallest that covers all values in ``max_bins`` bins, so the result does
+    not depend on chunking, order or merge layout. A full pass or a
+    streaming pass over the same data gives identical bins, and counts are
+    exact. The width never drops below 2**-40 of the largest magnitude seen,
+    which keeps bin indices within int64 for constant columns.
+    """
+
+    def __init__(self, max_bins: int = 32):
+        self.max_bins = max_bins
+        self.exponent: Optional[int] = None  # bin width is 2**exponent
+        self.offset = 0  # index of the first bin
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.magnitude = 0.0
+
+    @staticmethod
+    def _min_exponent(magnitude: float) -> int:
+        return math.frexp(magnitude)[1] - 40 if magnitude > 0 else -60
+
+    @staticmethod
+    def _regroup(offset: int, counts: np.ndarray, steps: int) -> tuple:
+        """Coarsen bins by ``steps`` doublings of the width."""
+        if steps <= 0 or len(counts) == 0:
+            return offset, counts
+        idx = (offset + np.arange(len(counts), dtype=np.int64)) >> steps
+        return int(idx[0]), np.bincount(idx - idx[0], weights=counts).astype(np.int64)
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        lo, hi = float(values.min()), float(values.max())
+        magnitude = max(abs(lo), abs(hi))
+        exponent = self._min_exponent(max(self.magnitude, magnitude))
+        if hi > lo:
+            exponent = max(exponent, math.ceil(math.log2((hi - lo) / self.max_bins)))
+        if self.exponent is not None:
+            exponent = max(exponent, self.exponent)
+        idx = np.floor(np.ldexp(values, -exponent)).astype(np.int64)
+        offset = int(idx.min())
+        self._absorb(exponent, offset, np.bincount(idx - offset).astype(np.int64), magnitude)
+
+    def merge(self, other: "DyadicHistogram") -> None:
+        if other.exponent is not None:
+            self._absorb(other.exponent, other.offset, other.counts, other.magnitude)
+
+    def _absorb(self, exponent: int, offset: int, counts: np.ndarray, magnitude: float) -> None:
+        self.magnitude = max(self.magnitude, magnitude)
+        if self.exponent is None:
+            self.exponent, self.offset, self.counts = exponent, offset, counts
+            exponent, offset, counts = self.exponent, self.offset, np.zeros(0, dtype=np.int64)
+        target = max(self.exponent, exponent, self._min_exponent(self.magnitude))
+        own_offset, own_counts = self._regroup(self.offset, self.counts, target - self.exponent)
+        offset, counts = self._regroup(offset, counts, target - exponent)
+        while True:
+            ranges = [(own_offset, own_offset + len(own_counts))]
+            if len(counts):
+                ranges.append((offset, offset + len(counts)))
+            first, end = min(lo for lo, _ in ranges), max(hi for _, hi in ranges)
+            if end - first <= self.max_bins:
+                break
+            target += 1
+            own_offset, own_counts = self._regroup(own_offset, own_counts, 1)
+            offset, counts = self._regroup(offset, counts, 1)
+        combined = np.zeros(end - first, dtype=np.int64)
+        combined[own_offset - first: own_offset - first + len(own_counts)] += own_counts
+        if len(counts):
+            combined[offset - first: offset - first + len(counts)] += counts
+        self.exponent, self.offset, self.counts = target, first, combined
+
+    def to_dict(self) -> Optional[dict]:
+        """``{"edges": [...], "counts": [...]}``, or None when empty."""
+        if self.exponent is None:
+            return None
+        edges = np.ldexp((self.offset + np.arange(len(self.counts) + 1)).astype(np.float64), self.exponent)
+        return {"edges": edges.tolist(), "counts": self.counts.tolist()}
+
+
+def dyadic_histograms(values: np.ndarray, max_bins: int = 32) -> list:
+    """
+    ``DyadicHistogram.to_dict()`` of each column of a 2-d array, in one pass.
+
+    Same bins and counts as adding each column to its own
+    :class:`DyadicHistogram`: only the bin width is chosen per column, then
+    every column is binned with one ``ldexp`` and counted with one
+    ``bincount``. Non-finite values are skipped; a column without finite
+    values gives None.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    lows = np.where(finite, values, np.inf).min(axis=0, initial=np.inf)
+    highs = np.where(finite, values, -np.inf).max(axis=0, initial=-np.inf)
+
+    exponents = np.zeros(values.shape[1], dtype=np.int64)
+    offsets = np.zeros(values.shape[1], dtype=np.int64)
+    sizes = np.zeros(values.shape[1], dtype=np.int64)
+    for j, (lo, hi) in enumerate(zip(lows.tolist(), highs.tolist())):
+        if lo > hi:
+            continue
+        exponent = DyadicHistogram._min_exponent(max(abs(lo), abs(hi)))
+        if hi > lo:
+            exponent = max(exponent, math.ceil(math.log2((hi - lo) / max_bins)))
+        # Flooring can straddle one more bin than the range needs
+        while math.floor(math.ldexp(hi, -exponent)) - math.floor(math.ldexp(lo, -exponent)) >= max_bins:
+            exponent += 1
+        exponents[j] = exponent
+        offsets[j] = math.floor(math.ldexp(lo, -exponent))
+        sizes[j] = math.floor(math.ldexp(hi, -exponent)) - offsets[j] + 1
+
+    idx = np.floor(np.ldexp(np.where(finite, values, 0.0), -exponents)).astype(np.int64) - offsets
+    idx += np.arange(values.shape[1], dtype=np.int64) * max_bins
+    counts = np.bincount(idx[finite], minlength=values.shape[1] * max_bins).reshape(-1, max_bins)
+
+    histograms = []
+    for j in range(values.shape[1]):
+        if sizes[j] == 0:
+            histograms.append(None)
+            continue
+        edges = np.ldexp((offsets[j] + np.arange(sizes[j] + 1)).astype(np.float64), int(exponents[j]))
+        histograms.append({"edges": edges.tolist(), "counts": counts[j, : sizes[j]].tolist()})
+    return histograms
+
+
+class MisraGries:
+    """
+    Mergeable Misra-Gries summary of the most frequent values.
+
+    Keeps at most ``capacity`` counters. Folding in more distinct values
+    subtracts the (capacity+1)-th largest count from every counter and drops
+    those that reach zero (Agarwal et al., 2012), which is also how two
+    summaries merge. Every value occurring more than ``n / (capacity + 1)``
+    times is kept. Reported counts are lower bounds, off by at most
+    ``error`` (the total subtracted), so columns with at most ``capacity``
+    distinct values are counted exactly.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.n = 0
+        self.error = 0
+        self.counts = pd.Series(dtype="int64")
+
+    def _prune(self, counts: pd.Series) -> pd.Series:
+        if len(counts) <= self.capacity:
+            return counts
+        counts = counts.sort_values(ascending=False, kind="stable")
+        kth = int(counts.iloc[self.capacity])
+        self.error += kth
+        counts = counts.iloc[: self.capacity] - kth
+        return counts[counts > 0]
+
+    def add_counts(self, counts: pd.Series) -> None:
+        """Fold in exact per-value counts of new data, e.g. ``Series.value_counts()``."""
+        counts = counts[counts > 0]
+        if isinstance(counts.index, pd.CategoricalIndex):
+            counts.index = counts.index.astype(object)
+        self.n += int(counts.sum())
+        self._combine(self._prune(counts.astype("int64")))
+
+    def merge(self, other: "MisraGries") -> None:
+        self.n += other.n
+        self.error += other.error
+        self._combine(other.counts)
+
+    def _combine(self, counts: pd.Series) -> None:
+        if len(self.counts) and len(counts):
+            counts = pd.concat([self.counts, counts]).groupby(level=0, sort=False).sum()
+        elif not len(counts):
+            counts = self.counts
+        self.counts = self._prune(counts)
+
+    def top(self, n: int) -> list:
+        """The ``n`` largest ``[value, count]`` pairs, ties broken by value."""
+        return top_counts(self.counts, n)
+
+
+def top_counts(counts: pd.Series, n: int) -> list:
+    """
+    The ``n`` largest ``[value, count]`` pairs of a value -> count Series.
+
+    Ties are broken by the value's string form, so exact counts and a
+    :class:`MisraGries` summary of the same data list values in the same
+    order. Only the ``4 * n`` largest counts are sorted in Python, which
+    bounds the cost on near-unique columns.
+    """
+    if n <= 0 or not len(counts):
+        return []
+    if len(counts) > 4 * n:
+        counts = counts.iloc[np.argpartition(-counts.to_numpy(), 4 * n)[: 4 * n]]
+    items = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))[:n]
+    return [[value.item() if isinstance(value, np.generic) else value, int(count)] for value, count in items]
@@ -0,0 +1,412 @@
+import io
+import os
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.tools.columnar_cache import fresh_columnar_path, iter_columnar_chunks
+from src.tools.sketches import (
+    DistinctCounter,
+    DyadicHistogram,
+    HyperLogLog,
+    KLLSketch,
+    MisraGries,
+    count_values,
+    hash_rows,
+    hash_values,
+)
+from src.tools.utils import (
+    HISTOGRAM_BINS,
+    QUANTILES,
+    TOP_VALUES,
+    TOPK_CAPACITY,
+    finish_profile,
+    has_distribution,
+    quantile_key,
+)
+
+
+# Rows per chunk when streaming a CSV; override with PROFILE_CHUNK_SIZE.
+DEFAULT_CHUNK_SIZE = int(os.getenv("PROFILE_CHUNK_SIZE", "100000"))
+# Distinct values per column (and distinct rows, for duplicates) counted
+# exactly before the count switches to a HyperLogLog estimate. Fingerprints
+# take 8 bytes each: 512 KB per column and 8 MB for rows by default.
+EXACT_DISTINCT_LIMIT = int(os.getenv("PROFILE_EXACT_DISTINCT_LIMIT", str(1 << 16)))
+EXACT_ROWS_LIMIT = int(os.getenv("PROFILE_EXACT_ROWS_LIMIT", str(1 << 20)))
+
+
+def _is_numeric(dtype) -> bool:
+    return pd.api.types.is_numeric_dtype(dtype)
+
+
+def _merge_dtype(left, right):
+    """
+    Combine the dtypes pandas inferred for the same column in two chunks.
+
+    Mirrors what a single full ``read_csv`` would have inferred: numeric
+    dtypes are promoted (int64 + float64 -> float64) and any other mismatch,
+    including bool mixed with NaN-only chunks, falls back to object.
+    """
+    if left is None:
+        return right
+    if right is None or left == right:
+        return left
+    if (
+        _is_numeric(left) and _is_numeric(right)
+        and not pd.api.types.is_bool_dtype(left)
+        and not pd.api.types.is_bool_dtype(right)
+    ):
+        return np.result_type(left, right)
+    return np.dtype(object)
+
+
+class ProfileAccumulator:
+    """
+    Mergeable running state for profiling a dataset chunk by chunk.
+
+    Each chunk is folded in with :meth:`update`; accumulators built over
+    different partitions of the same file can be combined with :meth:`merge`.
+    :meth:`to_profile` returns the same schema as ``dataset_profile_logic``.
+
+    Null counts, row counts and numeric min/max/sum are O(columns).
+    Distinct counts and the duplicate-row count keep uint64 fingerprints (8
+    bytes each) up to PROFILE_EXACT_DISTINCT_LIMIT values per column and
+    PROFILE_EXACT_ROWS_LIMIT rows, then switch to HyperLogLog estimates (see
+    ``DistinctCounter``), so memory stays bounded whatever the file size:
+    at most about 8 bytes times (columns x PROFILE_EXACT_DISTINCT_LIMIT +
+    PROFILE_EXACT_ROWS_LIMIT), plus one chunk. With ``approximate=True``
+    per-column distinct counts use HyperLogLog sketches from the start.
+    Past the row limit duplicate_rows is the row count minus an estimate,
+    so its error scales with the number of rows, not of duplicates.
+
+    Quantiles (KLL), histograms (dyadic bins) and most frequent values
+    (Misra-Gries) are fixed-size sketches too, folded in the same pass.
+    Histograms are exact; see src/tools/sketches.py for the error bounds of
+    the others. A numeric column stops being tracked for top values once a
+    chunk holds more than TOPK_CAPACITY distinct values, since the profile
+    would drop it anyway.
+    """
+
+    def __init__(self, sample_rows: int = 5, approximate: bool = False):
+        self.sample_rows = sample_rows
+        self.approximate = approximate
+        self.n_rows = 0
+        self.columns: list = []
+        self.dtypes: dict = {}
+        self.null_counts: dict = {}
+        self.distinct: dict = {}
+        self.row_fingerprints = DistinctCounter(EXACT_ROWS_LIMIT)
+        self.numeric: dict = {}
+        self.quantiles: dict = {}
+        self.histograms: dict = {}
+        self.top: dict = {}  # None once a column is no longer tracked
+        self.samples: list = []
+
+    def _distinct_for(self, col):
+        if col not in self.distinct:
+            self.distinct[col] = HyperLogLog() if self.approximate else DistinctCounter(EXACT_DISTINCT_LIMIT)
+        return self.distinct[col]
+
+    def _sketches_for(self, col) -> tuple:
+        if col not in self.quantiles:
+            self.quantiles[col] = KLLSketch()
+            self.histograms[col] = DyadicHistogram(HISTOGRAM_BINS)
+        return self.quantiles[col], self.histograms[col]
+
+    def _top_for(self, col):
+        if col not in self.top:
+            self.top[col] = MisraGries(TOPK_CAPACITY)
+        return self.top[col]
+
+    def _fold_distribution(self, col, s: pd.Series) -> None:
+        if pd.api.types.is_datetime64_any_dtype(s.dtype):
+            return
+        if has_distribution(s.dtype):
+            values = s.to_numpy(dtype="float64", na_value=np.nan)
+            for sketch in self._sketches_for(col):
+                sketch.add(values)
+        if self.top.get(col, False) is None:
+            return
+        counts = count_values(s)
+        if _is_numeric(s.dtype) and len(counts) > TOPK_CAPACITY:
+            self.top[col] = None
+        else:
+            self._top_for(col).add_counts(counts)
+
+    def update(self, chunk: pd.DataFrame) -> "ProfileAccumulator":
+        """Fold a DataFrame chunk into the running state."""
+        if not self.columns:
+            self.columns = list(chunk.columns)
+        if len(self.samples) < self.sample_rows:
+            need = self.sample_rows - len(self.samples)
+            self.samples.extend(chunk.head(need).to_dict(orient="records"))
+
+        self.n_rows += len(chunk)
+
+        nulls = chunk.isna().sum()
+        for col in chunk.columns:
+            self.dtypes[col] = _merge_dtype(self.dtypes.get(col), chunk[col].dtype)
+            self.null_counts[col] = self.null_counts.get(col, 0) + int(nulls[col])
+            self._distinct_for(col).add_hashes(hash_values(chunk[col]))
+            self._fold_distribution(col, chunk[col])
+
+        numeric = chunk.select_dtypes(include=["number", "bool"])
+        if not numeric.columns.empty:
+            counts, sums = numeric.count(), numeric.sum()
+            mins, maxs = numeric.min(), numeric.max()
+            for col in numeric.columns:
+                self._fold_numeric(col, int(counts[col]), float(sums[col]), mins[col], maxs[col])
+
+        self.row_fingerprints.add_hashes(hash_rows(chunk))
+        return self
+
+    def _fold_numeric(self, col, count, total, lo, hi) -> None:
+        acc = self.numeric.setdefault(
+            col, {"count": 0, "sum": 0.0, "min": None, "max": None}
+        )
+        if not count:
+            return
+        acc["count"] += count
+        acc["sum"] += total
+        acc["min"] = float(lo) if acc["min"] is None else min(acc["min"], float(lo))
+        acc["max"] = float(hi) if acc["max"] is None else max(acc["max"], float(hi))
+
+    def merge(self, other: "ProfileAccumulator") -> "ProfileAccumulator":
+        """Combine another accumulator (built on a later partition) into this one."""
+        if not self.columns:
+            self.columns = list(other.columns)
+        if len(self.samples) < self.sample_rows:
+            self.samples.extend(other.samples[: self.sample_rows - len(self.samples)])
+
+        self.n_rows += other.n_rows
+        for col in other.columns:
+            self.dtypes[col] = _merge_dtype(self.dtypes.get(col), other.dtypes.get(col))
+            self.null_counts[col] = self.null_counts.get(col, 0) + other.null_counts.get(col, 0)
+            if col in other.distinct:
+                self._distinct_for(col).merge(other.distinct[col])
+        for col, acc in other.numeric.items():
+            self._fold_numeric(col, acc["count"], acc["sum"], acc["min"], acc["max"])
+        for col, quantiles in other.quantiles.items():
+            own_quantiles, own_histogram = self._sketches_for(col)
+            own_quantiles.merge(quantiles)
+            own_histogram.merge(other.histograms[col])
+        for col, top in other.top.items():
+            if top is None or self.top.get(col, False) is None:
+                self.top[col] = None
+            else:
+                self._top_for(col).merge(top)
+
+        self.row_fingerprints.merge(other.row_fingerprints)
+        return self
+
+    def to_profile(self) -> dict:
+        """Render the accumulated state using the ``dataset_profile_logic`` schema."""
+        n_rows = self.n_rows
+        profile = {
+            "shape": {
+                "rows": int(n_rows),
+                "columns": len(self.columns)
+            },
+            "columns": list(self.columns),
+            "dtypes": {col: str(self.dtypes[col]) for col in self.columns},
+            "duplicates": {
+                "duplicate_rows": max(int(n_rows - self.row_fingerprints.cardinality()), 0)
+            },
+            "nulls": {},
+            "unique_values": {},
+            "numeric_summary": {},
+            "sample_rows": self.samples[: self.sample_rows],
+            "quantiles": {},
+            "histograms": {},
+            "top_values": {}
+        }
+
+        for col in self.columns:
+            null_count = int(self.null_counts[col])
+            profile["nulls"][col] = {
+                "null_count": null_count,
+                "null_percentage": round((null_count / n_rows) * 100, 2) if n_rows else 0.0
+            }
+            profile["unique_values"][col] = self._distinct_for(col).cardinality()
+
+            # A column that drifted to object in a later chunk is not numeric
+            # in the merged result, so its partial numeric stats are dropped.
+            if _is_numeric(self.dtypes[col]):
+                acc = self.numeric.get(col)
+                if acc and acc["count"]:
+                    profile["numeric_summary"][col] = {
+                        "min": acc["min"],
+                        "max": acc["max"],
+                        "mean": acc["sum"] / acc["count"]
+                    }
+                else:
+                    profile["numeric_summary"][col] = {
+                        "min": None,
+                        "max": None,
+                        "mean": None
+                    }
+
+            if has_distribution(self.dtypes[col]) and col in self.quantiles:
+                values = self.quantiles[col].quantiles(QUANTILES)
+                profile["quantiles"][col] = {quantile_key(q): v for q, v in zip(QUANTILES, values)}
+                profile["histograms"][col] = self.histograms[col].to_dict()
+            top = self.top.get(col)
+            if top is not None and not pd.api.types.is_datetime64_any_dtype(self.dtypes[col]):
+                profile["top_values"][col] = {"values": top.top(TOP_VALUES), "exact": top.error == 0}
+                if top.error:
+                    profile["top_values"][col]["max_error"] = int(top.error)
+
+        return finish_profile(profile)
+
+
+def iter_csv_chunks(
+    file_path: str,
+    chunksize: Optional[int] = None,
+    columns: Optional[list] = None
+) -> Iterable[pd.DataFrame]:
+    """
+    Yield DataFrame chunks of a CSV file without loading it whole.
+
+    Reads from the memory-mapped Arrow copy when a fresh one exists. Only
+    ``columns`` are read, if given.
+    """
+    chunksize = chunksize or DEFAULT_CHUNK_SIZE
+    columnar = fresh_columnar_path(file_path)
+    if columnar is not None:
+        yield from iter_columnar_chunks(columnar, chunksize, columns)
+        return
+
+    with pd.read_csv(file_path, chunksize=chunksize, usecols=columns) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def sample_csv_rows(
+    file_path: str,
+    fraction: float,
+    columns: Optional[list] = None,
+    seed: int = 0,
+    chunksize: Optional[int] = None
+) -> tuple:
+    """
+    Uniform sample of a CSV file's rows, read chunk by chunk.
+
+    Each row is kept with probability ``fraction``, so only the sample and
+    one chunk are in memory at a time. Returns ``(sample, rows)`` where
+    ``rows`` is the number of rows in the file; the sample keeps the file's
+    row order.
+    """
+    rng = np.random.default_rng(seed)
+    parts, rows = [], 0
+    for chunk in iter_csv_chunks(file_path, chunksize, columns):
+        rows += len(chunk)
+        parts.append(chunk[rng.random(len(chunk)) < fraction])
+    if not parts:
+        return pd.DataFrame(columns=columns), 0
+    return pd.concat(parts, ignore_index=True), rows
+
+
+class _ByteRangeReader(io.RawIOBase):
+    """Raw reader that stops at ``end`` bytes into an already-positioned file."""
+
+    def __init__(self, f, end: int):
+        self._f = f
+        self._remaining = end - f.tell()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if self._remaining <= 0:
+            return 0
+        n = self._f.readinto(memoryview(b)[: self._remaining]) or 0
+        self._remaining -= n
+        return n
+
+
+def csv_header(file_path: str) -> tuple:
+    """Return the CSV column names and the byte offset where data rows start."""
+    names = list(pd.read_csv(file_path, nrows=0).columns)
+    with open(file_path, "rb") as f:
+        f.readline()
+        return names, f.tell()
+
+
+def split_byte_ranges(file_path: str, start: int, parts: int) -> list:
+    """
+    Split ``[start, EOF)`` into up to ``parts`` ranges aligned to line starts.
+
+    Boundaries are moved forward to the next newline, so a quoted field that
+    contains newlines can be cut in two; use the columnar copy for such files.
+    """
+    size = os.path.getsize(file_path)
+    bounds = [start]
+    with open(file_path, "rb") as f:
+        for i in range(1, parts):
+            target = start + (size - start) * i // parts
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()
+            if f.tell() < size and f.tell() > bounds[-1]:
+                bounds.append(f.tell())
+    bounds.append(size)
+    return [(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if hi > lo]
+
+
+def iter_csv_range_chunks(
+    file_path: str,
+    start: int,
+    end: int,
+    names: list,
+    chunksize: Optional[int] = None
+) -> Iterable[pd.DataFrame]:
+    """
+    Yield DataFrame chunks for the rows stored in bytes ``[start, end)``.
+
+    ``start`` must be the beginning of a data row (not the header line).
+    """
+    if end <= start:
+        return
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        reader = io.BufferedReader(_ByteRangeReader(f, end))
+        with pd.read_csv(
+            reader,
+            header=None,
+            names=names,
+            chunksize=chunksize or DEFAULT_CHUNK_SIZE
+        ) as chunks:
+            yield from chunks
+
+
+def stream_profile(
+    file_path: str,
+    sample_rows: int = 5,
+    chunksize: Optional[int] = None,
+    approximate: bool = False
+) -> dict:
+    """
+    Profile a CSV file in a single chunked pass.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the CSV file to profile.
+    sample_rows : int, default 5
+        Number of first rows to include as a sample in the profile.
+    chunksize : int, optional
+        Rows per chunk. Defaults to ``PROFILE_CHUNK_SIZE`` (100,000).
+    approximate : bool, default False
+        Estimate per-column distinct counts with HyperLogLog sketches.
+
+    Returns
+    -------
+    dict
+        A profile with the same keys as ``dataset_profile_logic``.
+    """
+    acc = ProfileAccumulator(sample_rows=sample_rows, approximate=approximate)
+    for chunk in iter_csv_chunks(file_path, chunksize):
+        acc.update(chunk)
+    return acc.to_profile()
@@ -1,10 +1,200 @@
+import os
+import re
+from typing import Optional
+
 import pandas as pd
 import numpy as np
+from src.tools.sketches import (
+    DyadicHistogram,
+    HyperLogLog,
+    count_values,
+    dyadic_histograms,
+    hash_rows,
+    hash_values,
+    sorted_unique,
+    top_counts,
+)
+
+
+# Rank fractions reported under "quantiles", keyed "p1" ... "p99".
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+# Most bins in a numeric column's histogram.
+HISTOGRAM_BINS = int(os.getenv("PROFILE_HISTOGRAM_BINS", "32"))
+# Counters per column in the streaming top-k summary; numeric columns with
+# more distinct values than this get no "top_values".
+TOPK_CAPACITY = int(os.getenv("PROFILE_TOPK_CAPACITY", "64"))
+# Most frequent values listed per column.
+TOP_VALUES = int(os.getenv("PROFILE_TOP_VALUES", "10"))
+# Fewest rows for which approximate=True sketches distinct counts and
+# fingerprints rows for the duplicate count; below it, exact counting is faster.
+APPROX_MIN_ROWS = int(os.getenv("PROFILE_APPROX_MIN_ROWS", "500000"))
+# Bumped whenever the profile gains or changes keys, so cached profiles
+# built by older code are not served.
+PROFILE_SCHEMA = 2
+
+
+def quantile_key(q: float) -> str:
+    """Profile key for a rank fraction, e.g. 0.05 -> "p5"."""
+    return f"p{round(q * 100):g}"
+
+
+def has_distribution(dtype) -> bool:
+    """True for dtypes that get quantiles and a histogram (numeric, not bool)."""
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def has_top_values(dtype, unique: int) -> bool:
+    """True for columns that get "top_values": non-datetime, and few distinct values if numeric."""
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return False
+    return not pd.api.types.is_numeric_dtype(dtype) or unique <= TOPK_CAPACITY
+
+
+def _sorted_numeric_blocks(df: pd.DataFrame, null_counts: pd.Series) -> list:
+    """
+    ``(columns, sorted values, non-null counts)`` for each numpy numeric dtype
+    in ``df``; missing values (only NaN for these dtypes) sort last.
+    """
+    groups = {}
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+            groups.setdefault(dtype, []).append(col)
+    return [
+        (cols, np.sort(df[cols].to_numpy(), axis=0), len(df) - null_counts[cols].to_numpy())
+        for cols in groups.values()
+    ]
+
+
+def column_stats(df: pd.DataFrame, approximate: bool = False) -> dict:
+    """
+    Compute the per-column part of the profile: nulls, unique_values,
+    numeric_summary, quantiles, histograms and top_values.
+
+    Nulls and min/max/mean are single whole-frame calls. Numeric columns
+    with numpy dtypes are sorted once per dtype, and the sorted block gives
+    their distinct counts, value counts, quantiles and histograms without a
+    per-column pass. Other columns get distinct counts and top values from
+    one ``factorize`` pass each. With ``approximate=True`` and at least
+    APPROX_MIN_ROWS rows, those of them that get no top values (numeric and
+    datetime columns, unless their estimate is low enough for top values)
+    are hashed into HyperLogLog sketches instead. String, categorical and
+    bool columns are still counted: their top values need the exact counts,
+    and a sketch would be a second pass over the column. Because every
+    value depends only on its own column, profiles of column subsets can be
+    computed independently and combined by dict union.
+    """
+    n_rows = len(df)
+    stats = {
+        "nulls": {}, "unique_values": {}, "numeric_summary": {},
+        "quantiles": {}, "histograms": {}, "top_values": {}
+    }
+
+    # Nulls
+    null_counts = df.isna().sum()
+    for col in df.columns:
+        null_count = int(null_counts[col])
+        stats["nulls"][col] = {
+            "null_count": null_count,
+            "null_percentage": round((null_count / n_rows) * 100, 2) if n_rows else 0.0
+        }
+
+    # Sorted numeric blocks: a new value starts wherever the sorted column
+    # changes, so run starts give distinct counts and run lengths value counts
+    unique, value_counts, quantiles, histograms = {}, {}, {}, {}
+    for cols, values, non_null in _sorted_numeric_blocks(df, null_counts):
+        starts = np.ones(values.shape, dtype=bool)
+        np.not_equal(values[1:], values[:-1], out=starts[1:])
+        starts &= np.arange(len(values))[:, None] < non_null
+        for j, count in enumerate(starts.sum(axis=0).tolist()):
+            unique[cols[j]] = count
+            if has_top_values(values.dtype, count):
+                first = np.flatnonzero(starts[:, j])
+                value_counts[cols[j]] = pd.Series(np.diff(first, append=non_null[j]), index=values[first, j])
+        if not has_distribution(values.dtype):
+            continue
+        # Same as DataFrame.quantile: np.quantile over each column's non-null values
+        for size in np.unique(non_null).tolist():
+            same_size = np.flatnonzero(non_null == size)
+            result = np.quantile(values[:size, same_size], QUANTILES, axis=0) if size else None
+            for i, j in enumerate(same_size):
+                quantiles[cols[j]] = {
+                    quantile_key(q): None if result is None else float(result[k, i])
+                    for k, q in enumerate(QUANTILES)
+                }
+        histograms.update(zip(cols, dyadic_histograms(values, HISTOGRAM_BINS)))
+
+    # Other columns: value counts give the distinct count and, below, the top values
+    sketch = approximate and n_rows >= APPROX_MIN_ROWS
+    dtypes = df.dtypes
+    for col in df.columns:
+        if col in unique:
+            continue
+        if sketch and (has_distribution(dtypes[col]) or pd.api.types.is_datetime64_any_dtype(dtypes[col])):
+            sketch = HyperLogLog()
+            sketch.add_hashes(hash_values(df[col]))
+            estimate = sketch.cardinality()
+            # Linear counting is near exact this low, so columns that may
+            # still get top values are always counted
+            if estimate > 2 * TOPK_CAPACITY:
+                unique[col] = estimate
+                continue
+        value_counts[col] = count_values(df[col])
+        unique[col] = len(value_counts[col])
+    stats["unique_values"] = {col: unique[col] for col in df.columns}
+
+    # Numeric summary (only basics); reductions skip NaNs so no dropna copies
+    numeric_cols = [col for col, dtype in dtypes.items() if pd.api.types.is_numeric_dtype(dtype)]
+    if numeric_cols:
+        numeric = df[numeric_cols]
+        mins, maxs, means = numeric.min(), numeric.max(), numeric.mean()
+        for col in numeric_cols:
+            lo, hi, mean = mins[col], maxs[col], means[col]
+            if pd.isna(mean):
+                stats["numeric_summary"][col] = {
+                    "min": None,
+                    "max": None,
+                    "mean": None
+                }
+            else:
+                stats["numeric_summary"][col] = {
+                    "min": float(lo),
+                    "max": float(hi),
+                    "mean": float(mean)
+                }
+
+    # Distribution: exact quantiles and dyadic histograms of numeric columns
+    value_cols = [col for col in numeric_cols if has_distribution(dtypes[col])]
+    other_cols = [col for col in value_cols if col not in quantiles]
+    if other_cols:
+        other_quantiles = df[other_cols].quantile(list(QUANTILES))
+        for col in other_cols:
+            quantiles[col] = {
+                quantile_key(q): None if pd.isna(v) else float(v)
+                for q, v in other_quantiles[col].items()
+            }
+            histogram = DyadicHistogram(HISTOGRAM_BINS)
+            histogram.add(df[col].to_numpy(dtype="float64", na_value=np.nan))
+            histograms[col] = histogram.to_dict()
+    for col in value_cols:
+        stats["quantiles"][col] = quantiles[col]
+        stats["histograms"][col] = histograms[col]
+
+    # Most frequent values, counted exactly
+    for col in df.columns:
+        if has_top_values(dtypes[col], stats["unique_values"][col]):
+            counts = value_counts[col] if col in value_counts else count_values(df[col])
+            stats["top_values"][col] = {
+                "values": top_counts(counts, TOP_VALUES),
+                "exact": True
+            }
+
+    return stats
 
 
 def dataset_profile_logic(
     df: pd.DataFrame,
-    sample_rows: int = 5
+    sample_rows: int = 5,
+    approximate: bool = False
 ) -> dict:
     """
     Generate a minimal, JSON-serializable profile of a pandas DataFrame for agentic EDA.
@@ -15,6 +205,17 @@ def dataset_profile_logic(
         Input dataset to profile.
     sample_rows : int, default 5
         Number of first rows to include as a sample in the profile.
+    approximate : bool, default False
+        Once the frame has APPROX_MIN_ROWS rows, count duplicate rows from
+        64-bit row fingerprints and estimate unique_values with HyperLogLog
+        sketches (about 1.6% relative standard error). Fingerprint
+        collisions can only add duplicates: about n**2 / 2**65 expected
+        over n rows. Sketches cover the columns that need no exact value
+        counts for top_values; numpy numeric columns are counted exactly
+        from the sort behind their quantiles at no extra cost. Smaller
+        frames are profiled exactly, which is faster there. The same
+        sketches are merged across chunks and processes by the streaming
+        and parallel modes. See ``column_stats`` and src/tools/sketches.py.
 
     Returns
     -------
@@ -28,14 +229,32 @@ def dataset_profile_logic(
         - unique_values: dict[str, int]
         - numeric_summary: dict[str, {"min": float | None, "max": float | None, "mean": float | None}]
         - sample_rows: list[dict]
+        - quantiles: dict[str, {"p1": float | None, ..., "p99": float | None}]
+        - histograms: dict[str, {"edges": list[float], "counts": list[int]} | None]
+        - top_values: dict[str, {"values": list[[value, count]], "exact": bool}]
+        - target_balance: {"column", "classes", "imbalance_ratio", ...} | None
 
     Notes
     -----
-    - numeric_summary is computed only for numeric columns after dropping NaNs.
+    - numeric_summary is computed only for numeric columns, skipping NaNs.
+    - Null counts and numeric min/max/mean are each computed with a single
+      whole-frame call rather than a per-column loop; numpy numeric columns
+      get unique counts, quantiles and histograms from one sort per dtype.
+    - quantiles and histograms cover numeric, non-bool columns. Histogram
+      bins are power-of-two widths (see ``DyadicHistogram``), so streaming
+      and full passes give identical bins.
+    - top_values lists the TOP_VALUES most frequent values of non-datetime
+      columns, skipping numeric columns with more than TOPK_CAPACITY
+      distinct values; see ``finish_profile`` for high-cardinality ones.
+    - target_balance is described in ``target_balance``.
     - Values are cast to built-in Python types for JSON serialization.
     """
 
     n_rows, n_cols = df.shape
+    if approximate and n_rows >= APPROX_MIN_ROWS:
+        duplicate_rows = n_rows - len(sorted_unique(hash_rows(df)))
+    else:
+        duplicate_rows = int(df.duplicated().sum())
 
     # Dataset-level info
     profile = {
@@ -46,7 +265,7 @@ def dataset_profile_logic(
         "columns": list(df.columns),
         "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
         "duplicates": {
-            "duplicate_rows": int(df.duplicated().sum())
+            "duplicate_rows": int(duplicate_rows)
         },
         "nulls": {},
         "unique_values": {},
@@ -55,33 +274,125 @@ def dataset_profile_logic(
     }
 
     # Column-level stats
-    for col in df.columns:
-        s = df[col]
+    profile.update(column_stats(df, approximate=approximate))
 
-        # Nulls
-        null_count = int(s.isna().sum())
-        profile["nulls"][col] = {
-            "null_count": null_count,
-            "null_percentage": round((null_count / n_rows) * 100, 2) if n_rows else 0.0
-        }
+    return finish_profile(profile)
 
-        # Uniques
-        profile["unique_values"][col] = int(s.nunique(dropna=True))
-
-        # Numeric summary (only basics)
-        if pd.api.types.is_numeric_dtype(s):
-            clean = s.dropna()
-            if not clean.empty:
-                profile["numeric_summary"][col] = {
-                    "min": float(clean.min()),
-                    "max": float(clean.max()),
-                    "mean": float(clean.mean())
-                }
-            else:
-                profile["numeric_summary"][col] = {
-                    "min": None,
-                    "max": None,
-                    "mean": None
-                }
 
-    return profile
\ No newline at end of file
+# Column names that usually hold the prediction target, in priority order.
+TARGET_NAMES = (
+    "target", "label", "class", "y", "outcome", "churn", "churned", "default",
+    "is_fraud", "fraud", "survived", "response", "converted", "price", "salary",
+)
+# A last column with at most this many distinct values is taken as the target.
+_TARGET_MAX_CLASSES = 10
+
+
+def guess_target_column(profile: dict, hint: Optional[str] = None) -> Optional[str]:
+    """
+    Guess which column of a profiled dataset is the target variable.
+
+    Parameters
+    ----------
+    profile : dict
+        A profile as returned by ``dataset_profile_logic``.
+    hint : str, optional
+        Free text that may name the target, e.g. the profiler's summary
+        (``**Target_Variable**: ...``) or the planner's strategy.
+
+    Returns
+    -------
+    str or None
+        The first of these that applies:
+
+        - a column named on a line of ``hint`` that mentions "target";
+        - a column whose lower-cased name is in ``TARGET_NAMES``;
+        - the last column, if it has 2 to 10 distinct values;
+
+        otherwise None.
+    """
+    columns = profile.get("columns", [])
+    if hint:
+        # Longest names first so "loan_status" wins over "status"
+        by_length = sorted(columns, key=lambda c: len(str(c)), reverse=True)
+        for line in hint.splitlines():
+            if "target" not in line.lower():
+                continue
+            for col in by_length:
+                if re.search(rf"(?<!\w){re.escape(str(col))}(?!\w)", line):
+                    return col
+
+    by_name = {str(col).lower(): col for col in columns}
+    for name in TARGET_NAMES:
+        if name in by_name:
+            return by_name[name]
+
+    if columns:
+        last = columns[-1]
+        if 2 <= profile.get("unique_values", {}).get(last, 0) <= _TARGET_MAX_CLASSES:
+            return last
+    return None
+
+
+
+def target_balance(profile: dict) -> Optional[dict]:
+    """
+    Class balance of the guessed target column, from its top_values.
+
+    Returns
+    -------
+    dict or None
+        ``{"column", "classes": [{"value", "count", "percent"}, ...],
+        "other_percent", "imbalance_ratio", "exact"}``, where percentages
+        are of the target's non-null rows, ``other_percent`` covers classes
+        beyond the listed ones and ``imbalance_ratio`` is the largest listed
+        count over the smallest. None when no target is recognized or it has
+        no top_values (e.g. a continuous numeric target).
+    """
+    target = guess_target_column(profile)
+    top = profile.get("top_values", {}).get(target)
+    if target is None or not top or not top["values"]:
+        return None
+    non_null = profile["shape"]["rows"] - profile["nulls"][target]["null_count"]
+    if non_null <= 0:
+        return None
+    classes = [
+        {"value": value, "count": count, "percent": round(100 * count / non_null, 2)}
+        for value, count in top["values"]
+    ]
+    listed = sum(c["count"] for c in classes)
+    counts = [c["count"] for c in classes]
+    return {
+        "column": target,
+        "classes": classes,
+        "other_percent": round(max(100 * (non_null - listed) / non_null, 0.0), 2),
+        "imbalance_ratio": round(max(counts) / min(counts), 2) if len(counts) > 1 else None,
+        "exact": bool(top.get("exact", False)),
+    }
+
+
+def finish_profile(profile: dict) -> dict:
+    """
+    Apply the profile-wide rules shared by every profiling path.
+
+    Drops top_values of numeric columns whose distinct count exceeds
+    TOPK_CAPACITY (a streaming summary may have tracked them through early
+    chunks). For other columns above that count, keeps only heavy hitters:
+    values in more than ``1 / (TOPK_CAPACITY + 1)`` of the non-null rows,
+    the share a Misra-Gries summary is guaranteed to retain, so near-unique
+    columns get no entry whichever path built the profile. Then adds
+    ``target_balance``. Returns ``profile``.
+    """
+    top_values = profile.get("top_values", {})
+    for col in list(top_values):
+        unique = profile["unique_values"].get(col, 0)
+        if not has_top_values(profile["dtypes"][col], unique):
+            del top_values[col]
+        elif unique > TOPK_CAPACITY:
+            non_null = profile["shape"]["rows"] - profile["nulls"][col]["null_count"]
+            threshold = non_null / (TOPK_CAPACITY + 1)
+            top_values[col]["values"] = [pair for pair in top_values[col]["values"] if pair[1] > threshold]
+            if not top_values[col]["values"]:
+                del top_values[col]
+    profile["target_balance"] = target_balance(profile)
+    return profile
@@ -0,0 +1,198 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import resource
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.utils.logger import logger
+
+
+TRACE_DIR = Path(os.getenv("TRACE_DIR", "logs/traces"))
+# Every run writes two files, so exporting is opt-in
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "false").lower() in ("1", "true", "yes")
+# tracemalloc slows allocation-heavy code noticeably, so it is opt-in
+TRACE_MEMORY = os.getenv("TRACE_MEMORY", "false").lower() in ("1", "true", "yes")
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("eda_trace", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("eda_span", default=None)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024), 2)
+
+
+def record_cache_hit(cache: str) -> None:
+    """
+    Count a hit of ``cache`` ("profile" or "llm") towards the current run.
+
+    Called by the caches themselves. Hits outside :func:`trace_run`, or from
+    other runs in the same process, are not counted.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.cache_hits[cache] += 1
+
+
+class RunTrace:
+    """Spans recorded for one workflow run, exportable as JSON lines or Prometheus text."""
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.spans: list = []
+        self.cache_hits = {"profile": 0, "llm": 0}
+
+    def summary(self) -> dict:
+        """Totals per span name: calls, wall time and tokens."""
+        totals = {}
+        for span in self.spans:
+            agg = totals.setdefault(span["name"], {
+                "calls": 0, "wall_ms": 0.0, "prompt_tokens": 0, "completion_tokens": 0
+            })
+            agg["calls"] += 1
+            agg["wall_ms"] = round(agg["wall_ms"] + span["wall_ms"], 3)
+            agg["prompt_tokens"] += span["prompt_tokens"]
+            agg["completion_tokens"] += span["completion_tokens"]
+        return totals
+
+    def to_jsonl(self) -> str:
+        return "".join(json.dumps({"run_id": self.run_id, **span}) + "\n" for span in self.spans)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition of the per-node totals for this run."""
+        metrics = {
+            "eda_span_calls_total": ("counter", "Spans recorded", "calls", 1),
+            "eda_span_wall_seconds_total": ("counter", "Wall time spent in spans", "wall_ms", 1e-3),
+            "eda_span_prompt_tokens_total": ("counter", "Prompt tokens sent by LLM calls", "prompt_tokens", 1),
+            "eda_span_completion_tokens_total": ("counter", "Completion tokens received", "completion_tokens", 1),
+        }
+        summary = self.summary()
+        lines = []
+        for metric, (kind, help_text, field, scale) in metrics.items():
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, agg in summary.items():
+                lines.append(f'{metric}{{run_id="{self.run_id}",span="{name}"}} {agg[field] * scale:g}')
+        lines.append("# HELP eda_cache_hits_total Cache hits during the run")
+        lines.append("# TYPE eda_cache_hits_total counter")
+        for cache, hits in self.cache_hits.items():
+            lines.append(f'eda_cache_hits_total{{run_id="{self.run_id}",cache="{cache}"}} {hits}')
+        peak = max((span["peak_rss_mb"] for span in self.spans), default=0.0)
+        lines.append("# HELP eda_peak_rss_bytes Peak resident set size of the process")
+        lines.append("# TYPE eda_peak_rss_bytes gauge")
+        lines.append(f'eda_peak_rss_bytes{{run_id="{self.run_id}"}} {int(peak * 1024 * 1024)}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: Path = TRACE_DIR) -> None:
+        """Write ``<run_id>.jsonl`` and ``<run_id>.prom`` into ``directory``."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{self.run_id}.jsonl").write_text(self.to_jsonl())
+        (directory / f"{self.run_id}.prom").write_text(self.to_prometheus())
+
+
+@contextmanager
+def trace_run(run_id: Optional[str] = None, export: bool = TRACE_EXPORT):
+    """Collect spans for everything executed inside the block into a RunTrace."""
+    trace = RunTrace(run_id)
+    token = _current_trace.set(trace)
+    started_tracemalloc = TRACE_MEMORY and not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        if started_tracemalloc:
+            tracemalloc.stop()
+        logger.info(f"Run {trace.run_id} trace: {json.dumps(trace.summary())}")
+        if export:
+            trace.export()
+
+
+@contextmanager
+def span(name: str, kind: str = "node"):
+    """
+    Record wall time, tokens, memory and cache hits for a block of work.
+
+    Does nothing outside :func:`trace_run`. Token counts are added by
+    :class:`TokenUsageCallback` for LLM calls made inside the block.
+    Memory peaks are process-wide, so concurrent spans share them. Cache
+    hits are counted per run (see :func:`record_cache_hit`); a span
+    includes the hits of spans nested in it and of spans of the same run
+    that overlap it.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    record = {
+        "name": name, "kind": kind, "start": time.time(),
+        "prompt_tokens": 0, "completion_tokens": 0, "llm_calls": 0, "error": None,
+    }
+    hits_before = dict(trace.cache_hits)
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        alloc_before = tracemalloc.get_traced_memory()[0]
+    token = _current_span.set(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record["wall_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        _current_span.reset(token)
+        record["peak_rss_mb"] = _peak_rss_mb()
+        if tracemalloc.is_tracing():
+            record["alloc_peak_kb"] = round((tracemalloc.get_traced_memory()[1] - alloc_before) / 1024, 1)
+        for cache, hits in trace.cache_hits.items():
+            record[f"{cache}_cache_hits"] = hits - hits_before[cache]
+        trace.spans.append(record)
+
+
+def instrument_node(name: str, fn: Callable) -> Callable:
+    """Wrap a (sync or async) graph node so each execution is recorded as a span."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(state):
+            with span(name):
+                return await fn(state)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(state):
+        with span(name):
+            return fn(state)
+    return wrapper
+
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """Adds prompt/completion token counts of every LLM call to the active span."""
+
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        record = _current_span.get()
+        if record is None:
+            return
+        record["llm_calls"] += 1
+        for generations in response.generations:
+            for gen in generations:
+                usage = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+                record["prompt_tokens"] += usage.get("input_tokens", 0)
+                record["completion_tokens"] += usage.get("output_tokens", 0)
+
+
+token_usage_callback = TokenUsageCallback()
@@ -0,0 +1,75 @@
+import os
+from typing import Sequence
+
+from langchain_core.messages import AnyMessage, HumanMessage, ToolMessage
+
+from src.tools.profile_format import estimate_tokens
+
+
+# Token cap for the conversation window resent on every profiler turn.
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "6000"))
+
+_COMPACTED = "compacted"
+
+
+def is_compacted(message: AnyMessage) -> bool:
+    return bool(message.additional_kwargs.get(_COMPACTED))
+
+
+def add_and_compact_messages(left: Sequence[AnyMessage], right: Sequence[AnyMessage]) -> list:
+    """
+    AgentState reducer: append like ``operator.add``, then shrink consumed tool results.
+
+    A ToolMessage counts as consumed once an AI message follows it. Its
+    content is replaced with a short reference to the ``artifacts`` side
+    store, where tool_node keeps the full output, so later turns do not
+    resend it. The message itself stays, keeping tool_call ids paired.
+    """
+    merged = list(left) + list(right)
+    last_ai = max((i for i, m in enumerate(merged) if m.type == "ai"), default=-1)
+    for i in range(last_ai):
+        message = merged[i]
+        if isinstance(message, ToolMessage) and not is_compacted(message):
+            merged[i] = message.model_copy(update={
+                "content": (
+                    f"[{len(str(message.content))} chars of tool output already read; "
+                    f"full text in artifacts['{message.tool_call_id}']]"
+                ),
+                "additional_kwargs": {**message.additional_kwargs, _COMPACTED: True},
+            })
+    return merged
+
+
+def _message_tokens(message: AnyMessage) -> int:
+    tokens = estimate_tokens(str(message.content)) + 4
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        tokens += estimate_tokens(str(tool_call.get("args"))) + 8
+    return tokens
+
+
+def window_messages(messages: Sequence[AnyMessage], max_tokens: int = HISTORY_TOKEN_BUDGET) -> list:
+    """
+    Return the first user message plus the most recent messages within ``max_tokens``.
+
+    The window never starts on a ToolMessage, so every tool result it keeps
+    is preceded by the AI message that requested it.
+    """
+    messages = list(messages)
+    first_human = next((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), None)
+    head = [messages[first_human]] if first_human is not None else []
+    budget = max_tokens - sum(_message_tokens(m) for m in head)
+
+    tail = []
+    for i in range(len(messages) - 1, -1, -1):
+        if i == first_human:
+            break
+        cost = _message_tokens(messages[i])
+        if cost > budget and tail:
+            break
+        tail.append(messages[i])
+        budget -= cost
+    tail.reverse()
+
+    while tail and isinstance(tail[0], ToolMessage):
+        tail.pop(0)
+    return head + tail
@@ -0,0 +1,14 @@
+import multiprocessing
+
+
+def pool_context():
+    """
+    Multiprocessing context for worker pools: forkserver where available, else spawn.
+
+    The app runs worker threads (job queue, background profile refinement,
+    concurrent tool calls). Forking such a process copies locks that another
+    thread may hold, such as the logging lock, into the child, which can
+    then deadlock. Both start methods begin workers from a fresh process.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
@@ -0,0 +1,39 @@
+"""
+Shared setup for the test suite.
+
+The app modules read their configuration from the environment at import
+time, so the offline defaults are set here, before any test imports them:
+the scripted fake chat model, and every on-disk cache under one temporary
+directory per session so tests never touch data/ or each other's runs.
+"""
+import os
+import tempfile
+
+_CACHE_ROOT = tempfile.mkdtemp(prefix="eda-tests-")
+
+os.environ["LLM_PROVIDER"] = "fake"
+os.environ["LANGSMITH_TRACING"] = "false"
+os.environ["TRACE_EXPORT"] = "false"
+for _var, _name in (
+    ("PROFILE_CACHE_DIR", "profiles"),
+    ("PROFILE_STATE_DIR", "profile_state"),
+    ("COLUMNAR_CACHE_DIR", "columnar"),
+    ("FIGURE_CACHE_DIR", "figures"),
+    ("UPLOAD_DIR", "uploads"),
+    ("TRACE_DIR", "traces"),
+):
+    os.environ[_var] = os.path.join(_CACHE_ROOT, _name)
+os.environ["LLM_CACHE_PATH"] = os.path.join(_CACHE_ROOT, "llm_responses.sqlite")
+os.environ["CHECKPOINT_DB"] = os.path.join(_CACHE_ROOT, "checkpoints.sqlite")
+
+import pytest
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    """Write a DataFrame to a CSV under the test's temporary directory and return its path."""
+    def write(df, name="data.csv"):
+        path = tmp_path / name
+        df.to_csv(path, index=False)
+        return str(path)
+    return write
@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.Graph.batch import load_jobs, run_batch
+
+
+def _write_datasets(tmp_path, count: int) -> list:
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        path = tmp_path / "datasets" / f"d{i}.csv"
+        path.parent.mkdir(exist_ok=True)
+        pd.DataFrame({"x": rng.normal(size=100), "target": rng.integers(0, 2, 100)}).to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def _records(path) -> list:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_load_jobs_reads_directories_and_manifests(tmp_path):
+    paths = _write_datasets(tmp_path, 2)
+    assert [j["file_path"] for j in load_jobs(str(tmp_path / "datasets"))] == [str(p) for p in paths]
+
+    manifest = tmp_path / "jobs.jsonl"
+    manifest.write_text('# comment\n{"file_path": "datasets/d0.csv", "query": "Why?"}\ndatasets/d1.csv\n')
+    jobs = load_jobs(str(manifest), query="Default")
+    assert jobs == [
+        {"file_path": str(tmp_path / "datasets" / "d0.csv"), "query": "Why?"},
+        {"file_path": str(tmp_path / "datasets" / "d1.csv"), "query": "Default"},
+    ]
+
+
+def test_batch_records_every_job_and_skips_finished_ones_on_rerun(tmp_path):
+    _write_datasets(tmp_path, 2)
+    sink = tmp_path / "results.jsonl"
+    jobs = load_jobs(str(tmp_path / "datasets"))
+
+    assert asyncio.run(run_batch(jobs, str(sink), concurrency=2)) == {"skipped": 0, "ok": 2}
+    assert {r["status"] for r in _records(sink)} == {"ok"}
+    assert asyncio.run(run_batch(jobs, str(sink))) == {"skipped": 2}
+    assert len(_records(sink)) == 2
+
+
+def test_missing_manifest_file_is_an_error_result_not_an_abort(tmp_path):
+    _write_datasets(tmp_path, 1)
+    manifest = tmp_path / "jobs.txt"
+    manifest.write_text("datasets/d0.csv\ndatasets/missing.csv\n")
+    sink = tmp_path / "results.jsonl"
+
+    summary = asyncio.run(run_batch(load_jobs(str(manifest)), str(sink)))
+
+    assert summary == {"skipped": 0, "ok": 1, "error": 1}
+    by_file = {r["file_path"].rsplit("/", 1)[-1]: r for r in _records(sink)}
+    assert by_file["d0.csv"]["status"] == "ok"
+    assert by_file["missing.csv"]["status"] == "error"
+    assert "FileNotFoundError" in by_file["missing.csv"]["error"]
@@ -0,0 +1,8 @@
+from benchmarks.bench_profile_logic import legacy_profile_logic, make_wide_frame, same_profile
+from src.tools.utils import dataset_profile_logic
+
+
+def test_vectorized_profile_matches_the_per_column_reference():
+    for rows, columns in ((0, 8), (1, 8), (3000, 40)):
+        df = make_wide_frame(rows, columns)
+        assert same_profile(legacy_profile_logic(df), dataset_profile_logic(df)), (rows, columns)
@@ -0,0 +1,142 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+import src.Graph.checkpoints as checkpoints
+from src.Graph.checkpoints import prepare_run
+
+
+class _State(TypedDict, total=False):
+    messages: list
+    file_path: str
+    profile_data: dict
+    strategy: str
+    answer: str
+
+
+def _graph(calls: dict, fail_once: bool = False, checkpointer=None):
+    """Planner then answer; the planner is skipped when a strategy is already known."""
+    def plan(state):
+        if state.get("strategy"):
+            return {}
+        calls["plan"] += 1
+        return {"profile_data": {"rows": 3}, "strategy": "look at x"}
+
+    def answer(state):
+        calls["answer"] += 1
+        if fail_once and calls["answer"] == 1:
+            raise RuntimeError("model timed out")
+        return {"answer": f"{state['strategy']} for {state['messages'][-1].content}"}
+
+    builder = StateGraph(_State)
+    builder.add_node("plan", plan)
+    builder.add_node("answer", answer)
+    builder.add_edge(START, "plan")
+    builder.add_edge("plan", "answer")
+    builder.add_edge("answer", END)
+    return builder.compile(checkpointer=checkpointer or InMemorySaver())
+
+
+def _inputs(path: str, query: str) -> dict:
+    return {"messages": [HumanMessage(query)], "file_path": path}
+
+
+@pytest.fixture
+def dataset(write_csv):
+    return write_csv(pd.DataFrame({"x": [1, 2, 3]}), name="checkpointed.csv")
+
+
+def test_a_repeated_question_returns_the_stored_final_state(dataset):
+    calls = {"plan": 0, "answer": 0}
+    graph = _graph(calls)
+    run_inputs, config, finished = prepare_run(graph, _inputs(dataset, "Why is x rising?"))
+    assert finished is None
+    graph.invoke(run_inputs, config)
+
+    run_inputs, again, finished = prepare_run(graph, _inputs(dataset, "  why is X   rising? "))
+
+    assert run_inputs is None and again["configurable"] == config["configurable"]
+    assert finished["answer"] == "look at x for Why is x rising?"
+    assert calls == {"plan": 1, "answer": 1}
+
+
+def test_a_failed_run_resumes_from_its_last_completed_node(dataset):
+    calls = {"plan": 0, "answer": 0}
+    graph = _graph(calls, fail_once=True)
+    run_inputs, config, _ = prepare_run(graph, _inputs(dataset, "q"))
+    with pytest.raises(RuntimeError):
+        graph.invoke(run_inputs, config)
+
+    run_inputs, config, finished = prepare_run(graph, _inputs(dataset, "q"))
+    assert run_inputs is None and finished is None
+    result = graph.invoke(run_inputs, config)
+
+    assert result["answer"] == "look at x for q"
+    assert calls == {"plan": 1, "answer": 2}
+
+
+def test_a_new_question_starts_from_the_earlier_profile_and_strategy(dataset):
+    calls = {"plan": 0, "answer": 0}
+    graph = _graph(calls)
+    graph.invoke(*prepare_run(graph, _inputs(dataset, "first"))[:2])
+
+    run_inputs, config, finished = prepare_run(graph, _inputs(dataset, "second"))
+
+    assert finished is None
+    assert run_inputs["strategy"] == "look at x" and run_inputs["profile_data"] == {"rows": 3}
+    assert graph.invoke(run_inputs, config)["answer"] == "look at x for second"
+    assert calls == {"plan": 1, "answer": 2}
+
+
+def test_old_threads_are_pruned(dataset, monkeypatch):
+    monkeypatch.setattr(checkpoints, "CHECKPOINT_MAX_THREADS", 2)
+    graph = _graph({"plan": 0, "answer": 0})
+    threads = []
+    for query in ("one", "two", "three"):
+        run_inputs, config, _ = prepare_run(graph, _inputs(dataset, query))
+        graph.invoke(run_inputs, config)
+        threads.append(config["configurable"]["thread_id"])
+
+    assert list(graph.checkpointer.storage) == threads[1:]
+
+
+@pytest.fixture
+def sqlite_saver(tmp_path):
+    sqlite = pytest.importorskip("langgraph.checkpoint.sqlite")
+    conn = sqlite3.connect(tmp_path / "checkpoints.sqlite", check_same_thread=False)
+    saver = sqlite.SqliteSaver(conn)
+    saver.setup()
+    yield saver
+    conn.close()
+
+
+def _sqlite_threads(saver) -> set:
+    return {row[0] for row in saver.conn.execute("SELECT DISTINCT thread_id FROM checkpoints")}
+
+
+def test_sqlite_checkpoints_resume_and_prune(dataset, sqlite_saver, monkeypatch):
+    monkeypatch.setattr(checkpoints, "CHECKPOINT_MAX_THREADS", 2)
+    calls = {"plan": 0, "answer": 0}
+    graph = _graph(calls, fail_once=True, checkpointer=sqlite_saver)
+    run_inputs, config, _ = prepare_run(graph, _inputs(dataset, "one"))
+    with pytest.raises(RuntimeError):
+        graph.invoke(run_inputs, config)
+
+    run_inputs, config, finished = prepare_run(graph, _inputs(dataset, "one"))
+    assert run_inputs is None and finished is None
+    assert graph.invoke(run_inputs, config)["answer"] == "look at x for one"
+    assert calls == {"plan": 1, "answer": 2}
+
+    threads = [config["configurable"]["thread_id"]]
+    for query in ("two", "three"):
+        run_inputs, config, _ = prepare_run(graph, _inputs(dataset, query))
+        graph.invoke(run_inputs, config)
+        threads.append(config["configurable"]["thread_id"])
+
+    assert _sqlite_threads(sqlite_saver) == set(threads[1:])
+    assert calls == {"plan": 1, "answer": 4}
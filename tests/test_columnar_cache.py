@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.tools.columnar_cache import ensure_columnar, fresh_columnar_path, iter_columnar_chunks, read_dataset
+
+
+def _frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "x": rng.normal(size=500),
+        "n": rng.integers(0, 10, 500),
+        "s": rng.choice(["a", "b", None], 500),
+        "flag": rng.random(500) < 0.5,
+    })
+
+
+def test_read_dataset_matches_read_csv(write_csv):
+    path = write_csv(_frame())
+    expected = pd.read_csv(path)
+
+    pd.testing.assert_frame_equal(read_dataset(path), expected)
+    assert fresh_columnar_path(path) is not None
+    # Second read comes from the Arrow copy
+    pd.testing.assert_frame_equal(read_dataset(path), expected)
+    pd.testing.assert_frame_equal(read_dataset(path, columns=["n", "s"]), expected[["n", "s"]])
+    pd.testing.assert_frame_equal(read_dataset(path, nrows=7), expected.head(7))
+
+
+def test_copy_is_rebuilt_when_the_csv_changes(write_csv):
+    path = write_csv(_frame())
+    read_dataset(path)
+
+    extra = _frame().head(3)
+    extra.to_csv(path, mode="a", header=False, index=False)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert fresh_columnar_path(path) is None
+
+    assert len(read_dataset(path)) == 503
+
+
+def test_columnar_chunks_cover_every_row(write_csv):
+    path = write_csv(_frame())
+    chunks = list(iter_columnar_chunks(ensure_columnar(path), chunksize=128))
+    assert [len(c) for c in chunks] == [128, 128, 128, 116]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), pd.read_csv(path))
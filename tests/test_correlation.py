@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.tools.correlation as correlation
+import src.tools.file_tools as file_tools
+from src.tools.correlation import correlation_columns, correlation_pairs
+from src.tools.file_tools import correlation_tool, dataset_profile_tool
+
+
+def _frame(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=rows)
+    df = pd.DataFrame({
+        "base": base,
+        "double": 2 * base + rng.normal(scale=0.5, size=rows),
+        "inverse": -base + rng.normal(scale=1.0, size=rows),
+        "noise": rng.normal(size=rows),
+        "count": rng.integers(0, 100, rows),
+        "flag": rng.random(rows) < 0.3,
+        "segment": rng.choice(["a", "b", "c"], rows),
+        "region": rng.choice(["north", "south"], rows),
+        "customer": [f"c{i}" for i in range(rows)],
+        "day": pd.date_range("2024-01-01", periods=rows, freq="min").strftime("%Y-%m-%d %H:%M"),
+    })
+    df.loc[rng.random(rows) < 0.05, "double"] = np.nan
+    return df
+
+
+def _pandas_pairs(df: pd.DataFrame, method: str) -> dict:
+    corr = df.select_dtypes(include=["number", "bool"]).corr(method=method)
+    return {
+        (x, y): corr.loc[x, y]
+        for i, x in enumerate(corr.columns) for y in corr.columns[i + 1:]
+    }
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_pairs_match_pandas_corr(method):
+    df = _frame(2000, seed=0).drop(columns="double")
+    expected = _pandas_pairs(df, method)
+
+    pairs = correlation_pairs(df, method=method, top_k=100)
+
+    assert len(pairs) == len(expected)
+    for pair in pairs:
+        assert pair["value"] == pytest.approx(expected[pair["x"], pair["y"]], abs=1e-4)
+    assert (pairs[0]["x"], pairs[0]["y"]) == ("base", "inverse")
+
+
+def test_tool_reads_only_pairable_columns(write_csv, monkeypatch):
+    df = _frame(3000, seed=1)
+    path = write_csv(df, name="projected.csv")
+    profile = dataset_profile_tool.invoke({"file_path": path})
+    assert correlation_columns(profile) == ["base", "double", "inverse", "noise", "count", "flag", "segment", "region"]
+
+    requested, read_dataset = [], file_tools.read_dataset
+
+    def recording_read(file_path, columns=None):
+        requested.append(columns)
+        return read_dataset(file_path, columns=columns)
+
+    monkeypatch.setattr(file_tools, "read_dataset", recording_read)
+    result = correlation_tool.invoke({"file_path": path, "top_k": 50})
+
+    assert requested == [correlation_columns(profile)]
+    assert result["rows"] == 3000 and result["sampled_rows"] is None
+    expected = _pandas_pairs(df, "pearson")
+    for pair in result["correlations"]:
+        assert pair["value"] == pytest.approx(expected[pair["x"], pair["y"]], abs=1e-4)
+    assert {(a["x"], a["y"]) for a in result["associations"]} == {("segment", "region")}
+
+
+def test_tool_samples_rows_that_do_not_fit_the_budget(write_csv, monkeypatch):
+    df = _frame(20_000, seed=2)
+    path = write_csv(df, name="sampled.csv")
+    monkeypatch.setattr(correlation, "CORR_MAX_ROWS", 4000)
+
+    result = correlation_tool.invoke({"file_path": path, "top_k": 50})
+
+    assert result["rows"] == 20_000
+    assert 3000 < result["sampled_rows"] <= 4000
+    expected = _pandas_pairs(df, "pearson")
+    strongest = result["correlations"][0]
+    assert (strongest["x"], strongest["y"]) == ("base", "double")
+    for pair in result["correlations"]:
+        assert pair["value"] == pytest.approx(expected[pair["x"], pair["y"]], abs=0.05)
+        assert pair["n"] <= 4000
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.tools.dtype_inference as dtype_inference
+import src.tools.file_tools as file_tools
+from src.tools.columnar_cache import fresh_columnar_path
+from src.tools.dtype_inference import default_records, infer_compact_plan, read_csv_compact
+from src.tools.file_tools import _build_profile
+
+
+def _frame(rows: int = 3000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "small_int": rng.integers(0, 100, rows),
+        "big_int": rng.integers(0, 100, rows),
+        "price": rng.normal(10, 2, rows).round(2),
+        "segment": rng.choice(["retail", "online", "wholesale"], rows),
+        "name": [f"customer-{i}" for i in rng.integers(0, 10 * rows, rows)],
+        "signup_date": pd.Series(pd.date_range("2024-01-01", periods=60).strftime("%Y-%m-%d"))
+        .sample(rows, replace=True, random_state=0).to_numpy(),
+        "flag": rng.choice([True, False, None], rows),
+        "target": rng.integers(0, 2, rows),
+    })
+    # A value far outside the sampled range must widen, not overflow
+    df.loc[rows - 1, "big_int"] = 10**12
+    return df
+
+
+def _missing_as_none(records: list) -> list:
+    # Arrow and CSV reads spell a missing object value as None and NaN
+    return [{k: None if pd.isna(v) else v for k, v in r.items()} for r in records]
+
+
+def test_plan_picks_compact_kinds_from_a_sample():
+    plan = infer_compact_plan(_frame())
+    assert plan["small_int"] == "int"
+    assert plan["segment"] == "category"
+    assert plan["signup_date"] == "date"
+    assert "price" not in plan and "flag" not in plan
+    assert infer_compact_plan(_frame(), parse_dates=False)["signup_date"] == "category"
+
+
+def _as_objects(s: pd.Series) -> pd.Series:
+    s = s.astype(object)
+    return s.where(s.notna(), None)
+
+
+@pytest.mark.parametrize("columnar", [True, False])
+def test_compact_read_keeps_every_value(write_csv, monkeypatch, columnar):
+    path = write_csv(_frame(), name=f"compact-{columnar}.csv")
+    default = pd.read_csv(path)
+    if not columnar:
+        monkeypatch.setattr(dtype_inference, "ensure_columnar", lambda file_path: None)
+
+    df, report = read_csv_compact(path, sample_rows=500)
+
+    assert (fresh_columnar_path(path) is not None) == columnar
+    assert report["default_dtypes"] == {col: str(dtype) for col, dtype in default.dtypes.items()}
+    assert report["memory"]["compact_bytes"] < report["memory"]["default_bytes_estimate"]
+    assert df["big_int"].max() == 10**12
+    for col in default.columns:
+        if col == "signup_date":
+            expected = pd.to_datetime(default[col])
+        else:
+            expected = default[col]
+        pd.testing.assert_series_equal(_as_objects(df[col]), _as_objects(expected), check_names=False)
+    assert _missing_as_none(default_records(df, report, 5)) == _missing_as_none(default.head(5).to_dict(orient="records"))
+
+
+def test_full_profile_is_the_same_with_or_without_compact_dtypes(write_csv, monkeypatch):
+    path = write_csv(_frame())
+
+    compact = _build_profile(path, 5, "full", False)
+    monkeypatch.setattr(file_tools, "COMPACT_DTYPES", False)
+    default = _build_profile(path, 5, "full", False)
+
+    assert compact.pop("memory")["saved_bytes"] > 0
+    for key in default:
+        if key == "numeric_summary":
+            for col, summary in default[key].items():
+                assert compact[key][col] == pytest.approx(summary)
+        elif key == "sample_rows":
+            assert _missing_as_none(compact[key]) == _missing_as_none(default[key])
+        else:
+            assert compact[key] == default[key], key
+    # Date strings keep their most frequent values
+    assert compact["top_values"]["signup_date"]["values"]
@@ -0,0 +1,48 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+
+from src.Graph.workflow import _initial_state, build_graph
+from src.services.fake_llm import PLOT_PLAN_RESPONSE, STRATEGY_RESPONSE, ScriptedChatModel
+from src.tools.file_tools import correlation_tool, dataset_profile_tool
+from src.utils.instrumentation import trace_run
+
+
+def test_one_message_calls_every_bound_tool():
+    model = ScriptedChatModel().bind_tools([dataset_profile_tool, correlation_tool])
+
+    response = model.invoke([HumanMessage(content="Profile the data")])
+
+    assert [c["name"] for c in response.tool_calls] == ["dataset_profile_tool", "correlation_tool"]
+    assert len({c["id"] for c in response.tool_calls}) == 2
+    assert response.usage_metadata["output_tokens"] == 20
+
+
+def test_script_follows_the_workflow_steps():
+    model = ScriptedChatModel()
+    bound = model.bind_tools([dataset_profile_tool])
+    answered = [HumanMessage(content="q"), ToolMessage(content="profile", tool_call_id="call_1")]
+
+    assert not bound.invoke(answered).tool_calls
+    assert model.invoke([SystemMessage(content="You are a Senior Data Scientist."), HumanMessage(content="plan")]).content == STRATEGY_RESPONSE
+    assert model.invoke([SystemMessage(content="You are a Visualization Expert."), HumanMessage(content="plot")]).content == PLOT_PLAN_RESPONSE
+
+
+def test_async_workflow_runs_both_tools_concurrently(write_csv):
+    rng = np.random.default_rng(0)
+    path = write_csv(pd.DataFrame({
+        "x": rng.normal(size=2000), "y": rng.normal(size=2000), "g": rng.choice(["a", "b"], 2000),
+    }))
+
+    with trace_run(export=False) as trace:
+        state = asyncio.run(build_graph(use_async=True).ainvoke(_initial_state("Summarize the data", path)))
+
+    tools = {s["name"]: s for s in trace.spans if s["name"].startswith("tool:")}
+    assert set(tools) == {"tool:dataset_profile_tool", "tool:correlation_tool"}
+    assert state["relationships"].startswith("rows=2000")
+    # Both calls came from one AI message, so the tool node ran them side by side
+    profile, corr = tools["tool:dataset_profile_tool"], tools["tool:correlation_tool"]
+    assert profile["start"] < corr["start"] + corr["wall_ms"] / 1000
+    assert corr["start"] < profile["start"] + profile["wall_ms"] / 1000
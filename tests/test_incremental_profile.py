@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.tools.streaming_profile as streaming
+from src.tools.incremental_profile import incremental_profile, state_path
+from src.tools.streaming_profile import stream_profile
+
+_EXACT_KEYS = ("shape", "columns", "duplicates", "nulls", "unique_values", "histograms", "top_values")
+
+
+def _rows(start: int, count: int) -> pd.DataFrame:
+    rng = np.random.default_rng(start)
+    return pd.DataFrame({
+        "id": np.arange(start, start + count) % 700,
+        "amount": rng.normal(100, 20, count).round(1),
+        "segment": rng.choice(["a", "b", "c"], count),
+    })
+
+
+def _append(path: str, df: pd.DataFrame) -> None:
+    df.to_csv(path, mode="a", header=False, index=False)
+
+
+def _assert_same(profile: dict, expected: dict) -> None:
+    for key in _EXACT_KEYS:
+        assert profile[key] == expected[key], key
+    for col, summary in expected["numeric_summary"].items():
+        assert profile["numeric_summary"][col] == pytest.approx(summary)
+
+
+def test_appends_match_a_full_rebuild(write_csv):
+    path = write_csv(_rows(0, 1000))
+    incremental_profile(path, chunksize=300)
+    for start in (1000, 1500, 1510):
+        _append(path, _rows(start, 500 if start < 1510 else 10))
+        profile = incremental_profile(path, chunksize=300)
+
+    _assert_same(profile, stream_profile(path, chunksize=300))
+    assert profile["shape"]["rows"] == 2010
+
+
+def test_unchanged_file_reuses_the_state(write_csv):
+    path = write_csv(_rows(0, 500))
+    first = incremental_profile(path)
+    mtime = state_path(path, 5, False).stat().st_mtime_ns
+
+    assert incremental_profile(path) == first
+    assert state_path(path, 5, False).stat().st_mtime_ns == mtime
+
+
+def test_a_half_written_last_row_waits_for_its_newline(write_csv):
+    path = write_csv(_rows(0, 500))
+    incremental_profile(path)
+    with open(path, "a") as f:
+        f.write("9999,1.5,")
+    assert incremental_profile(path)["shape"]["rows"] == 500
+
+    with open(path, "a") as f:
+        f.write("a\n")
+    profile = incremental_profile(path)
+    assert profile["shape"]["rows"] == 501
+    assert profile["numeric_summary"]["id"]["max"] == 9999
+
+
+def test_rewritten_prefix_triggers_a_rebuild(write_csv):
+    path = write_csv(_rows(0, 500))
+    incremental_profile(path)
+
+    _rows(5000, 400).to_csv(path, index=False)
+
+    _assert_same(incremental_profile(path), stream_profile(path))
+
+
+def test_saved_state_stays_bounded_past_the_exact_limits(write_csv, monkeypatch):
+    monkeypatch.setattr(streaming, "EXACT_DISTINCT_LIMIT", 200)
+    monkeypatch.setattr(streaming, "EXACT_ROWS_LIMIT", 500)
+    path = write_csv(_rows(0, 2000))
+    incremental_profile(path)
+    small = state_path(path, 5, False).stat().st_size
+
+    for start in range(2000, 20_000, 3000):
+        _append(path, _rows(start, 3000))
+        profile = incremental_profile(path)
+
+    # Spilled counters are fixed-size sketches, so 10x the rows adds no state
+    assert state_path(path, 5, False).stat().st_size <= small * 1.1
+    assert profile["unique_values"]["segment"] == 3
+    assert profile["unique_values"]["amount"] == pytest.approx(
+        pd.read_csv(path)["amount"].nunique(), rel=0.05
+    )
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.services.fake_llm import ScriptedChatModel
+from src.tools.profile_cache import profile_cache
+from src.utils.instrumentation import instrument_node, span, token_usage_callback, trace_run
+
+
+def test_spans_outside_a_run_are_not_recorded():
+    with span("idle") as record:
+        assert record is None
+
+
+def test_llm_tokens_are_attributed_to_the_enclosing_span():
+    model = ScriptedChatModel(callbacks=[token_usage_callback])
+    with trace_run(export=False) as trace:
+        with span("profiler"):
+            model.invoke([HumanMessage(content="Summarize the dataset")])
+            model.invoke([HumanMessage(content="Again")])
+        with span("planner"):
+            pass
+
+    summary = trace.summary()
+    assert summary["profiler"]["calls"] == 1
+    assert summary["profiler"]["prompt_tokens"] > 0 and summary["profiler"]["completion_tokens"] > 0
+    assert trace.spans[0]["llm_calls"] == 2
+    assert summary["planner"]["prompt_tokens"] == 0
+
+
+def test_failed_spans_record_the_error_and_reraise():
+    with trace_run(export=False) as trace:
+        with pytest.raises(ValueError):
+            with span("tool:broken", kind="tool"):
+                raise ValueError("bad input")
+    assert trace.spans[0]["error"] == "ValueError: bad input"
+    assert trace.spans[0]["kind"] == "tool"
+
+
+def test_sync_and_async_nodes_are_instrumented():
+    def node(state):
+        return {"n": state["n"] + 1}
+
+    async def anode(state):
+        await asyncio.sleep(0)
+        return {"n": state["n"] * 2}
+
+    with trace_run(export=False) as trace:
+        assert instrument_node("sync", node)({"n": 1}) == {"n": 2}
+        assert asyncio.run(instrument_node("async", anode)({"n": 3})) == {"n": 6}
+    assert [s["name"] for s in trace.spans] == ["sync", "async"]
+
+
+def test_export_writes_jsonl_and_prometheus_text(tmp_path):
+    with trace_run(run_id="run1", export=False) as trace:
+        with span("renderer"):
+            pass
+    trace.export(tmp_path)
+
+    record = json.loads((tmp_path / "run1.jsonl").read_text())
+    assert record["run_id"] == "run1" and record["name"] == "renderer"
+    prom = (tmp_path / "run1.prom").read_text()
+    assert 'eda_span_calls_total{run_id="run1",span="renderer"} 1' in prom
+    assert "# TYPE eda_peak_rss_bytes gauge" in prom
+
+
+def test_cache_hits_are_counted_per_run():
+    profile_cache.put("instrumented", {"rows": 1})
+    profile_cache.get("instrumented")
+    overlap = threading.Barrier(2)
+    traces = {}
+
+    def run(run_id: str, lookups: int):
+        with trace_run(run_id=run_id, export=False) as trace:
+            with span("profiler"):
+                overlap.wait()
+                for _ in range(lookups):
+                    assert profile_cache.get("instrumented") == {"rows": 1}
+                overlap.wait()
+        traces[run_id] = trace
+
+    threads = [threading.Thread(target=run, args=args) for args in (("busy", 3), ("idle", 0))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert traces["busy"].spans[0]["profile_cache_hits"] == 3
+    assert traces["idle"].spans[0]["profile_cache_hits"] == 0
+    assert 'eda_cache_hits_total{run_id="busy",cache="profile"} 3' in traces["busy"].to_prometheus()
+    assert 'eda_cache_hits_total{run_id="idle",cache="profile"} 0' in traces["idle"].to_prometheus()
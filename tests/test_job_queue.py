@@ -0,0 +1,101 @@
+import threading
+import time
+
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from src.services.job_queue import CANCELLED, DONE, FAILED, JobQueue
+
+
+class _State(TypedDict):
+    steps: list
+
+
+def _graph(first=None):
+    """Two-node graph; ``first`` runs inside the first node."""
+    def step_one(state):
+        if first is not None:
+            first()
+        return {"steps": state["steps"] + ["one"]}
+
+    def step_two(state):
+        return {"steps": state["steps"] + ["two"]}
+
+    builder = StateGraph(_State)
+    builder.add_node("one", step_one)
+    builder.add_node("two", step_two)
+    builder.add_edge(START, "one")
+    builder.add_edge("one", "two")
+    builder.add_edge("two", END)
+    return builder.compile()
+
+
+def _wait(queue: JobQueue, job_id: str, timeout: float = 10.0):
+    job = queue.get(job_id)
+    job.future.result(timeout=timeout)
+    return job
+
+
+def test_jobs_run_in_the_background_and_report_progress():
+    queue = JobQueue(max_workers=2)
+    job = _wait(queue, queue.submit({"steps": []}, graph=_graph()))
+
+    assert job.status == DONE
+    assert job.result == {"steps": ["one", "two"]}
+    assert [name for name, _ in job.progress] == ["one", "two"]
+    assert job.snapshot()["elapsed_seconds"] >= 0
+
+
+def test_failures_are_recorded_on_the_job():
+    def boom():
+        raise RuntimeError("bad data")
+
+    queue = JobQueue(max_workers=1)
+    job = _wait(queue, queue.submit({"steps": []}, graph=_graph(boom)))
+
+    assert job.status == FAILED
+    assert job.error == "RuntimeError: bad data"
+
+
+def test_cancel_stops_a_running_job_after_its_current_node_and_drops_queued_ones():
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    queue = JobQueue(max_workers=1)
+    running = queue.submit({"steps": []}, graph=_graph(block))
+    queued = queue.submit({"steps": []}, graph=_graph())
+    assert started.wait(5)
+
+    assert queue.cancel(queued)
+    assert queue.get(queued).status == CANCELLED
+    assert queue.cancel(running)
+    release.set()
+    job = _wait(queue, running)
+
+    assert job.status == CANCELLED
+    assert [name for name, _ in job.progress] == ["one"]
+    assert not queue.cancel(running)
+
+
+def test_workers_bound_concurrency_and_history_is_pruned():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def track():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    queue = JobQueue(max_workers=2, history=3)
+    ids = [queue.submit({"steps": []}, graph=_graph(track)) for _ in range(6)]
+    for job_id in ids:
+        _wait(queue, job_id)
+
+    assert peak[0] == 2
+    queue.submit({"steps": []}, graph=_graph())
+    assert sum(queue.get(job_id) is not None for job_id in ids) == 3
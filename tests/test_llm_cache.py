@@ -0,0 +1,91 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+
+import src.services.llm_cache as llm_cache
+from src.services.fake_llm import ScriptedChatModel
+from src.services.llm_cache import SQLiteResponseCache, cache_key
+
+
+def _prompt(text: str) -> str:
+    return json.dumps([{"type": "human", "data": {"content": text, "id": "volatile"}}])
+
+
+def _answer(text: str) -> list:
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+def test_hit_returns_the_stored_generations(tmp_path):
+    cache = SQLiteResponseCache(tmp_path / "llm.sqlite")
+    assert cache.lookup(_prompt("hi"), "model") is None
+    cache.update(_prompt("hi"), "model", _answer("hello"))
+
+    cached = cache.lookup(_prompt("hi"), "model")
+
+    assert cached[0].message.content == "hello"
+    assert cache.lookup(_prompt("hi"), "other-model") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_key_ignores_volatile_fields_and_trailing_whitespace():
+    a = json.dumps([{"type": "human", "data": {"content": "  plan \nnow  ", "id": "1"}}])
+    b = json.dumps([{"type": "human", "data": {"content": "plan\nnow", "id": "2"}}])
+    assert cache_key(a, "model") == cache_key(b, "model")
+
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+    cache = SQLiteResponseCache(tmp_path / "llm.sqlite", ttl_seconds=60)
+    cache.update(_prompt("hi"), "model", _answer("hello"))
+
+    real_time = llm_cache.time.time
+    monkeypatch.setattr(llm_cache.time, "time", lambda: real_time() + 61)
+
+    assert cache.lookup(_prompt("hi"), "model") is None
+    assert cache.expired == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = SQLiteResponseCache(tmp_path / "llm.sqlite", max_entries=2)
+    cache.update(_prompt("a"), "model", _answer("A"))
+    cache.update(_prompt("b"), "model", _answer("B"))
+    cache.lookup(_prompt("a"), "model")
+
+    cache.update(_prompt("c"), "model", _answer("C"))
+
+    assert cache.lookup(_prompt("b"), "model") is None
+    assert cache.lookup(_prompt("a"), "model") is not None
+    assert cache.evictions == 1
+
+
+def test_one_connection_is_shared_across_threads_and_survives_close(tmp_path):
+    cache = SQLiteResponseCache(tmp_path / "llm.sqlite")
+    cache.update(_prompt("warm"), "model", _answer("up"))
+    conn = cache._conn
+
+    def use(i: int):
+        cache.update(_prompt(str(i)), "model", _answer(str(i)))
+        return cache.lookup(_prompt(str(i)), "model")[0].message.content
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert list(pool.map(use, range(50))) == [str(i) for i in range(50)]
+    assert cache._conn is conn
+
+    cache.close()
+    assert cache._conn is None
+    assert cache.lookup(_prompt("7"), "model")[0].message.content == "7"
+    cache.clear()
+    assert cache.lookup(_prompt("7"), "model") is None
+
+
+def test_chat_model_serves_repeated_prompts_from_the_cache(tmp_path):
+    cache = SQLiteResponseCache(tmp_path / "llm.sqlite")
+    model = ScriptedChatModel(cache=cache)
+
+    first = model.invoke([HumanMessage(content="Summarize")])
+    second = model.invoke([HumanMessage(content="Summarize")])
+
+    assert second.content == first.content
+    assert model.calls == 1
+    assert cache.hits == 1
@@ -0,0 +1,52 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.utils.message_history import add_and_compact_messages, is_compacted, window_messages
+
+
+def _tool_turn(i: int, output: str) -> list:
+    call = {"name": "dataset_profile_tool", "args": {"file_path": "d.csv"}, "id": f"call_{i}"}
+    return [AIMessage(content="", tool_calls=[call]), ToolMessage(content=output, tool_call_id=f"call_{i}")]
+
+
+def test_tool_output_is_kept_until_an_ai_message_reads_it():
+    history = add_and_compact_messages([HumanMessage(content="profile it")], _tool_turn(0, "x" * 5000))
+    assert history[-1].content == "x" * 5000
+    assert not is_compacted(history[-1])
+
+    history = add_and_compact_messages(history, [AIMessage(content="summary")])
+
+    tool = history[2]
+    assert is_compacted(tool)
+    assert tool.tool_call_id == "call_0"
+    assert tool.content == "[5000 chars of tool output already read; full text in artifacts['call_0']]"
+    assert [m.type for m in history] == ["human", "ai", "tool", "ai"]
+
+
+def test_compaction_is_idempotent_and_does_not_touch_other_messages():
+    history = add_and_compact_messages([HumanMessage(content="q")], _tool_turn(0, "out"))
+    history = add_and_compact_messages(history, [AIMessage(content="a1")])
+    compacted = history[2].content
+
+    history = add_and_compact_messages(history, [AIMessage(content="a2")])
+
+    assert history[2].content == compacted
+    assert history[0].content == "q"
+    assert [m.content for m in history[3:]] == ["a1", "a2"]
+
+
+def test_window_keeps_the_question_and_the_newest_turns_within_budget():
+    history = [HumanMessage(content="the question")]
+    for i in range(30):
+        history = add_and_compact_messages(history, _tool_turn(i, "y" * 400))
+        history = add_and_compact_messages(history, [AIMessage(content=f"answer {i} " + "z" * 200)])
+
+    window = window_messages(history, max_tokens=400)
+
+    assert window[0].content == "the question"
+    assert window[-1].content.startswith("answer 29")
+    assert len(window) < len(history)
+    assert not isinstance(window[1], ToolMessage)
+    # Every kept tool result follows the AI message that asked for it
+    for prev, message in zip(window, window[1:]):
+        if isinstance(message, ToolMessage):
+            assert message.tool_call_id in [c["id"] for c in prev.tool_calls]
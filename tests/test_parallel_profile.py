@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tools.columnar_cache import ensure_columnar, fresh_columnar_path
+from src.tools.parallel_profile import parallel_profile
+from src.tools.utils import dataset_profile_logic
+
+_EXACT_KEYS = ("shape", "columns", "dtypes", "duplicates", "nulls", "unique_values", "histograms", "top_values")
+
+
+def _frame(columns: int, rows: int = 2000) -> pd.DataFrame:
+    rng = np.random.default_rng(columns)
+    data = {}
+    for i in range(columns):
+        if i % 3 == 0:
+            data[f"c{i}"] = rng.integers(0, 20, rows)
+        elif i % 3 == 1:
+            data[f"c{i}"] = rng.normal(size=rows).round(1)
+        else:
+            data[f"c{i}"] = rng.choice(["x", "y", None], rows)
+    df = pd.DataFrame(data)
+    return pd.concat([df, df.iloc[:40]], ignore_index=True)
+
+
+def _assert_matches_full(profile: dict, path: str) -> None:
+    full = dataset_profile_logic(pd.read_csv(path))
+    for key in _EXACT_KEYS:
+        assert profile[key] == full[key], key
+    for col, expected in full["numeric_summary"].items():
+        assert profile["numeric_summary"][col] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("columns", [3, 12], ids=["row_slices", "column_shards"])
+def test_parallel_profile_matches_full_profile(write_csv, columns):
+    path = write_csv(_frame(columns))
+    ensure_columnar(path)
+    _assert_matches_full(parallel_profile(path, workers=2, chunksize=500), path)
+
+
+def test_parallel_profile_without_a_columnar_copy(write_csv):
+    path = write_csv(_frame(5))
+    _assert_matches_full(parallel_profile(path, workers=3, chunksize=500), path)
+    # Workers parse byte ranges; no serial conversion runs first
+    assert fresh_columnar_path(path) is None
@@ -0,0 +1,86 @@
+import json
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.tools.plot_renderer as plot_renderer
+from src.tools.plot_renderer import aggregate_plot, parse_plot_plan, render_plot_plan
+
+
+@pytest.fixture
+def dataset(write_csv):
+    rng = np.random.default_rng(0)
+    rows = 5000
+    return write_csv(pd.DataFrame({
+        "x": rng.normal(size=rows),
+        "y": rng.normal(size=rows),
+        "segment": rng.choice(["a", "b", "c"], rows),
+        "channel": rng.choice(["web", "store"], rows),
+        "day": pd.date_range("2024-01-01", periods=rows, freq="h").strftime("%Y-%m-%d %H:%M"),
+    }))
+
+
+def test_parse_plot_plan_accepts_the_shapes_models_emit():
+    spec = {"type": "histogram", "x": "x"}
+    assert parse_plot_plan({"plots": [spec]}) == [spec]
+    assert parse_plot_plan([spec, "noise"]) == [spec]
+    assert parse_plot_plan(spec) == [spec]
+    assert parse_plot_plan("```json\n" + json.dumps({"charts": [spec]}) + "\n```") == [spec]
+    assert parse_plot_plan("not json") == []
+
+
+def test_large_scatters_are_binned_before_rendering(dataset):
+    df = pd.read_csv(dataset)
+    points = aggregate_plot(df, {"type": "scatter", "x": "x", "y": "y"})
+    density = aggregate_plot(df, {"type": "scatter", "x": "x", "y": "y", "sample_rows": 1000})
+
+    assert points["kind"] == "points" and len(points["x"]) == 5000
+    assert density["kind"] == "density"
+    assert density["counts"].sum() == 5000
+
+
+def test_box_plots_become_per_group_statistics(dataset):
+    df = pd.read_csv(dataset)
+    payload = aggregate_plot(df, {"type": "box", "x": "segment", "y": "x"})
+    assert payload["kind"] == "box"
+    assert sorted(s["label"] for s in payload["stats"]) == ["a", "b", "c"]
+    for stats in payload["stats"]:
+        values = df.loc[df["segment"] == stats["label"], "x"]
+        assert stats["med"] == pytest.approx(values.median())
+
+
+def test_render_writes_figures_once_and_reports_bad_specs(dataset, tmp_path):
+    plan = {"plots": [
+        {"type": "histogram", "x": "x"},
+        {"type": "violin", "x": "segment", "y": "y"},
+        {"type": "line", "x": "day", "y": "x", "date_freq": "D"},
+        {"type": "stacked_bar", "x": "segment", "hue": "channel"},
+        {"type": "pie", "x": "segment"},
+        {"type": "scatter", "x": "x", "y": "missing"},
+    ]}
+
+    first = render_plot_plan(plan, dataset, tmp_path)
+
+    for record in first[:4]:
+        assert record["cached"] is False and record["path"].endswith(".png"), record
+    assert first[4]["error"] == "unsupported plot type 'pie'"
+    assert first[5]["error"] == "unknown column(s): missing"
+    assert len(list(tmp_path.glob("*.png"))) == 4
+
+    second = render_plot_plan(plan, dataset, tmp_path)
+    assert [r.get("cached") for r in second[:4]] == [True] * 4
+    assert [r["path"] for r in second[:4]] == [r["path"] for r in first[:4]]
+
+
+def test_a_crashed_worker_does_not_break_later_renders(dataset, tmp_path):
+    broken = plot_renderer._get_pool()
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    records = render_plot_plan({"plots": [{"type": "histogram", "x": "y"}]}, dataset, tmp_path)
+
+    assert records[0]["cached"] is False, records
+    assert plot_renderer._get_pool() is not broken
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from src.tools.plot_rules import classify_columns, rule_based_plot_plan
+from src.tools.utils import dataset_profile_logic
+
+
+def _frame(rows: int = 2000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "customer_id": np.arange(rows),
+        "age": rng.integers(18, 90, rows),
+        "income": rng.normal(50_000, 10_000, rows),
+        "region": rng.choice(["north", "south", "east"], rows),
+        "comment": [f"note {i}" for i in rng.integers(0, rows // 2, rows)],
+        "signup_date": pd.date_range("2024-01-01", periods=rows, freq="D").strftime("%Y-%m-%d"),
+        "country": "PT",
+        "churn": rng.integers(0, 2, rows),
+    })
+
+
+def test_columns_are_classified_from_the_profile():
+    kinds = classify_columns(dataset_profile_logic(_frame()))
+    assert kinds == {
+        "customer_id": "id",
+        "age": "numeric",
+        "income": "numeric",
+        "region": "categorical",
+        "comment": "text",
+        "signup_date": "temporal",
+        "country": "constant",
+        "churn": "categorical",
+    }
+
+
+def test_categorical_target_gets_class_balance_and_per_class_views():
+    plan = rule_based_plot_plan(dataset_profile_logic(_frame()))
+
+    assert plan["target"] == "churn" and plan["source"] == "rules"
+    assert plan["plots"] == [
+        {"type": "bar", "x": "churn"},
+        {"type": "stacked_bar", "x": "region", "y": "churn", "normalize": "percent"},
+        {"type": "box", "x": "churn", "y": "age"},
+        {"type": "box", "x": "churn", "y": "income"},
+        {"type": "time_series", "x": "signup_date", "hue": "churn"},
+    ]
+
+
+def test_numeric_target_named_in_the_hint():
+    profile = dataset_profile_logic(_frame())
+    plan = rule_based_plot_plan(profile, hint="**Target_Variable**: income")
+
+    assert plan["target"] == "income"
+    assert plan["plots"][0] == {"type": "histogram", "x": "income", "bins": 30}
+    assert {"type": "scatter", "x": "age", "y": "income"} in plan["plots"]
+    assert {"type": "box", "x": "region", "y": "income"} in plan["plots"]
+    assert rule_based_plot_plan(profile, hint="**Target_Variable**: income") == plan
+
+
+def test_no_plan_without_a_usable_target():
+    df = _frame().drop(columns="churn")
+    assert rule_based_plot_plan(dataset_profile_logic(df)) is None
+    assert rule_based_plot_plan(dataset_profile_logic(df), hint="target: comment") is None
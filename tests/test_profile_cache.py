@@ -0,0 +1,99 @@
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.tools.file_tools import dataset_profile_tool
+from src.tools.profile_cache import ProfileCache, profile_cache
+
+
+def _frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"x": rng.normal(size=200), "g": rng.choice(["a", "b"], 200)})
+
+
+def test_key_follows_content_not_path(tmp_path, write_csv):
+    cache = ProfileCache(tmp_path / "cache")
+    path = write_csv(_frame())
+    copy = tmp_path / "renamed.csv"
+    shutil.copy(path, copy)
+
+    key = cache.key(path, sample_rows=5)
+    assert cache.key(str(copy), sample_rows=5) == key
+    assert cache.key(path, sample_rows=3) != key
+
+    with open(path, "a") as f:
+        f.write("1.0,c\n")
+    assert cache.key(path, sample_rows=5) != key
+
+
+def test_known_key_is_none_until_the_file_has_been_hashed(tmp_path, write_csv):
+    cache = ProfileCache(tmp_path / "cache")
+    path = write_csv(_frame())
+
+    assert cache.known_key(path, sample_rows=5) is None
+    key = cache.key(path, sample_rows=5)
+    assert cache.known_key(path, sample_rows=5) == key
+    # The stat index survives a new process
+    assert ProfileCache(tmp_path / "cache").known_key(path, sample_rows=5) == key
+
+
+def test_get_and_put_count_hits_and_misses(tmp_path):
+    cache = ProfileCache(tmp_path / "cache")
+    assert cache.get("k") is None
+    cache.put("k", {"shape": {"rows": 1}})
+    assert cache.get("k") == {"shape": {"rows": 1}}
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "hit_rate": 0.5}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ProfileCache(tmp_path / "cache", max_entries=2)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    # Make "a" the most recently used entry
+    past = time.time() - 60
+    os.utime(cache.entries_dir / "b.json", (past, past))
+    os.utime(cache.entries_dir / "a.json", (past - 60, past - 60))
+    assert cache.get("a") is not None
+
+    cache.put("c", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1} and cache.get("c") == {"v": 3}
+    assert cache.evictions == 1
+
+
+def test_entries_over_the_byte_budget_are_evicted(tmp_path):
+    cache = ProfileCache(tmp_path / "cache", max_bytes=1000)
+    for i in range(5):
+        cache.put(f"k{i}", {"payload": "x" * 300})
+    total = sum(p.stat().st_size for p in cache.entries_dir.glob("*.json"))
+    assert total <= 1000
+    assert cache.evictions >= 2
+
+
+def test_profile_tool_serves_repeat_calls_from_the_cache(write_csv):
+    path = write_csv(_frame())
+    first = dataset_profile_tool.invoke({"file_path": path, "mode": "full"})
+    hits = profile_cache.hits
+
+    second = dataset_profile_tool.invoke({"file_path": path, "mode": "full"})
+
+    assert profile_cache.hits == hits + 1
+    assert second == first
+
+
+def test_streamed_estimates_are_not_served_as_full_profiles(write_csv, monkeypatch):
+    import src.tools.streaming_profile as streaming
+
+    monkeypatch.setattr(streaming, "EXACT_DISTINCT_LIMIT", 100)
+    df = pd.DataFrame({"id": np.arange(5000), "g": np.arange(5000) % 3})
+    path = write_csv(df, name="estimated.csv")
+
+    streamed = dataset_profile_tool.invoke({"file_path": path, "mode": "streaming"})
+    full = dataset_profile_tool.invoke({"file_path": path, "mode": "full"})
+
+    assert streamed["unique_values"]["id"] != 5000
+    assert full["unique_values"]["id"] == 5000
@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.tools.profile_format import compact_profile, estimate_tokens, format_observation
+from src.tools.utils import dataset_profile_logic
+
+
+def _profile(columns: int = 6, rows: int = 500) -> dict:
+    rng = np.random.default_rng(0)
+    data = {}
+    for i in range(columns):
+        data[f"col_{i}"] = rng.normal(size=rows) if i % 2 else rng.choice(["a", "b|c", None], rows)
+    data["target"] = rng.choice([0, 1], rows, p=[0.8, 0.2])
+    return dataset_profile_logic(pd.DataFrame(data))
+
+
+def test_compact_profile_lists_every_column_and_the_optional_sections():
+    profile = _profile()
+    text = compact_profile(profile)
+    lines = text.splitlines()
+
+    assert lines[0] == "rows=500 columns=7 duplicate_rows=0"
+    assert lines[1].startswith("target=target classes: 0 ")
+    for col in profile["columns"]:
+        assert any(line.startswith(f"{col}|{profile['dtypes'][col]}|") for line in lines), col
+    for section in ("quantiles:", "top_values:", "sample_rows:"):
+        assert section in lines
+    # Pipes inside values never break the row layout
+    assert "b/c" in text and "b|c" not in text
+    assert estimate_tokens(text) <= 3000
+
+
+def test_compact_profile_is_far_smaller_than_json():
+    profile = _profile()
+    assert estimate_tokens(compact_profile(profile)) < estimate_tokens(json.dumps(profile, default=str)) / 2
+
+
+def test_wide_profiles_are_cut_to_the_budget_and_summarized():
+    profile = _profile(columns=400)
+    text = compact_profile(profile, token_budget=800)
+
+    assert estimate_tokens(text) <= 800
+    assert text.splitlines()[-1].startswith("# ")
+    assert "more columns not listed" in text
+    # Optional sections are dropped before any column is
+    assert "quantiles:" not in text
+
+
+def test_format_observation_routes_by_shape():
+    profile = _profile()
+    assert format_observation(profile) == compact_profile(profile)
+    relationships = {"method": "pearson", "rows": 10, "correlations": [], "associations": []}
+    assert format_observation(relationships).startswith("rows=10 method=pearson")
+    assert format_observation({"a": 1}) == '{"a":1}'
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.tools.file_tools as file_tools
+import src.tools.sampled_profile as sampled
+from src.tools.file_tools import dataset_profile_tool
+from src.tools.sampled_profile import distinct_estimate, sampled_profile, wilson_interval
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "amount": rng.normal(100, 15, rows).round(2),
+        "segment": rng.choice(["a", "b", "c", "d"], rows),
+        "code": rng.integers(0, 300, rows),
+    })
+    df.loc[rng.random(rows) < 0.2, "segment"] = None
+    return df
+
+
+def test_wilson_interval_and_gee_bounds():
+    lo, hi = wilson_interval(20, 100)
+    assert lo < 0.2 < hi
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+    estimate, lower, upper = distinct_estimate(np.array([5, 3, 1, 1]), n=10, total=1000)
+    assert lower == 4
+    assert lower <= estimate <= upper <= 1000 - 10 + 4
+
+
+def test_small_files_are_profiled_exactly(write_csv):
+    path = write_csv(_frame(300))
+    profile = sampled_profile(path, n_samples=1000)
+    assert profile["sampling"] == {"exact": True, "sampled_rows": 300}
+    assert profile["shape"]["rows"] == 300
+
+
+def test_intervals_cover_the_true_values(write_csv):
+    df = _frame(50_000)
+    path = write_csv(df)
+
+    profile = sampled_profile(path, n_samples=3000)
+
+    sampling = profile["sampling"]
+    intervals = sampling["intervals"]
+    assert not sampling["exact"] and sampling["sampled_rows"] < 10_000
+    assert intervals["rows"][0] <= len(df) <= intervals["rows"][1]
+    lo, hi = intervals["null_percentage"]["segment"]
+    assert lo <= 100 * df["segment"].isna().mean() <= hi
+    lo, hi = intervals["mean"]["amount"]
+    assert lo <= df["amount"].mean() <= hi
+    lo, hi = intervals["unique_values"]["code"]
+    assert lo <= df["code"].nunique() <= hi
+    assert profile["sample_rows"] == df.head(5).to_dict(orient="records")
+
+
+@pytest.mark.parametrize("approximate", [False, True])
+def test_fast_mode_refines_to_the_exact_profile_for_any_approximate_flag(write_csv, monkeypatch, approximate):
+    monkeypatch.setattr(sampled, "FAST_SAMPLE_ROWS", 1000)
+    path = write_csv(_frame(20_000), name=f"fast-{approximate}.csv")
+
+    first = dataset_profile_tool.invoke({"file_path": path, "mode": "fast", "approximate": approximate})
+    assert first["sampling"]["exact"] is False
+    # Wait for the background refinement
+    file_tools._refine_executor.submit(lambda: None).result()
+
+    refined = dataset_profile_tool.invoke({"file_path": path, "mode": "fast", "approximate": approximate})
+    assert "sampling" not in refined
+    assert refined == dataset_profile_tool.invoke({"file_path": path, "mode": "full"})
+
+
+def test_fast_mode_serves_a_cached_exact_profile_whatever_approximate_says(write_csv, monkeypatch):
+    monkeypatch.setattr(sampled, "FAST_SAMPLE_ROWS", 1000)
+    path = write_csv(_frame(21_000), name="cached.csv")
+    exact = dataset_profile_tool.invoke({"file_path": path, "mode": "full"})
+
+    fast = dataset_profile_tool.invoke({"file_path": path, "mode": "fast", "approximate": True})
+
+    assert fast == exact
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.tools.utils as utils
+from src.tools.sketches import (
+    DyadicHistogram,
+    FingerprintSet,
+    HyperLogLog,
+    KLLSketch,
+    MisraGries,
+    count_values,
+    dyadic_histograms,
+    hash_rows,
+    hash_values,
+    sorted_unique,
+)
+from src.tools.utils import dataset_profile_logic
+
+
+def _hashes(start: int, stop: int) -> np.ndarray:
+    return hash_values(pd.Series(np.arange(start, stop)))
+
+
+def _reference_registers(hashes: np.ndarray, p: int) -> np.ndarray:
+    """Registers computed one hash at a time, straight from the HLL definition."""
+    registers = np.zeros(1 << p, dtype=np.uint8)
+    for h in hashes.tolist():
+        rest = h & ((1 << (64 - p)) - 1)
+        rank = (64 - p) - rest.bit_length() + 1
+        registers[h >> (64 - p)] = max(registers[h >> (64 - p)], rank)
+    return registers
+
+
+def test_sorted_unique_matches_np_unique():
+    values = np.random.default_rng(0).integers(0, 50, 1000).astype(np.uint64)
+    np.testing.assert_array_equal(sorted_unique(values), np.unique(values))
+    assert len(sorted_unique(np.empty(0, dtype=np.uint64))) == 0
+
+
+@pytest.mark.parametrize("precision", [4, 12])
+def test_hyperloglog_registers_match_the_definition(precision):
+    hashes = _hashes(0, 5000)
+    sketch = HyperLogLog(precision)
+    sketch.add_hashes(hashes)
+    np.testing.assert_array_equal(sketch.registers, _reference_registers(hashes, precision))
+
+
+@pytest.mark.parametrize("n", [100, 5000, 200_000])
+def test_hyperloglog_estimate_is_within_a_few_standard_errors(n):
+    sketch = HyperLogLog()
+    sketch.add_hashes(_hashes(0, n))
+    assert sketch.cardinality() == pytest.approx(n, rel=0.05)
+
+
+def test_hyperloglog_merge_equals_one_pass():
+    one_pass, left, right = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    one_pass.add_hashes(_hashes(0, 30_000))
+    left.add_hashes(_hashes(0, 20_000))
+    right.add_hashes(_hashes(10_000, 30_000))
+    left.merge(right)
+    np.testing.assert_array_equal(left.registers, one_pass.registers)
+
+
+def test_fingerprint_set_counts_exactly_across_batches_and_merges():
+    left, right = FingerprintSet(), FingerprintSet()
+    for start in range(0, 1000, 100):
+        left.add_hashes(_hashes(start, start + 150))
+    right.add_hashes(_hashes(900, 1500))
+    left.merge(right)
+    assert left.cardinality() == 1500
+    assert np.all(np.diff(left.fingerprints().astype(np.float64)) > 0)
+
+
+def test_kll_quantiles_are_within_rank_error_and_merge():
+    values = np.random.default_rng(1).normal(size=100_000)
+    left, right = KLLSketch(), KLLSketch(seed=1)
+    left.add(values[:60_000])
+    right.add(values[60_000:])
+    left.merge(right)
+
+    ordered = np.sort(values)
+    for q, estimate in zip((0.01, 0.5, 0.99), left.quantiles([0.01, 0.5, 0.99])):
+        rank = np.searchsorted(ordered, estimate) / len(values)
+        assert abs(rank - q) < 0.02
+    assert KLLSketch().quantiles([0.5]) == [None]
+
+
+def test_dyadic_histogram_does_not_depend_on_chunking():
+    values = np.random.default_rng(2).exponential(10, 10_000)
+    one_pass = DyadicHistogram()
+    one_pass.add(values)
+
+    merged = DyadicHistogram()
+    for chunk in np.array_split(values, 7):
+        part = DyadicHistogram()
+        part.add(chunk)
+        merged.merge(part)
+
+    assert merged.to_dict() == one_pass.to_dict()
+    assert sum(one_pass.to_dict()["counts"]) == len(values)
+    assert len(one_pass.to_dict()["counts"]) <= 32
+
+
+def test_batched_histograms_match_one_histogram_per_column():
+    rng = np.random.default_rng(6)
+    columns = [
+        rng.normal(size=1000),
+        rng.exponential(1e9, 1000),
+        rng.uniform(0, 32, 1000).round(),
+        np.full(1000, 3.0),
+        np.full(1000, np.nan),
+        np.r_[np.inf, -np.inf, rng.normal(1e-12, 1e-15, 998)],
+    ]
+    values = np.column_stack(columns)
+    values[rng.random(values.shape) < 0.1] = np.nan
+
+    expected = []
+    for column in values.T:
+        histogram = DyadicHistogram()
+        histogram.add(column)
+        expected.append(histogram.to_dict())
+    assert dyadic_histograms(values) == expected
+    assert dyadic_histograms(values[:0]) == [None] * len(columns)
+
+
+def test_misra_gries_keeps_heavy_hitters_through_merges():
+    rng = np.random.default_rng(3)
+    values = pd.Series(np.concatenate([np.full(3000, -1), np.full(2000, -2), rng.integers(0, 10_000, 5000)]))
+    left, right = MisraGries(capacity=16), MisraGries(capacity=16)
+    left.add_counts(values.iloc[::2].value_counts())
+    right.add_counts(values.iloc[1::2].value_counts())
+    left.merge(right)
+
+    top = dict(left.top(2))
+    assert set(top) == {-1, -2}
+    assert 3000 - left.error <= top[-1] <= 3000
+    assert 2000 - left.error <= top[-2] <= 2000
+
+
+def test_approximate_profile_is_close_to_exact(monkeypatch):
+    monkeypatch.setattr(utils, "APPROX_MIN_ROWS", 0)
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame({
+        "x": pd.array(rng.normal(size=20_000).round(2), dtype="Float64"),
+        "y": rng.normal(size=20_000).round(2),
+        "small": rng.integers(0, 5, 20_000),
+        "name": rng.choice(["a", "b", "c"], 20_000),
+        "seen": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 10**6, 20_000), unit="s"),
+    })
+    df = pd.concat([df, df.iloc[:100]], ignore_index=True)
+
+    exact = dataset_profile_logic(df)
+    approx = dataset_profile_logic(df, approximate=True)
+
+    assert approx["unique_values"]["x"] == pytest.approx(exact["unique_values"]["x"], rel=0.05)
+    assert approx["unique_values"]["seen"] == pytest.approx(exact["unique_values"]["seen"], rel=0.05)
+    # Numpy numeric columns are counted exactly from the sort behind their quantiles
+    assert approx["unique_values"]["y"] == exact["unique_values"]["y"]
+    # Low-cardinality and non-numeric columns are still counted exactly
+    assert approx["unique_values"]["small"] == exact["unique_values"]["small"] == 5
+    assert approx["unique_values"]["name"] == 3
+    assert approx["top_values"] == exact["top_values"]
+    # Row fingerprints find the same duplicates
+    assert approx["duplicates"] == exact["duplicates"] == {"duplicate_rows": 100}
+
+
+def test_hashes_treat_signed_zeros_as_one_value():
+    s = pd.Series([0.0, -0.0, 1.5, np.nan])
+    assert len(sorted_unique(hash_values(s))) == len(count_values(s)) == 2
+
+    df = pd.DataFrame({"x": [0.0, -0.0], "n": [1, 1]})
+    assert len(sorted_unique(hash_rows(df))) == len(df) - df.duplicated().sum()
+
+
+def test_fingerprint_set_merges_small_appends_into_a_large_set():
+    rng = np.random.default_rng(5)
+    values = rng.integers(0, 2**63, 200_000, dtype=np.uint64)
+    fingerprints = FingerprintSet()
+    fingerprints.add_hashes(values[:150_000])
+    fingerprints.cardinality()
+    for start in range(100_000, 200_000, 7_000):
+        fingerprints.add_hashes(values[start:start + 7_000])
+        fingerprints.cardinality()
+    np.testing.assert_array_equal(fingerprints.fingerprints(), np.unique(values))
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from src.Agents.agent_manager import get_agent_manager
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_building_the_graph_loads_no_tools_or_model():
+    code = (
+        "import sys\n"
+        "from src.Graph.workflow import build_graph\n"
+        "build_graph()\n"
+        "heavy = ('pandas', 'src.tools.file_tools', 'src.Agents.EDA_agent', 'langchain.chat_models')\n"
+        "print(','.join(m for m in heavy if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=_ROOT, env=os.environ.copy(),
+        capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_agent_manager_is_built_once_under_concurrent_first_use():
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        managers = list(pool.map(lambda _: get_agent_manager(), range(16)))
+    assert all(m is managers[0] for m in managers)
+    assert managers[0].list_agents() == ["eda"]
+
+    import src.Agents.agent_manager as module
+    assert module.agent_manager is managers[0]
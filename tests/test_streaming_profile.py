@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.tools.streaming_profile as streaming
+from src.tools.sketches import DistinctCounter, hash_values
+from src.tools.streaming_profile import ProfileAccumulator, stream_profile
+from src.tools.utils import dataset_profile_logic
+
+
+def _frame(rows: int = 3000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "id": np.arange(rows),
+        "amount": rng.normal(50, 10, rows).round(3),
+        "segment": rng.choice(["a", "b", "c", None], rows),
+        "flag": rng.random(rows) < 0.2,
+    })
+    df.loc[rng.random(rows) < 0.1, "amount"] = np.nan
+    # A few exact duplicate rows
+    return pd.concat([df, df.iloc[:25]], ignore_index=True)
+
+
+def test_stream_profile_matches_full_profile(write_csv):
+    df = _frame()
+    path = write_csv(df)
+
+    streamed = stream_profile(path, chunksize=700)
+    full = dataset_profile_logic(pd.read_csv(path))
+
+    for key in ("shape", "columns", "duplicates", "nulls", "unique_values", "histograms", "top_values"):
+        assert streamed[key] == full[key], key
+    for col, expected in full["numeric_summary"].items():
+        assert streamed["numeric_summary"][col] == pytest.approx(expected)
+
+
+def test_merged_accumulators_match_one_pass():
+    df = _frame()
+    one_pass = ProfileAccumulator().update(df).to_profile()
+
+    left = ProfileAccumulator().update(df.iloc[:1000])
+    right = ProfileAccumulator().update(df.iloc[1000:])
+    merged = left.merge(right).to_profile()
+
+    assert merged["unique_values"] == one_pass["unique_values"]
+    assert merged["duplicates"] == one_pass["duplicates"]
+    assert merged["nulls"] == one_pass["nulls"]
+
+
+def test_distinct_counter_is_exact_within_its_limit():
+    counter = DistinctCounter(limit=1000)
+    for start in range(0, 900, 100):
+        counter.add_hashes(hash_values(pd.Series(np.arange(start, start + 150))))
+
+    assert counter.is_exact
+    assert counter.cardinality() == 1000 - 100 + 50
+
+
+def test_distinct_counter_spills_to_a_bounded_sketch():
+    counter = DistinctCounter(limit=1000)
+    for start in range(0, 50_000, 5000):
+        counter.add_hashes(hash_values(pd.Series(np.arange(start, start + 5000))))
+
+    assert not counter.is_exact
+    assert counter.exact is None
+    assert len(counter.sketch.registers) == 1 << counter.precision
+    assert counter.cardinality() == pytest.approx(50_000, rel=0.05)
+
+
+def test_distinct_counter_merge_keeps_exactness_until_the_limit():
+    left, right = DistinctCounter(limit=100), DistinctCounter(limit=100)
+    left.add_hashes(hash_values(pd.Series(np.arange(60))))
+    right.add_hashes(hash_values(pd.Series(np.arange(30, 90))))
+    left.merge(right)
+    assert left.is_exact and left.cardinality() == 90
+
+    right.add_hashes(hash_values(pd.Series(np.arange(1000, 2000))))
+    left.merge(right)
+    assert not left.is_exact
+    assert left.cardinality() == pytest.approx(1090, rel=0.05)
+
+
+def test_accumulator_memory_is_bounded_past_the_exact_limits(monkeypatch):
+    monkeypatch.setattr(streaming, "EXACT_DISTINCT_LIMIT", 500)
+    monkeypatch.setattr(streaming, "EXACT_ROWS_LIMIT", 1000)
+    df = _frame(rows=20_000)
+
+    acc = ProfileAccumulator()
+    for start in range(0, len(df), 4000):
+        acc.update(df.iloc[start:start + 4000])
+    profile = acc.to_profile()
+
+    assert acc.distinct["id"].exact is None
+    assert acc.row_fingerprints.exact is None
+    # Low-cardinality columns are still counted exactly
+    assert acc.distinct["segment"].is_exact
+    assert profile["unique_values"]["segment"] == 3
+    assert profile["unique_values"]["id"] == pytest.approx(20_000, rel=0.05)
+    assert profile["duplicates"]["duplicate_rows"] >= 0
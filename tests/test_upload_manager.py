@@ -0,0 +1,41 @@
+import hashlib
+import io
+
+from src.services.upload_manager import content_digest, csv_shape, save_upload
+
+_CSV = b"a,b\n1,x\n2,y\n3,z\n"
+
+
+def test_same_content_is_saved_once_under_its_digest(tmp_path):
+    path, digest = save_upload(io.BytesIO(_CSV), "sales data.csv", tmp_path)
+
+    assert digest == hashlib.sha256(_CSV).hexdigest()
+    assert path == str(tmp_path / digest[:16] / "sales_data.csv")
+    with open(path, "rb") as f:
+        assert f.read() == _CSV
+
+    mtime = (tmp_path / digest[:16] / "sales_data.csv").stat().st_mtime_ns
+    again, _ = save_upload(io.BytesIO(_CSV), "sales data.csv", tmp_path)
+    assert again == path
+    assert (tmp_path / digest[:16] / "sales_data.csv").stat().st_mtime_ns == mtime
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_names_cannot_escape_the_upload_dir(tmp_path):
+    path, digest = save_upload(io.BytesIO(_CSV), "../../etc/passwd", tmp_path)
+    assert path == str(tmp_path / digest[:16] / "passwd")
+
+
+def test_digest_leaves_the_stream_rewound():
+    stream = io.BytesIO(_CSV)
+    stream.read(3)
+    content_digest(stream)
+    assert stream.read() == _CSV
+
+
+def test_csv_shape_counts_rows_without_parsing(tmp_path):
+    path = tmp_path / "d.csv"
+    path.write_bytes(_CSV)
+    assert csv_shape(str(path)) == (3, 2)
+    path.write_bytes(_CSV.rstrip(b"\n"))
+    assert csv_shape(str(path)) == (3, 2)
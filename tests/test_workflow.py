@@ -0,0 +1,59 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.Graph.nodes import atool_node
+from src.Graph.workflow import _initial_state, _stream_and_print, arun_workflow, build_graph
+from src.utils.instrumentation import trace_run
+
+
+@pytest.fixture
+def dataset(write_csv):
+    rng = np.random.default_rng(0)
+    return write_csv(pd.DataFrame({
+        "x": rng.normal(size=300),
+        "segment": rng.choice(["a", "b", "c"], 300),
+        "target": rng.integers(0, 2, 300),
+    }))
+
+
+def test_streamed_run_executes_each_node_once(dataset, capsys):
+    graph = build_graph()
+    with trace_run(export=False) as trace:
+        state = _stream_and_print(graph, _initial_state("Summarize the data", dataset))
+
+    calls = {name: agg["calls"] for name, agg in trace.summary().items()}
+    # The profiler runs before and after its tool call; everything else once
+    assert calls["profiler"] == 2
+    assert calls["tool_node"] == calls["planner"] == calls["designer"] == calls["renderer"] == 1
+    assert state["llm_calls"] == 3
+    assert state["profile_data"]["shape"] == {"rows": 300, "columns": 3}
+    assert state["plot_plan"]["plots"]
+    assert "DATASET PROFILE" in capsys.readouterr().out
+
+
+def test_async_workflow_matches_the_sync_one(dataset):
+    sync_state = _stream_and_print(build_graph(), _initial_state("Summarize the data", dataset))
+    async_state = asyncio.run(arun_workflow("Summarize the data", dataset))
+
+    for key in ("profile_data", "relationships", "strategy", "plot_plan"):
+        assert async_state[key] == sync_state[key], key
+    assert [f["path"] for f in async_state["figures"]] == [f["path"] for f in sync_state["figures"]]
+
+
+def test_async_tool_node_runs_every_tool_call_of_a_message(dataset):
+    calls = [
+        {"name": "dataset_profile_tool", "args": {"file_path": ""}, "id": "call_profile"},
+        {"name": "correlation_tool", "args": {"file_path": ""}, "id": "call_corr"},
+    ]
+    state = {"messages": [AIMessage(content="", tool_calls=calls)], "file_path": dataset}
+
+    update = asyncio.run(atool_node(state))
+
+    assert [m.tool_call_id for m in update["messages"]] == ["call_profile", "call_corr"]
+    assert update["profile_data"]["shape"]["rows"] == 300
+    assert update["relationships"]
+    assert set(update["artifacts"]) == {"call_profile", "call_corr"}